@@ -8,6 +8,10 @@ from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_wtf.csrf import CSRFProtect
 
+from config import config
+from sqlite_tuning import sqlite_engine_options
+from db_routing import REPLICA_BIND, RoutingSession, server_engine_options
+
 # Setup logging
 log_level = logging.INFO if os.environ.get('FLASK_ENV') == 'production' else logging.DEBUG
 logging.basicConfig(level=log_level)
@@ -15,7 +19,9 @@ logging.basicConfig(level=log_level)
 class Base(DeclarativeBase):
     pass
 
-db = SQLAlchemy(model_class=Base)
+# Objects stay readable after commit, so a view that saves and then renders
+# the result doesn't check out a second connection to reload them.
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession, 'expire_on_commit': False})
 migrate = Migrate()
 
 # create the app
@@ -30,33 +36,49 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1) # needed for url_for
 
 # configure the database, relative to the app instance folder
 database_url = os.environ.get("DATABASE_URL")
-if database_url:
+if database_url and not database_url.startswith("sqlite"):
     app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_recycle": 300,
-        "pool_pre_ping": True,
-    }
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = server_engine_options()
 else:
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///automarket.db"
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url or "sqlite:///automarket.db"
 
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Optional read pool for @read_replica views (see db_routing)
+replica_url = os.environ.get("DATABASE_REPLICA_URL")
+if replica_url:
+    replica_options = sqlite_engine_options(replica_url) if replica_url.startswith("sqlite") else server_engine_options()
+    app.config["SQLALCHEMY_BINDS"] = {REPLICA_BIND: dict(replica_options, url=replica_url)}
+
+# Optional named profile from config.py (e.g. FLASK_CONFIG=testing for an in-memory database)
+config_name = os.environ.get("FLASK_CONFIG")
+if config_name:
+    app.config.from_object(config[config_name])
+
+# SQLite: WAL, busy timeout and pool sizing (pragmas are set in sqlite_tuning)
+if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = sqlite_engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+
 # Configure upload settings
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
+# Optional: keep each upload as received here before it is normalized (image_ingest)
+app.config['UPLOAD_ORIGINALS_FOLDER'] = os.environ.get('UPLOAD_ORIGINALS_FOLDER')
 
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # initialize the app with the extension, flask-sqlalchemy >= 3.0.x
 db.init_app(app)
-migrate.init_app(app, db)
-
-with app.app_context():
-    # Make sure to import the models here or their tables won't be created
-    import models  # noqa: F401
+# Batch mode lets SQLite migrations rebuild tables for ALTER operations
+migrate.init_app(app, db, render_as_batch=True)
 
-    db.create_all()
+# Import the models so Flask-Migrate sees their tables. The schema is managed
+# with `flask db upgrade` and sample data with `flask seed`; nothing touches the
+# database at import time, so workers boot fast and `--preload` is safe.
+import models  # noqa: F401
+import fragment_cache  # noqa: F401  (render_listing_card for templates)
 
-# Import routes after app creation
-from routes import *
\ No newline at end of file
+# Import routes and CLI commands after app creation
+from routes import *
+import commands  # noqa: F401  (also registers the snapshot rebuild hook)
\ No newline at end of file
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Compare gunicorn worker setups under catalog load with slow uploads in flight.
+
+For each variant a gunicorn server is started from gunicorn.conf.py (with
+environment overrides), a few clients trickle multipart uploads to the admin
+API while load_test.py's virtual users hit the catalog, and boot time, memory
+(PSS of master + workers) and catalog latency are recorded.
+
+Usage:
+    flask db upgrade && python3 synthetic_catalog.py --rows 10000
+    python3 benchmark_gunicorn.py --duration 30 --slow-uploads 4
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from load_test import DEFAULT_MIX, LoadTester, git_revision
+
+CORES = os.cpu_count() or 1
+
+VARIANTS = {
+    'sync': {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_THREADS': '1', 'GUNICORN_PRELOAD': '0',
+             'WEB_CONCURRENCY': str(2 * CORES + 1)},
+    'sync_preload': {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_THREADS': '1', 'GUNICORN_PRELOAD': '1',
+                     'WEB_CONCURRENCY': str(2 * CORES + 1)},
+    'gthread': {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_THREADS': '4', 'GUNICORN_PRELOAD': '0'},
+    'gthread_preload': {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_THREADS': '4', 'GUNICORN_PRELOAD': '1'},
+}
+
+
+def process_tree_pss_kb(pid):
+    """Proportional set size of a process and its children, in kB (Linux only)"""
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        return None
+    total = 0
+    for each in pids:
+        try:
+            with open(f'/proc/{each}/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return total
+
+
+class SlowUploader(threading.Thread):
+    """Sends multipart uploads to the admin API a few kilobytes at a time"""
+
+    def __init__(self, host, port, cookie, vehicle_id, upload_seconds, stop_event, size=512 * 1024):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.cookie = cookie
+        self.vehicle_id = vehicle_id
+        self.upload_seconds = upload_seconds
+        self.stop_event = stop_event
+        self.size = size
+        self.completed = 0
+
+    def run(self):
+        boundary = 'benchmarkboundary'
+        head = (f'--{boundary}\r\nContent-Disposition: form-data; name="images[]"; filename="upload.bin"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n').encode()
+        tail = f'\r\n--{boundary}--\r\n'.encode()
+        chunk = 8 * 1024
+        chunks = self.size // chunk
+        delay = self.upload_seconds / chunks
+
+        while not self.stop_event.is_set():
+            try:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.upload_seconds * 4)
+                conn.putrequest('PUT', f'/admin/api/vehicles/{self.vehicle_id}')
+                conn.putheader('Cookie', self.cookie)
+                conn.putheader('Content-Type', f'multipart/form-data; boundary={boundary}')
+                conn.putheader('Content-Length', str(len(head) + chunks * chunk + len(tail)))
+                conn.endheaders()
+                conn.send(head)
+                for _ in range(chunks):
+                    if self.stop_event.is_set():
+                        break
+                    conn.send(b'\0' * chunk)
+                    time.sleep(delay)
+                else:
+                    conn.send(tail)
+                    conn.getresponse().read()
+                    self.completed += 1
+                conn.close()
+            except (OSError, http.client.HTTPException):
+                time.sleep(0.1)
+
+
+def wait_for_port(base_url, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            requests.get(f"{base_url}/marketplace", timeout=2)
+            return True
+        except requests.RequestException:
+            time.sleep(0.05)
+    return False
+
+
+def run_variant(name, overrides, args, vehicle_ids):
+    port = args.port
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, PORT=str(port), GUNICORN_LOG_LEVEL='warning', **overrides)
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application'],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_port(base_url):
+            raise RuntimeError(f"gunicorn did not come up for variant {name}")
+        boot_seconds = time.perf_counter() - started
+
+        admin = requests.Session()
+        admin.post(f"{base_url}/admin/auth", data={'username': 'abc', 'password': '123'}, allow_redirects=False)
+        cookie = '; '.join(f"{k}={v}" for k, v in admin.cookies.get_dict().items())
+
+        stop = threading.Event()
+        uploaders = [SlowUploader('127.0.0.1', port, cookie, vehicle_ids[0], args.upload_seconds, stop)
+                     for _ in range(args.slow_uploads)] if vehicle_ids else []
+        for uploader in uploaders:
+            uploader.start()
+
+        tester = LoadTester(base_url, args.users, args.duration, args.warmup, dict(DEFAULT_MIX, admin_api=0))
+        tester.vehicle_ids = vehicle_ids
+        tester.mix = {k: v for k, v in tester.mix.items() if v > 0}
+        results = tester.run()
+        memory = process_tree_pss_kb(server.pid)
+
+        stop.set()
+        return {
+            'env': overrides,
+            'boot_seconds': round(boot_seconds, 3),
+            'memory_pss_mb': round(memory / 1024, 1) if memory else None,
+            'slow_uploads_completed': sum(u.completed for u in uploaders),
+            'results': results,
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=35)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark gunicorn worker configurations')
+    parser.add_argument('--variants', nargs='*', default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--slow-uploads', type=int, default=4, help='concurrent slow upload clients')
+    parser.add_argument('--upload-seconds', type=float, default=10, help='seconds each upload takes to send')
+    parser.add_argument('--output', help='report path (default: gunicorn_benchmark_<timestamp>.json)')
+    args = parser.parse_args()
+
+    tester = LoadTester('', 0, 0, 0, {})
+    tester.load_vehicle_ids()
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+    if not tester.vehicle_ids:
+        print("⚠ No vehicles in the database; seed some with synthetic_catalog.py first")
+
+    report = {
+        'timestamp': datetime.now().strftime("%Y-%m-%d_%H-%M-%S"),
+        'git_revision': git_revision(),
+        'cores': CORES,
+        'config': vars(args),
+        'variants': {},
+    }
+    for name in args.variants:
+        print(f"🚀 {name} ...")
+        report['variants'][name] = run_variant(name, VARIANTS[name], args, tester.vehicle_ids)
+
+    output = args.output or f"gunicorn_benchmark_{report['timestamp']}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 78)
+    print(f"{'variant':<18}{'boot s':>8}{'PSS MB':>9}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'uploads':>9}")
+    for name, data in report['variants'].items():
+        overall = data['results']['overall']
+        print(f"{name:<18}{data['boot_seconds']:>8}{data['memory_pss_mb'] or 0:>9}{overall['throughput_rps'] or 0:>9}"
+              f"{overall['p50_ms'] or 0:>9}{overall['p95_ms'] or 0:>9}{overall['p99_ms'] or 0:>9}"
+              f"{data['slow_uploads_completed']:>9}")
+    print("=" * 78)
+    print(f"📄 Report written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Insert rate and index size for vehicle primary key formats.
+
+Builds the same narrow vehicles-like table in a fresh SQLite file (with the
+app's pragmas) once per key format and inserts N rows in batches, the way
+listings arrive over time:
+
+    uuid4_text     random 36-character strings (the old Vehicle.id)
+    uuid7_text     time-ordered 36-character strings
+    uuid7_compact  time-ordered 16-byte keys (CompactUUID, the current id)
+
+Reports rows/s, primary key index size (from SQLite's dbstat table), file size
+and random point-lookup latency.
+
+Usage:
+    python3 benchmark_ids.py                 # 1,000,000 rows per format
+    python3 benchmark_ids.py --rows 200000 --output ids.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, MetaData, String, Table, create_engine, select, text
+
+from id_types import CompactUUID, uuid7
+from sqlite_tuning import sqlite_engine_options
+
+FORMATS = {
+    'uuid4_text': (String(36), lambda ms, rng: str(uuid.UUID(int=rng.getrandbits(128), version=4))),
+    'uuid7_text': (String(36), lambda ms, rng: str(uuid7(ms, rng))),
+    'uuid7_compact': (CompactUUID(), lambda ms, rng: str(uuid7(ms, rng))),
+}
+
+
+def run_format(name, rows, batch_size, lookups, directory):
+    id_type, make_id = FORMATS[name]
+    path = os.path.join(directory, f'{name}.db')
+    url = f'sqlite:///{path}'
+    engine = create_engine(url, **sqlite_engine_options(url))  # same pool and pragmas as the app
+    table = Table('vehicles', MetaData(),
+                  Column('id', id_type, primary_key=True),
+                  Column('title', String(100), nullable=False),
+                  Column('status', String(20), nullable=False),
+                  Column('price', Float, nullable=False),
+                  Column('created_at', DateTime, nullable=False))
+    table.metadata.create_all(engine)
+
+    rng = random.Random(42)
+    now_ms = int(time.time() * 1000)
+    ids = []
+    inserted = 0
+    started = time.perf_counter()
+    while inserted < rows:
+        count = min(batch_size, rows - inserted)
+        batch = []
+        for i in range(count):
+            ms = now_ms + (inserted + i) * 10  # a listing every 10ms
+            vehicle_id = make_id(ms, rng)
+            batch.append({'id': vehicle_id, 'title': f'Vehicle {inserted + i}', 'status': 'available',
+                          'price': 500000.0, 'created_at': datetime.utcfromtimestamp(ms / 1000)})
+            if rng.random() < lookups / rows:
+                ids.append(vehicle_id)
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+        inserted += count
+    insert_seconds = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+        sizes = dict(conn.execute(text('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name')).all())
+        pk_index = next((size for index_name, size in sizes.items() if index_name.startswith('sqlite_autoindex_vehicles')),
+                        0)
+        rng.shuffle(ids)
+        lookup_started = time.perf_counter()
+        for vehicle_id in ids:
+            conn.execute(select(table.c.title).where(table.c.id == vehicle_id)).one()
+        lookup_seconds = time.perf_counter() - lookup_started
+    engine.dispose()
+
+    return {
+        'rows': rows,
+        'insert_seconds': round(insert_seconds, 2),
+        'rows_per_second': round(rows / insert_seconds, 1),
+        'table_mb': round(sizes.get('vehicles', 0) / 1e6, 2),
+        'pk_index_mb': round(pk_index / 1e6, 2),
+        'file_mb': round(os.path.getsize(path) / 1e6, 2),
+        'lookup_us': round(lookup_seconds / max(1, len(ids)) * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark primary key formats at scale')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--lookups', type=int, default=10_000, help='random point lookups by id')
+    parser.add_argument('--formats', nargs='*', default=list(FORMATS), choices=list(FORMATS))
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.formats:
+            print(f"🚀 {name}: inserting {args.rows:,} rows ...")
+            results[name] = run_format(name, args.rows, args.batch_size, args.lookups, directory)
+
+    print("\n" + "=" * 78)
+    print(f"{'format':<16}{'rows/s':>12}{'table MB':>11}{'PK index MB':>13}{'file MB':>10}{'lookup µs':>12}")
+    for name, data in results.items():
+        print(f"{name:<16}{data['rows_per_second']:>12,.0f}{data['table_mb']:>11}{data['pk_index_mb']:>13}"
+              f"{data['file_mb']:>10}{data['lookup_us']:>12}")
+    print("=" * 78)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), 'results': results}, f, indent=2)
+        print(f"📄 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Flask CLI commands for the database lifecycle.
+
+    flask db upgrade   # apply schema migrations (Flask-Migrate)
+    flask seed         # create the admin user and sample vehicles
+    flask snapshots    # render static HTML snapshots of the public pages
+    flask image-info   # record size and placeholder of uploads stored before image_info
+"""
+import os
+
+import click
+
+from app import app, db
+from image_placeholders import describe_file, record
+from image_resize import RESIZING
+from models import Vehicle, get_image_info, initialize_sample_data
+from static_snapshots import SNAPSHOT_DIR, build_all
+
+
+@app.cli.command('seed')
+def seed_command():
+    """Create the admin user and sample vehicles if they are missing."""
+    initialize_sample_data()
+    click.echo("✅ Sample data and admin user are in place")
+
+
+@app.cli.command('snapshots')
+@click.option('--out', default=SNAPSHOT_DIR or 'snapshots', show_default=True, help='Directory to write the pages to.')
+@click.option('--workers', type=int, default=None, help='Render processes (default: one per CPU; 0 renders here).')
+def snapshots_command(out, workers):
+    """Render every public catalog page to static HTML for nginx."""
+    counts = build_all(out, workers=workers)
+    click.echo(f"✅ Snapshots in {out}: {counts['written']} written, {counts['unchanged']} unchanged, "
+               f"{counts['removed']} removed")
+
+
+@app.cli.command('image-info')
+def image_info_command():
+    """Record the size and placeholder of listing photos that don't have them yet."""
+    if not RESIZING:
+        raise click.ClickException("Pillow is not installed")
+    filenames = sorted({filename for vehicle in Vehicle.query.options(db.load_only(Vehicle.images))
+                        for filename in vehicle.images_list})
+    recorded = missing = 0
+    for start in range(0, len(filenames), 500):
+        chunk = filenames[start:start + 500]
+        known = get_image_info(chunk)
+        infos = {}
+        for filename in chunk:
+            if filename in known:
+                continue
+            missing += 1
+            try:
+                infos[filename] = describe_file(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+            except OSError as e:
+                click.echo(f"⚠️  {filename}: {e}")
+        record(infos)
+        recorded += len(infos)
+    click.echo(f"✅ Recorded {recorded} of {missing} photos without image info")
@@ -18,7 +18,7 @@ class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///friendscars.db'
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_recycle': 300,
-        'pool_pre_ping': True,
+        'pool_use_lifo': True,  # idle connections are pinged on checkout instead (db_routing)
     }
 
 class DevelopmentConfig(Config):
@@ -32,6 +32,7 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    PAGE_CACHE = False  # tests check freshly rendered pages; test_page_cache turns it on
 
 # Configuration dictionary
 config = {
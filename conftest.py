@@ -0,0 +1,63 @@
+"""
+Shared setup for the in-process tests.
+
+The app runs with FLASK_CONFIG=testing (an in-memory SQLite database), or
+against the scratch Postgres database in QUERY_PLAN_POSTGRES_URL for
+test_query_plans.py. Test modules add their rows on top of the `database`
+fixture and build them with `make_vehicle`:
+    python -m pytest -q
+"""
+import os
+
+if os.environ.get('QUERY_PLAN_POSTGRES_URL'):
+    os.environ['DATABASE_URL'] = os.environ['QUERY_PLAN_POSTGRES_URL']
+else:
+    os.environ.setdefault('FLASK_CONFIG', 'testing')
+
+import pytest
+
+from app import app, db
+from models import Vehicle
+
+# Every required column, for tests that only care about a few of them
+VEHICLE_DEFAULTS = {
+    'title': 'Test Listing', 'category': 'Cars', 'make': 'Honda', 'model': 'City', 'year': 2020, 'price': 900000,
+    'mileage': 30000, 'description': 'Test', 'contact_name': 'Friendscars', 'contact_phone': '555',
+}
+
+
+@pytest.fixture(scope='session')
+def make_vehicle():
+    """Vehicle(**overrides) with VEHICLE_DEFAULTS for the rest, not yet added to a session"""
+    def make(**overrides):
+        return Vehicle(**dict(VEHICLE_DEFAULTS, **overrides))
+    return make
+
+
+@pytest.fixture(scope='session')
+def add_vehicles():
+    """Commit the given vehicles and return their ids"""
+    def add(vehicles):
+        with app.app_context():
+            db.session.add_all(vehicles)
+            db.session.commit()
+            return [vehicle.id for vehicle in vehicles]
+    return add
+
+
+@pytest.fixture(scope='module')
+def database():
+    """Empty tables for one test module, dropped after it"""
+    with app.app_context():
+        db.create_all()
+    yield
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def admin_client():
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+    return client
@@ -0,0 +1,40 @@
+"""
+Lenient parsing for dates typed into admin forms.
+
+Dates such as `Vehicle.insurance_expiry` are stored in a real DATE column,
+so range queries use an index and compare chronologically. The admin forms
+and JSON keep showing them as MM/DD/YYYY. Input can be in any of:
+
+    03/15/2025   MM/DD/YYYY (the documented format, wins when ambiguous)
+    15/03/2025   DD/MM/YYYY (only when the first number can't be a month)
+    2025-03-15   ISO 8601
+"""
+from datetime import date, datetime
+
+DISPLAY_FORMAT = '%m/%d/%Y'
+INPUT_FORMATS = ['%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d', '%m-%d-%Y', '%d-%m-%Y', '%m/%d/%y', '%d/%m/%y']
+
+
+def parse_date(value):
+    """date for a date/datetime/string in one of INPUT_FORMATS; None for blanks.
+
+    Raises ValueError for anything else.
+    """
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    text = str(value).strip()
+    if not text:
+        return None
+    for date_format in INPUT_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"{value!r} is not a date (use MM/DD/YYYY)")
+
+
+def format_date(value):
+    """MM/DD/YYYY for a date (None stays None)"""
+    return value.strftime(DISPLAY_FORMAT) if value else None
@@ -0,0 +1,135 @@
+"""
+Read/write routing between the primary database and a read pool.
+
+Set `DATABASE_REPLICA_URL` to send the public catalog pages and admin list
+APIs to a read replica (or, pointed at the primary, to a separate read-only
+pool so catalog traffic can't exhaust the connections admins write with).
+Without it every query goes to the primary, exactly as before.
+
+- Routes opt in with the `@read_replica` decorator. Anything that flushes,
+  executes an INSERT/UPDATE/DELETE, or runs in an undecorated route uses the
+  primary.
+- After a request writes, the user's session is pinned to the primary for
+  `REPLICA_STICKY_SECONDS`, so an admin who just saved a vehicle sees the
+  change in the list even if the replica is behind. Writes made through the
+  SQLite write queue commit on the writer's session, so `run_write` calls
+  `pin_to_primary()` for them.
+- Instead of `pool_pre_ping` (a round trip on every checkout), connections
+  are pinged only when they sat idle in the pool longer than
+  `POOL_PING_IDLE_SECONDS`; a failed ping makes the pool reconnect.
+"""
+import functools
+import os
+import sqlite3
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+POOL_PING_IDLE_SECONDS = float(os.environ.get('POOL_PING_IDLE_SECONDS', 30))
+
+
+def server_engine_options():
+    """Engine options for a networked database (Postgres) without pool_pre_ping.
+
+    LIFO checkout keeps a small set of connections busy and lets the rest
+    idle out, and recycling bounds connection age below server/proxy timeouts.
+    """
+    return {
+        'pool_recycle': 300,
+        'pool_use_lifo': True,
+    }
+
+
+def read_replica(view):
+    """Let a view's queries use the read pool unless the user just wrote"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # Only read the session when there is one, so anonymous responses don't get Vary: Cookie
+        has_session = current_app.config['SESSION_COOKIE_NAME'] in request.cookies
+        # Static snapshots (static_snapshots) render right after a commit, before the replica has it
+        g.db_read_replica = (not g.get('snapshot')
+                             and (not has_session or session.get('db_primary_until', 0) < time.time()))
+        return view(*args, **kwargs)
+    return wrapper
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends reads from @read_replica views to the read pool"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        return (
+            has_request_context()
+            and g.get('db_read_replica', False)
+            and REPLICA_BIND in self._db.engines
+            and not self._flushing
+            and not self.info.get('wrote')
+            and not isinstance(clause, UpdateBase)
+        )
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def mark_flush_write(db_session, flush_context):
+    db_session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def mark_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+def pin_to_primary():
+    """Read from the primary for the rest of this request and the user's next REPLICA_STICKY_SECONDS"""
+    if has_request_context():
+        session['db_primary_until'] = time.time() + REPLICA_STICKY_SECONDS
+        g.db_read_replica = False
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def stick_to_primary(db_session):
+    if db_session.info.pop('wrote', False):
+        pin_to_primary()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def clear_write_mark(db_session):
+    db_session.info.pop('wrote', None)
+
+
+@event.listens_for(Pool, 'checkin')
+def record_idle_start(dbapi_connection, connection_record):
+    if dbapi_connection is not None:
+        connection_record.info['checked_in_at'] = time.monotonic()
+
+
+@event.listens_for(Pool, 'checkout')
+def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+    """Ping server connections that idled long enough to have been dropped"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    idle_since = connection_record.info.get('checked_in_at')
+    if idle_since is None or time.monotonic() - idle_since < POOL_PING_IDLE_SECONDS:
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+        dbapi_connection.rollback()  # don't hand out a connection with a transaction open
+    except Exception:
+        # The pool discards this connection and retries with a fresh one
+        raise exc.DisconnectionError()
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
@@ -0,0 +1,67 @@
+"""
+Small-integer storage for the vehicle columns with a fixed vocabulary.
+
+Category, status, fuel type, transmission, drivetrain and condition are
+stored as SMALLINT codes instead of repeating strings like
+"Commercial Vehicles" in every row and index entry. The model API,
+templates and JSON keep using the strings; `CodedEnum` translates at the
+database boundary, so `Vehicle.status == 'available'` compares integers.
+
+Codes are list positions starting at 1: only ever append new values to a
+vocabulary, never reorder or remove them.
+"""
+from sqlalchemy.types import SmallInteger, TypeDecorator
+
+CATEGORIES = ['Cars', 'Trucks', 'Commercial Vehicles']
+STATUSES = ['available', 'sold']
+FUEL_TYPES = ['Petrol', 'Gasoline', 'Diesel', 'Hybrid', 'Electric', 'CNG']
+TRANSMISSIONS = ['Manual', 'Automatic', 'CVT']
+DRIVETRAINS = ['FWD', 'RWD', 'AWD', '4WD', '6x4']
+CONDITIONS = ['Excellent', 'Very Good', 'Good', 'Fair', 'Poor']
+
+VOCABULARIES = {
+    'category': CATEGORIES,
+    'status': STATUSES,
+    'fuel_type': FUEL_TYPES,
+    'transmission': TRANSMISSIONS,
+    'drivetrain': DRIVETRAINS,
+    'condition_rating': CONDITIONS,
+}
+
+
+def vocabulary_errors(values):
+    """{field: message} for the coded fields in `values` set to something outside their vocabulary
+
+    Check request data with this before writing: CodedEnum only rejects an
+    unknown value when the statement is executed.
+    """
+    return {field: f"Not a valid choice (expected one of {', '.join(VOCABULARIES[field])})"
+            for field, value in values.items()
+            if field in VOCABULARIES and value not in (None, '') and value not in VOCABULARIES[field]}
+
+
+class CodedEnum(TypeDecorator):
+    """String from a fixed vocabulary in Python, its 1-based code in the database"""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, field):
+        super().__init__()
+        self.field = field
+        self.codes = {value: code for code, value in enumerate(VOCABULARIES[field], start=1)}
+        self.values = dict((code, value) for value, code in self.codes.items())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or value == '':
+            return None
+        try:
+            return self.codes[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not a known {self.field} (expected one of {list(self.codes)})")
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.values.get(value)
+
+    def __repr__(self):
+        return f"CodedEnum({self.field!r})"
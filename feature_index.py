@@ -0,0 +1,165 @@
+"""
+Multi-feature AND filter for catalog queries.
+
+`filter_by_features(query, slugs)` narrows a Vehicle query to listings that
+have every one of the tags (see feature_tags). The default is one SQL
+subquery that intersects index range scans on vehicle_features(tag_id,
+vehicle_id), which come back sorted by vehicle id:
+
+    SELECT vehicle_id FROM vehicle_features WHERE tag_id = :sunroof
+    INTERSECT
+    SELECT vehicle_id FROM vehicle_features WHERE tag_id = :awd ...
+
+With FEATURE_BITSETS=1 each worker also keeps one bitset per tag over the
+available listings (a Python int, bit n = n-th newest listing), so the AND
+is a few big-integer `&` operations and the database only loads the matching
+rows by primary key. The bitsets are rebuilt after this process commits a
+vehicle change, and otherwise when the catalog's (row count, newest
+updated_at) signature moves, checked at most every FEATURE_BITSETS_TTL
+seconds so other workers' edits show up too.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import event, false, func, intersect, select
+from sqlalchemy.orm import Session
+
+from app import app, db
+from models import FeatureTag, Vehicle, vehicle_features
+
+# Above this many matches, bind the SQL intersection instead of the id list
+MAX_BOUND_IDS = 10000
+
+_BIT_POSITIONS = [[bit for bit in range(8) if byte >> bit & 1] for byte in range(256)]
+
+
+def bitsets_enabled():
+    return os.environ.get('FEATURE_BITSETS') == '1'
+
+
+def filter_by_features(query, slugs, available_only=False):
+    """Restrict a Vehicle query to listings tagged with every slug.
+
+    The bitsets only cover available listings, so they're used only when the
+    caller filters on status='available' itself and passes available_only.
+    """
+    if not slugs:
+        return query
+    if available_only and bitsets_enabled():
+        ids = feature_bitsets.match(slugs)
+        if len(ids) <= MAX_BOUND_IDS:
+            return query.filter(Vehicle.id.in_(ids)) if ids else query.filter(false())
+
+    tag_ids = dict(db.session.execute(select(FeatureTag.slug, FeatureTag.id).where(FeatureTag.slug.in_(slugs))).all())
+    if len(tag_ids) < len(set(slugs)):
+        return query.filter(false())  # a tag nobody has
+    per_tag = [select(vehicle_features.c.vehicle_id).where(vehicle_features.c.tag_id == tag_id)
+               for tag_id in tag_ids.values()]
+    matching = per_tag[0] if len(per_tag) == 1 else intersect(*per_tag)
+    return query.filter(Vehicle.id.in_(matching))
+
+
+class FeatureBitsets:
+    """Per-tag bitsets over the available listings, newest first"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stale = True
+        self._checked_at = 0.0
+        self._signature = None
+        self._ids = []
+        self._bits = {}
+
+    def invalidate(self):
+        self._stale = True
+
+    def match(self, slugs):
+        """Ids (newest first) of available listings that have every tag"""
+        self._refresh()
+        bits, ids = self._bits, self._ids
+        result = None
+        for slug in slugs:
+            tag_bits = bits.get(slug, 0)
+            result = tag_bits if result is None else result & tag_bits
+            if not result:
+                return []
+        return [ids[position] for position in _positions(result)]
+
+    def counts(self):
+        """{slug: number of available listings with the tag}"""
+        self._refresh()
+        return {slug: tag_bits.bit_count() for slug, tag_bits in self._bits.items()}
+
+    def _refresh(self):
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.ttl:
+            return
+        with self._lock:
+            if not self._stale and now - self._checked_at < self.ttl:
+                return
+            self._stale = False
+            signature = tuple(db.session.execute(select(func.count(), func.max(Vehicle.updated_at))).one())
+            self._checked_at = now
+            if signature != self._signature:
+                self._build()
+                self._signature = signature
+
+    def _build(self):
+        started = time.perf_counter()
+        rows = db.session.execute(
+            select(Vehicle.id, FeatureTag.slug)
+            .join(vehicle_features, vehicle_features.c.vehicle_id == Vehicle.id)
+            .join(FeatureTag, FeatureTag.id == vehicle_features.c.tag_id)
+            .where(Vehicle.status == 'available')
+            .order_by(Vehicle.created_at.desc(), Vehicle.id)
+        ).all()
+
+        ids, positions, members = [], {}, {}
+        for vehicle_id, slug in rows:
+            if vehicle_id not in positions:
+                positions[vehicle_id] = len(ids)
+                ids.append(vehicle_id)
+            members.setdefault(slug, []).append(positions[vehicle_id])
+
+        bits = {}
+        for slug, tagged in members.items():
+            buffer = bytearray(len(ids) // 8 + 1)
+            for position in tagged:
+                buffer[position >> 3] |= 1 << (position & 7)
+            bits[slug] = int.from_bytes(buffer, 'little')
+
+        self._ids, self._bits = ids, bits
+        app.logger.info(f"Built feature bitsets for {len(ids)} listings and {len(bits)} tags "
+                        f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+def _positions(bits):
+    """Set bit positions, lowest first"""
+    positions = []
+    for index, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+        if byte:
+            base = index << 3
+            positions.extend(base + bit for bit in _BIT_POSITIONS[byte])
+    return positions
+
+
+feature_bitsets = FeatureBitsets(ttl=float(os.environ.get('FEATURE_BITSETS_TTL', '2')))
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_vehicle_changes(session, flush_context):
+    if any(isinstance(obj, Vehicle) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['vehicles_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_bitsets(session):
+    if session.info.pop('vehicles_changed', False):
+        feature_bitsets.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_vehicle_changes(session):
+    session.info.pop('vehicles_changed', None)
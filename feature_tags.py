@@ -0,0 +1,93 @@
+"""
+Normalized feature tags for vehicles.
+
+`Vehicle.features` stays the free-text, comma-separated field the admin
+forms edit ("Sunroof, Heated Seats, ..."). Each vehicle is also mapped to
+rows in `feature_tags` through `vehicle_features`, so "has a sunroof" is an
+index lookup instead of `LIKE '%Sunroof%'` over every row.
+
+A vehicle's tags are its listed features plus its transmission, drivetrain
+and fuel type, so "Sunroof + AWD + Automatic" is a single tag filter. Tags
+are identified by slug: "Heated Seats", "heated seats " and "Heated-Seats"
+are all `heated-seats`; the first spelling seen becomes the display name.
+
+The ORM keeps the mapping in sync on every flush (see models). Bulk inserts
+that bypass the ORM (synthetic_catalog, migrations) call
+`backfill_feature_tags` afterwards.
+"""
+import re
+
+from sqlalchemy import column, delete, insert, select, table
+
+from enum_types import VOCABULARIES
+
+SPEC_TAG_FIELDS = ['transmission', 'drivetrain', 'fuel_type']
+
+_non_slug = re.compile(r'[^a-z0-9]+')
+
+
+def tag_slug(name):
+    """'Heated Seats' -> 'heated-seats'"""
+    return _non_slug.sub('-', name.strip().lower()).strip('-')
+
+
+def split_features(text):
+    """Feature names from the comma-separated text, de-duplicated by slug"""
+    names = {}
+    for part in (text or '').split(','):
+        name = ' '.join(part.split())
+        if name and tag_slug(name):
+            names.setdefault(tag_slug(name), name)
+    return names
+
+
+def vehicle_tag_names(features, transmission=None, drivetrain=None, fuel_type=None):
+    """{slug: display name} for everything a vehicle can be filtered on"""
+    names = split_features(features)
+    for value in (transmission, drivetrain, fuel_type):
+        if value:
+            names.setdefault(tag_slug(value), value)
+    return names
+
+
+def parse_tag_filter(values):
+    """Slugs from ?feature=Sunroof&feature=AWD or ?features=Sunroof,AWD"""
+    slugs = []
+    for value in values:
+        for slug in split_features(value):
+            if slug not in slugs:
+                slugs.append(slug)
+    return slugs
+
+
+# Lightweight table constructs so this also works from migrations
+_vehicles = table('vehicles', column('id'), column('features'), *[column(name) for name in SPEC_TAG_FIELDS])
+_tags = table('feature_tags', column('id'), column('name'), column('slug'))
+_mapping = table('vehicle_features', column('vehicle_id'), column('tag_id'))
+
+
+def backfill_feature_tags(connection, batch_size=5000):
+    """Rebuild the vehicle/tag mapping from the vehicles table; returns mapping rows written"""
+    codes = {name: dict(enumerate(VOCABULARIES[name], start=1)) for name in SPEC_TAG_FIELDS}
+    tag_ids = dict(connection.execute(select(_tags.c.slug, _tags.c.id)).all())
+
+    connection.execute(delete(_mapping))
+    written = 0
+    batch = []
+    # Streamed, batch_size rows at a time, so a large catalog is never held in memory
+    rows = connection.execute(select(_vehicles).execution_options(yield_per=batch_size))
+    for row in rows.mappings():
+        specs = {name: codes[name].get(row[name]) for name in SPEC_TAG_FIELDS}
+        for slug, name in vehicle_tag_names(row['features'], **specs).items():
+            if slug not in tag_ids:
+                tag_ids[slug] = connection.execute(
+                    insert(_tags).values(name=name, slug=slug).returning(_tags.c.id)).scalar_one()
+            batch.append({'vehicle_id': row['id'], 'tag_id': tag_ids[slug]})
+        if len(batch) >= batch_size:
+            connection.execute(insert(_mapping), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        connection.execute(insert(_mapping), batch)
+        written += len(batch)
+    return written
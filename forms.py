@@ -1,8 +1,12 @@
+from datetime import date
+
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileField, FileAllowed, FileRequired
 from wtforms import StringField, IntegerField, FloatField, TextAreaField, SelectField, MultipleFileField, PasswordField, EmailField
 from wtforms.validators import DataRequired, NumberRange, Length, Optional, Email, ValidationError
 
+from date_types import format_date, parse_date
+
 def DataRequiredAllowZero(message=None):
     """Custom validator that requires data but allows zero values"""
     def _validator(form, field):
@@ -10,6 +14,20 @@ def DataRequiredAllowZero(message=None):
             raise ValidationError(message or 'This field is required.')
     return _validator
 
+def ParsableDate(message=None):
+    """Custom validator for dates typed as MM/DD/YYYY, DD/MM/YYYY or YYYY-MM-DD"""
+    def _validator(form, field):
+        try:
+            parse_date(field.data)
+        except ValueError:
+            raise ValidationError(message or 'Enter the date as MM/DD/YYYY.')
+    return _validator
+
+class DateTextField(StringField):
+    """Text input for a date column; shows stored dates as MM/DD/YYYY"""
+    def process_data(self, value):
+        self.data = format_date(value) if isinstance(value, date) else value
+
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired()])
     password = PasswordField('Password', validators=[DataRequired()])
@@ -48,7 +66,7 @@ class VehicleForm(FlaskForm):
     fuel_economy = StringField('Fuel Economy (e.g., 25 city / 32 highway mpg)', validators=[Optional(), Length(max=30)])
     drivetrain = SelectField('Drivetrain (Optional)',
                             choices=[('', 'Select Drivetrain'), ('FWD', 'Front-Wheel Drive'), ('RWD', 'Rear-Wheel Drive'),
-                                    ('AWD', 'All-Wheel Drive'), ('4WD', '4-Wheel Drive')],
+                                    ('AWD', 'All-Wheel Drive'), ('4WD', '4-Wheel Drive'), ('6x4', '6x4 (Trucks)')],
                             validators=[Optional()])
 
     # Ownership & History
@@ -63,7 +81,7 @@ class VehicleForm(FlaskForm):
     # Insurance & Documentation
     insurance_company = StringField('Insurance Company', validators=[Optional(), Length(max=100)])
     insurance_policy_number = StringField('Policy Number', validators=[Optional(), Length(max=50)])
-    insurance_expiry = StringField('Insurance Expiry', validators=[Optional(), Length(max=20)])
+    insurance_expiry = DateTextField('Insurance Expiry', validators=[Optional(), Length(max=20), ParsableDate()])
     registration_number = StringField('Registration Number', validators=[Optional(), Length(max=50)])
     vin_number = StringField('VIN Number', validators=[Optional(), Length(max=17)])
 
@@ -0,0 +1,117 @@
+"""
+Rendered listing cards, cached per vehicle.
+
+browse_vehicles.html renders each card with render_listing_card(vehicle), a
+Jinja global. The card's HTML is kept under (vehicle id, updated_at, card
+template version), so once a page's cards are warm its render is mostly
+string concatenation.
+
+Any change to a vehicle bumps its updated_at, so every worker misses on the
+next render; the worker that commits the change also drops the card right
+away (session listeners below). Editing listing_card.html changes the
+version.
+
+FRAGMENT_CACHE_SIZE bounds the cards kept per worker (least recently used go
+first, default 5000); 0 turns the cache off.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from markupsafe import Markup
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import app
+from models import Vehicle
+
+CARD_TEMPLATE = 'listing_card.html'
+
+
+class FragmentCache:
+    """Bounded LRU of rendered fragments, one per vehicle id"""
+
+    def __init__(self, size):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # vehicle id -> (stamp, html)
+
+    def get(self, vehicle_id, stamp):
+        with self._lock:
+            entry = self._entries.get(vehicle_id)
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(vehicle_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, vehicle_id, stamp, html):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[vehicle_id] = (stamp, html)
+            self._entries.move_to_end(vehicle_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def discard(self, vehicle_ids):
+        with self._lock:
+            for vehicle_id in vehicle_ids:
+                self._entries.pop(vehicle_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+listing_cards = FragmentCache(size=int(os.environ.get('FRAGMENT_CACHE_SIZE', 5000)))
+
+_card = {'template': None, 'version': None}
+
+
+def _card_template():
+    """The card template and a digest of its source (reloaded templates get a new digest)"""
+    template = app.jinja_env.get_template(CARD_TEMPLATE)
+    if template is not _card['template']:
+        source = app.jinja_env.loader.get_source(app.jinja_env, CARD_TEMPLATE)[0]
+        _card['version'] = hashlib.sha1(source.encode()).hexdigest()[:12]
+        _card['template'] = template
+    return template, _card['version']
+
+
+@app.template_global()
+def render_listing_card(vehicle):
+    template, version = _card_template()
+    stamp = (vehicle.updated_at, version)
+    html = listing_cards.get(vehicle.id, stamp)
+    if html is None:
+        html = Markup(template.render(vehicle=vehicle))
+        listing_cards.put(vehicle.id, stamp, html)
+    return html
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_changed_cards(session, flush_context):
+    changed = {obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, Vehicle)}
+    if changed:
+        session.info.setdefault('changed_vehicle_ids', set()).update(changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _drop_changed_cards(session):
+    changed = session.info.pop('changed_vehicle_ids', None)
+    if changed:
+        listing_cards.discard(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_changed_cards(session):
+    session.info.pop('changed_vehicle_ids', None)
@@ -0,0 +1,76 @@
+"""
+Gunicorn configuration for Friendscars.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Every setting can be overridden with an environment variable so hosts can tune
+it without editing this file. `benchmark_gunicorn.py` compares the worker
+options below under catalog load with slow uploads in flight; run it on the
+target machine before changing the defaults.
+
+Why these defaults:
+- gthread workers: an admin uploading up to 16MB of photos over a phone
+  connection ties up one thread, not a whole process, so catalog reads keep
+  flowing. Sync workers are starved by a handful of slow uploads.
+- preload_app + gc.freeze(): the app is imported once in the master and the
+  imported objects are moved to the permanent GC generation before forking,
+  so the collector never writes to (and copies) those shared pages in the
+  workers. Safe because nothing touches the database at import time.
+- max_requests with jitter: recycles workers gradually to contain slow leaks
+  without restarting them all at once.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Worker processes: roughly one per core plus one, capped because every
+# process keeps its own SQLAlchemy pool (and SQLite allows one writer).
+cores = multiprocessing.cpu_count()
+workers = int(os.environ.get('WEB_CONCURRENCY', min(cores + 1, 8)))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Recycle workers every ~1000 requests, staggered so they don't restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# A 16MB upload over a slow mobile link can take well over a minute; with
+# gthread the heartbeat keeps running while one thread reads it, so a
+# generous timeout only ever applies to genuinely stuck requests.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Heartbeat files on tmpfs avoid worker timeouts when the disk is busy
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')  # e.g. "-" for stdout
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    # The app is loaded (preload_app); drop garbage once and freeze the rest
+    # so forked workers share those pages copy-on-write.
+    if preload_app:
+        gc.collect()
+        gc.freeze()
+
+
+def pre_fork(server, worker):
+    # Also covers workers respawned later by max_requests
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    # Never share pooled DB connections across processes
+    if preload_app:
+        from app import app, db
+        with app.app_context():
+            db.engine.dispose(close=False)
@@ -0,0 +1,153 @@
+"""
+Shared-cache headers for the public catalog pages, and purging them.
+
+/marketplace, /browse and /vehicle/<id> keep no state between requests
+(/browse only needs its ?category=), so an anonymous visitor's request
+carries no session cookie and the response sets none. Those responses are
+marked cacheable by a CDN or reverse proxy:
+
+    Cache-Control: public, max-age=PUBLIC_MAX_AGE, s-maxage=PUBLIC_S_MAXAGE,
+                   stale-while-revalidate=PUBLIC_STALE
+    Vary: Accept-Encoding
+    Surrogate-Key: marketplace | category-<slug> vehicle-<id> ... | vehicle-<id>
+
+Requests that do carry the session cookie (admins, a pending flash message)
+get `Cache-Control: private, no-cache`, so a shared cache never stores
+them; configure the proxy to bypass its cache when that cookie is present.
+
+When a vehicle change is committed, every hook in `purge_hooks` is called
+(in a background thread) with the surrogate keys to purge: the vehicle, its
+old and new category, category-all and marketplace. With
+SURROGATE_PURGE_URL set, a hook POSTs them there as a space-separated
+Surrogate-Key header (Fastly's purge API, or a small endpoint in front of
+nginx), with SURROGATE_PURGE_TOKEN as a bearer token if given.
+"""
+import os
+import threading
+import urllib.request
+
+from flask import g, request, session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app import app
+from models import Vehicle
+
+PUBLIC_ENDPOINTS = {'marketplace', 'browse_vehicles', 'vehicle_detail'}
+PUBLIC_MAX_AGE = int(os.environ.get('PUBLIC_MAX_AGE', 60))
+PUBLIC_S_MAXAGE = int(os.environ.get('PUBLIC_S_MAXAGE', 300))
+PUBLIC_STALE = int(os.environ.get('PUBLIC_STALE', 600))
+
+# Callables taking a set of surrogate keys, run after vehicle changes commit
+purge_hooks = []
+
+
+def has_session_cookie():
+    return app.config['SESSION_COOKIE_NAME'] in request.cookies
+
+
+def is_admin():
+    # Without a cookie the session is never read, so the response doesn't get Vary: Cookie
+    return has_session_cookie() and bool(session.get('admin_logged_in'))
+
+
+def has_pending_flashes():
+    return has_session_cookie() and '_flashes' in session
+
+
+def category_key(category):
+    return 'category-' + category.lower().replace(' ', '-')
+
+
+def vehicle_key(vehicle_id):
+    return f'vehicle-{vehicle_id}'
+
+
+def add_surrogate_keys(*keys):
+    """Tag the page being rendered (kept with it in the page cache)"""
+    g.setdefault('surrogate_keys', set()).update(keys)
+
+
+@app.context_processor
+def _session_flags():
+    # base.html checks these instead of reading the session itself
+    return {'is_admin': is_admin(), 'has_flashes': has_pending_flashes()}
+
+
+@app.after_request
+def _public_cache_headers(response):
+    if request.endpoint not in PUBLIC_ENDPOINTS or request.method not in ('GET', 'HEAD'):
+        return response
+    if has_session_cookie():
+        response.headers['Cache-Control'] = 'private, no-cache'
+    elif response.status_code == 200:
+        response.headers['Cache-Control'] = (f'public, max-age={PUBLIC_MAX_AGE}, s-maxage={PUBLIC_S_MAXAGE}, '
+                                             f'stale-while-revalidate={PUBLIC_STALE}')
+        response.vary.add('Accept-Encoding')
+        keys = g.get('surrogate_keys')
+        if keys:
+            response.headers['Surrogate-Key'] = ' '.join(sorted(keys))
+    else:
+        response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def purge(keys):
+    """Run the purge hooks for `keys` without holding up the caller"""
+    if not purge_hooks or not keys:
+        return
+
+    def run():
+        for hook in list(purge_hooks):
+            try:
+                hook(keys)
+            except Exception as e:
+                app.logger.error(f"Surrogate-key purge failed in {hook.__name__}: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def purge_url_hook(url, token=None):
+    def post_purge(keys):
+        headers = {'Surrogate-Key': ' '.join(sorted(keys))}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        with urllib.request.urlopen(urllib.request.Request(url, method='POST', headers=headers), timeout=5):
+            pass
+    return post_purge
+
+
+if os.environ.get('SURROGATE_PURGE_URL'):
+    purge_hooks.append(purge_url_hook(os.environ['SURROGATE_PURGE_URL'], os.environ.get('SURROGATE_PURGE_TOKEN')))
+
+
+def changed_keys(session):
+    """Surrogate keys of the pages showing the vehicles this flush changed (empty if none)"""
+    keys = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Vehicle):
+            history = inspect(obj).attrs.category.history
+            categories = [obj.category, *history.deleted]
+            keys.update([vehicle_key(obj.id), *(category_key(c) for c in categories if c)])
+    if keys:
+        keys.update(['category-all', 'marketplace'])
+    return keys
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_purge_keys(session, flush_context):
+    keys = changed_keys(session)
+    if keys:
+        session.info.setdefault('surrogate_purge', set()).update(keys)
+
+
+@event.listens_for(Session, 'after_commit')
+def _purge_changed(session):
+    keys = session.info.pop('surrogate_purge', None)
+    if keys:
+        purge(keys)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_purge_keys(session):
+    session.info.pop('surrogate_purge', None)
@@ -0,0 +1,74 @@
+"""
+Time-ordered, compactly stored primary keys.
+
+Vehicle ids are UUIDv7 (RFC 9562): the first 48 bits are the Unix time in
+milliseconds, so new rows append to the right edge of the primary key B-tree
+instead of splitting random pages, and ids sort by creation time.
+
+In Python (URLs, JSON, templates) an id is still the familiar 36-character
+string. `CompactUUID` stores it as 16 raw bytes on SQLite and as the native
+`uuid` type on Postgres. Strings that aren't UUIDs bind as NULL, so a lookup
+for a malformed id simply finds nothing.
+"""
+import random
+import time
+import uuid
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+_system_random = random.SystemRandom()
+
+
+def uuid7(unix_ms=None, rand=None):
+    """Return a UUIDv7 for `unix_ms` (default: now); `rand` makes it reproducible"""
+    if unix_ms is None:
+        unix_ms = time.time_ns() // 1_000_000
+    bits = (rand or _system_random).getrandbits(74)
+    return uuid.UUID(int=(
+        (unix_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76                      # version
+        | (bits >> 62) << 64             # rand_a (12 bits)
+        | 0b10 << 62                     # RFC 4122 variant
+        | bits & ((1 << 62) - 1)         # rand_b (62 bits)
+    ))
+
+
+def new_id():
+    """A new primary key in its string form"""
+    return str(uuid7())
+
+
+def parse_uuid(value):
+    """uuid.UUID for a UUID string/bytes/UUID, or None if it isn't one"""
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        if isinstance(value, (bytes, bytearray)):
+            return uuid.UUID(bytes=bytes(value))
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+class CompactUUID(TypeDecorator):
+    """UUID string in Python, 16 bytes (SQLite) or native uuid (Postgres) in the database"""
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        parsed = parse_uuid(value)
+        if parsed is None:
+            return None
+        return str(parsed) if dialect.name == 'postgresql' else parsed.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(parse_uuid(value))
@@ -0,0 +1,30 @@
+"""
+Normalized lookup keys for plates and VINs.
+
+Staff type "ka-01 ab 1234", the listing says "KA01AB1234" and another one
+"KA 01 AB 1234". Each identifier column has an indexed shadow column holding
+its key: uppercased, letters and digits only. Lookups and duplicate checks
+compare keys, so any spelling finds the listing with one index seek.
+
+The model fills the keys whenever an identifier is assigned (see
+Vehicle._set_identifier_key); bulk inserts have to include them.
+"""
+import re
+
+# identifier column -> shadow key column
+KEY_COLUMNS = {
+    'vin_number': 'vin_key',
+    'registration_number': 'registration_key',
+    'vehicle_number': 'vehicle_number_key',
+}
+PLATE_COLUMNS = ['registration_number', 'vehicle_number']
+LABELS = {'vin_number': 'VIN', 'registration_number': 'Registration number', 'vehicle_number': 'Vehicle number'}
+
+_separators = re.compile(r'[^0-9A-Z]+')
+
+
+def identifier_key(value):
+    """'ka-01 ab 1234' -> 'KA01AB1234'; None when nothing is left"""
+    if value is None:
+        return None
+    return _separators.sub('', str(value).upper()) or None
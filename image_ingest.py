@@ -0,0 +1,84 @@
+"""
+Normalization of uploaded photos before they are stored.
+
+Most uploads come straight from phones: a large EXIF block (GPS position
+included), an orientation flag instead of upright pixels, and far more
+resolution than any page shows. `save_photo(file, path)` (used by
+routes.save_uploaded_files) stores them
+
+- upright (the EXIF orientation is applied to the pixels),
+- without EXIF, XMP or comments (the ICC colour profile is kept),
+- with the long edge at most UPLOAD_MAX_EDGE pixels (default 2400, twice the
+  detail carousel's width), and
+- re-encoded: JPEG at quality 85, PNG optimized, in the format they came in
+  (multi-picture JPEGs, MPO, as a plain JPEG of their first picture).
+
+A file Pillow can't read is rejected. GIFs are stored as uploaded. The
+stored image's size and inline placeholder are returned for image_info (see
+image_placeholders). With
+UPLOAD_ORIGINALS_FOLDER set in the app config, the untouched upload is first
+kept there under the same name (point it at cheaper storage, e.g. a mounted
+bucket). Without Pillow installed, uploads are stored unchanged and nothing
+is returned.
+"""
+import math
+import os
+
+from app import app
+from image_placeholders import describe
+from image_resize import RESIZING
+
+if RESIZING:
+    from PIL import Image, ImageOps
+
+UPLOAD_MAX_EDGE = int(os.environ.get('UPLOAD_MAX_EDGE', 2400))
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+}
+
+
+def _keep_original(file, path):
+    originals = app.config.get('UPLOAD_ORIGINALS_FOLDER')
+    if originals:
+        os.makedirs(originals, exist_ok=True)
+        file.save(os.path.join(originals, os.path.basename(path)))
+        file.stream.seek(0)
+
+
+def save_photo(file, path):
+    """Store the uploaded FileStorage `file` at `path`, normalized; returns its ImageInfo fields (or None)"""
+    if not RESIZING:
+        _keep_original(file, path)
+        file.save(path)
+        return None
+
+    # Check the upload before keeping anything of it
+    with Image.open(file.stream) as image:
+        # Pillow names multi-picture JPEGs (phone portrait/depth shots) MPO; the first picture is the photo
+        image_format = 'JPEG' if image.format == 'MPO' else image.format
+    if image_format not in SAVE_OPTIONS and image_format != 'GIF':
+        raise ValueError(f"unsupported image format {image_format}")
+    file.stream.seek(0)
+    _keep_original(file, path)
+
+    with Image.open(file.stream) as image:
+        if image_format == 'GIF':
+            info = describe(ImageOps.exif_transpose(image))
+            file.stream.seek(0)
+            file.save(path)
+            return info
+        scale = UPLOAD_MAX_EDGE / max(image.size)
+        if scale < 1:
+            # Let the JPEG decoder skip detail the cap would throw away anyway
+            image.draft('RGB', (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+        icc_profile = image.info.get('icc_profile')
+        image = ImageOps.exif_transpose(image)
+    image.thumbnail((UPLOAD_MAX_EDGE, UPLOAD_MAX_EDGE), Image.LANCZOS)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+        image = image.convert('RGB')
+    # Nothing from the camera carries over; the colour profile is passed back in below
+    image.info = {key: value for key, value in image.info.items() if key == 'transparency'}
+    options = dict(SAVE_OPTIONS[image_format], **({'icc_profile': icc_profile} if icc_profile else {}))
+    image.save(path, image_format, **options)
+    return describe(image)
@@ -0,0 +1,125 @@
+"""
+Reserved sizes and blurred placeholders for listing photos.
+
+When an upload is stored (image_ingest.save_photo) its upright pixel size
+and a ~PLACEHOLDER_EDGE px copy, encoded as an inline data: URI of a couple
+of hundred bytes, go into the image_info table (models.ImageInfo).
+Templates write their <img> attributes with the `image_attrs` Jinja
+global, which adds
+
+- width/height, so the browser reserves the box before the file arrives
+  (the crop size for cropped sizes, the scaled size for width-only ones),
+- the placeholder as the element's background, so the box shows a blurred
+  preview instead of an empty gap,
+- loading="lazy" and decoding="async" (pass lazy=False for the image that
+  is on screen first), and
+- an onerror that swaps in a transparent inline GIF, so a missing file
+  leaves the placeholder showing without another request.
+
+`image_info(filenames)` looks a listing's rows up in one query; rows never
+change (upload names are never reused), so each worker keeps up to
+IMAGE_INFO_CACHE_SIZE of them (default 20000). Uploads stored before the
+table existed render without size or placeholder until `flask image-info`
+fills them in.
+"""
+import base64
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from markupsafe import Markup, escape
+
+from app import app
+from image_resize import IMAGE_SIZES, RESIZING, image_url
+from models import ImageInfo, get_image_info
+from write_queue import run_write
+
+if RESIZING:
+    from PIL import Image, ImageOps
+
+PLACEHOLDER_EDGE = 16
+PLACEHOLDER_QUALITY = 40
+IMAGE_INFO_CACHE_SIZE = int(os.environ.get('IMAGE_INFO_CACHE_SIZE', 20000))
+# Shown if the file itself fails to load; transparent, so the placeholder or background colour stays visible
+BLANK_IMAGE = 'data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+BACKGROUND = '#e9ecef'
+
+_cache = OrderedDict()  # filename -> get_image_info row
+_lock = threading.Lock()
+
+
+def placeholder_uri(image):
+    """data: URI of a PLACEHOLDER_EDGE px copy of `image` (WebP when Pillow can write it, else JPEG)"""
+    scale = PLACEHOLDER_EDGE / max(image.size)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    tiny = image.convert('RGBA').resize(size, Image.BOX)
+    # Transparent areas show as white, as on the page behind a PNG
+    flat = Image.new('RGB', size, 'white')
+    flat.paste(tiny, mask=tiny)
+    Image.init()
+    image_format = 'WEBP' if 'WEBP' in Image.SAVE else 'JPEG'
+    data = io.BytesIO()
+    flat.save(data, image_format, quality=PLACEHOLDER_QUALITY)
+    return f"data:image/{image_format.lower()};base64,{base64.b64encode(data.getvalue()).decode()}"
+
+
+def describe(image):
+    """ImageInfo fields for an upright `image`"""
+    return {'width': image.width, 'height': image.height, 'placeholder': placeholder_uri(image)}
+
+
+def describe_file(path):
+    """ImageInfo fields for the upload at `path`, as /img/ shows it (upright)"""
+    with Image.open(path) as image:
+        return describe(ImageOps.exif_transpose(image))
+
+
+def record(infos):
+    """Store {filename: ImageInfo fields} for newly saved uploads"""
+    if infos:
+        run_write(lambda session: session.add_all(
+            [ImageInfo(filename=filename, **fields) for filename, fields in infos.items()]))
+
+
+@app.template_global()
+def image_info(filenames):
+    """{filename: row with width, height, placeholder} for those of `filenames` that have one"""
+    found, missing = {}, []
+    with _lock:
+        for filename in filenames:
+            if filename in _cache:
+                _cache.move_to_end(filename)
+                found[filename] = _cache[filename]
+            else:
+                missing.append(filename)
+    if missing:
+        loaded = get_image_info(missing)
+        found.update(loaded)
+        with _lock:
+            _cache.update(loaded)
+            while len(_cache) > IMAGE_INFO_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return found
+
+
+@app.template_global()
+def image_attrs(filename, size_name, info=None, lazy=True, style=''):
+    """src, size, placeholder and loading attributes for an <img> of `filename` at IMAGE_SIZES[size_name];
+    `info` is the image_info() result for the listing"""
+    width, height = IMAGE_SIZES[size_name]
+    row = (info or {}).get(filename)
+    attrs = {'src': image_url(filename, size_name)}
+    if not height and row:
+        # Width-only sizes keep the aspect ratio and never upscale
+        width = min(width, row.width)
+        height = max(1, round(row.height * width / row.width))
+    if height:
+        attrs.update(width=width, height=height)
+    if lazy:
+        attrs['loading'] = 'lazy'
+    attrs['decoding'] = 'async'
+    background = f"{BACKGROUND} url({row.placeholder}) center / cover no-repeat" if row else BACKGROUND
+    attrs['style'] = f"{style} background: {background};".lstrip()
+    attrs['onerror'] = f"this.onerror=null; this.src='{BLANK_IMAGE}';"
+    return Markup(' '.join(f'{name}="{escape(value)}"' for name, value in attrs.items()))
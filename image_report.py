@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Image format report: bytes the /img/ endpoint saves by sending WebP or AVIF
+instead of the uploads' own format (JPEG/PNG/GIF).
+
+Every upload is re-encoded at full size and at each of IMAGE_SIZES with the
+same settings the endpoint uses; nothing is written to the image cache.
+
+Usage:
+    python3 image_report.py
+    python3 image_report.py --uploads static/uploads --sizes original card
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+from app import app  # before image_resize, which the app's routes import
+from image_resize import ENCODE_OPTIONS, IMAGE_SIZES, MODERN_FORMATS, RESIZING, encode, offered_formats, resized
+
+
+def encoded_size(image, image_format):
+    buffer = io.BytesIO()
+    encode(image, buffer, image_format)
+    return buffer.tell()
+
+
+def measure(uploads, size_names, formats):
+    """size name -> {'files': n, format: total bytes}; 'source' is the upload's own format"""
+    totals = {name: dict({'files': 0, 'source': 0}, **{image_format: 0 for image_format in formats})
+              for name in size_names}
+    skipped = []
+    for filename in sorted(os.listdir(uploads)):
+        path = os.path.join(uploads, filename)
+        if not os.path.isfile(path):
+            continue
+        for name in size_names:
+            width, height = IMAGE_SIZES.get(name, (None, None))
+            try:
+                image, source_format = resized(path, width, height)
+                sizes = {image_format: encoded_size(image, image_format) for image_format in formats}
+                # The original row compares against the file as stored; resized rows against the fallback copy
+                sizes['source'] = os.path.getsize(path) if width is None else encoded_size(image, source_format)
+            except OSError as e:
+                skipped.append(f"{filename}: {e}")
+                break
+            totals[name]['files'] += 1
+            for key, size in sizes.items():
+                totals[name][key] += size
+    return totals, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare upload sizes as served against WebP and AVIF')
+    parser.add_argument('--uploads', default=app.config['UPLOAD_FOLDER'], help='upload directory to measure')
+    parser.add_argument('--sizes', nargs='+', default=['original', *IMAGE_SIZES],
+                        choices=['original', *IMAGE_SIZES], help='sizes to compare')
+    parser.add_argument('--output', help='report path (default: image_report_<timestamp>.json)')
+    args = parser.parse_args()
+
+    if not RESIZING:
+        print("❌ Pillow is not installed")
+        return 1
+    formats = [MODERN_FORMATS[mimetype][0] for mimetype in offered_formats()]
+    totals, skipped = measure(args.uploads, args.sizes, formats)
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    report = {
+        'timestamp': timestamp,
+        'uploads': args.uploads,
+        'formats': {image_format: ENCODE_OPTIONS[image_format] for image_format in formats},
+        'bytes': totals,
+        'skipped': skipped,
+    }
+    output = args.output or f"image_report_{timestamp}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("=" * 60)
+    print("IMAGE FORMAT REPORT")
+    print("=" * 60)
+    for name, sizes in totals.items():
+        line = f"  {name:<9} {sizes['files']:>4} files  as uploaded {sizes['source'] / 1024:>9.0f} KB"
+        for image_format in formats:
+            saved = 1 - sizes[image_format] / sizes['source'] if sizes['source'] else 0
+            line += f"   {image_format} {sizes[image_format] / 1024:>8.0f} KB ({saved:>4.0%} saved)"
+        print(line)
+    if skipped:
+        print(f"Skipped {len(skipped)} files that aren't readable images")
+    print(f"📄 Report written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
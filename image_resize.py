@@ -0,0 +1,205 @@
+"""
+Resized copies of uploaded photos, cached on disk.
+
+`/img/<w>x<h>/<filename>` (routes.resized_image) serves an upload from
+UPLOAD_FOLDER scaled to one of IMAGE_SIZES: cropped to fill w x h, or, with
+h = 0, scaled to width w keeping its aspect ratio. Templates get the URL
+from the `image_url(filename, size_name)` Jinja global. Any other size is a
+404, so the resizer only ever does a handful of jobs per photo, and at most
+RESIZE_CONCURRENCY resizes run at once per worker.
+
+Browsers whose Accept header lists image/avif or image/webp get the copy
+in that format (AVIF first, when Pillow has an AVIF encoder; IMAGE_FORMATS
+narrows the list), everyone else gets the upload's own format. Responses
+carry Vary: Accept.
+
+The first request writes the copy to IMAGE_CACHE_DIR/<w>x<h>/<filename>
+(with .avif/.webp appended for those; default instance/image_cache); later
+ones are plain send_file responses with ETag/Last-Modified and Range
+support. Upload names are unique and never reused, so copies are never
+stale. The directory is kept under IMAGE_CACHE_MB (default 512) by deleting
+the least recently served copies; hits record their time as the file's
+access time, leaving the mtime (and so the ETag) alone.
+
+image_report.py shows how many bytes the modern formats save on the
+current uploads.
+
+Without Pillow installed, /img/ redirects to the original file.
+"""
+import functools
+import os
+import threading
+import time
+
+from flask import url_for
+
+from app import app
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional: without it the originals are served
+    Image = ImageOps = None
+
+RESIZING = Image is not None
+
+# name -> (width, height); height 0 keeps the aspect ratio
+IMAGE_SIZES = {
+    'admin': (80, 60),        # admin inventory table
+    'thumb': (240, 120),      # thumbnail strip on the detail page
+    'card': (480, 240),       # listing cards
+    'detail': (1200, 0),      # detail page carousel
+}
+ALLOWED_SIZES = set(IMAGE_SIZES.values())
+RESIZE_CONCURRENCY = int(os.environ.get('RESIZE_CONCURRENCY', 2))
+# Accept type -> (Pillow format, cache file suffix) for browsers that list it, best first
+MODERN_FORMATS = {'image/avif': ('AVIF', '.avif'), 'image/webp': ('WEBP', '.webp')}
+IMAGE_FORMATS = os.environ.get('IMAGE_FORMATS', 'avif,webp').lower().split(',')
+ENCODE_OPTIONS = {
+    'JPEG': {'quality': 82, 'optimize': True, 'progressive': True},
+    'WEBP': {'quality': 80, 'method': 4},
+    'AVIF': {'quality': 60, 'speed': 6},
+}
+# Evict down to this share of the budget, so a full cache doesn't evict on every miss
+EVICT_TO = 0.9
+
+_EXIF_ORIENTATION = 0x0112
+_ROTATED = {5, 6, 7, 8}  # orientations that swap width and height
+
+
+class DerivativeCache:
+    """Resized files under one directory, at most max_bytes, least recently used evicted first"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.resizes = 0
+        self._total = None  # bytes on disk, counted on first use
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(RESIZE_CONCURRENCY)
+
+    def path(self, width, height, filename, mimetype=None):
+        suffix = MODERN_FORMATS[mimetype][1] if mimetype else ''
+        return os.path.join(self.directory, f'{width}x{height}', filename + suffix)
+
+    def get(self, source, width, height, mimetype=None):
+        """Path of `source` resized to width x height, as `mimetype` (one of MODERN_FORMATS) or in its
+        own format, resizing it now if it isn't cached"""
+        path = self.path(width, height, os.path.basename(source), mimetype)
+        if self._touch(path):
+            return path
+        with self._slots:
+            if self._touch(path):  # resized by another request while this one waited
+                return path
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            try:
+                image, image_format = resized(source, width, height)
+                encode(image, tmp_path, MODERN_FORMATS[mimetype][0] if mimetype else image_format)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        self._added(path)
+        return path
+
+    def clear(self):
+        with self._lock:
+            for path, _ in self._files():
+                os.remove(path)
+            self._total = 0
+            self.resizes = 0
+
+    def _touch(self, path):
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _files(self):
+        """(path, stat) of every cached file"""
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for size_dir in os.scandir(self.directory):
+            if size_dir.is_dir():
+                files += [(entry.path, entry.stat()) for entry in os.scandir(size_dir.path)
+                          if entry.is_file() and not entry.name.endswith('.tmp')]
+        return files
+
+    def _added(self, path):
+        with self._lock:
+            self.resizes += 1
+            if self._total is None:
+                self._total = sum(stat.st_size for _, stat in self._files())
+            else:
+                self._total += os.path.getsize(path)
+            if self._total > self.max_bytes:
+                self._evict(keep=path)
+
+    def _evict(self, keep):
+        # Recount from disk: other workers add and evict too
+        files = sorted(self._files(), key=lambda item: item[1].st_atime)
+        total = sum(stat.st_size for _, stat in files)
+        for path, stat in files:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            if path == keep:  # about to be served
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+        self._total = total
+
+
+@functools.cache
+def offered_formats():
+    """The MODERN_FORMATS enabled by IMAGE_FORMATS that this Pillow can encode, best first"""
+    Image.init()
+    return [mimetype for mimetype, (image_format, _) in MODERN_FORMATS.items()
+            if image_format.lower() in IMAGE_FORMATS and image_format in Image.SAVE]
+
+
+def negotiate(accept):
+    """The best modern format the request's Accept header names explicitly (not via */*), or None"""
+    accepted = {value for value, quality in accept if quality > 0}
+    return next((mimetype for mimetype in offered_formats() if mimetype in accepted), None)
+
+
+def resized(source, width, height):
+    """(image, source format) of `source` upright and scaled to width x height, cropped to fill; height 0
+    scales to width, width None keeps the full size"""
+    with Image.open(source) as image:
+        image_format = image.format
+        if width:
+            rotated = image.getexif().get(_EXIF_ORIENTATION) in _ROTATED
+            # Let the JPEG decoder downscale by 1/2..1/8 while it reads, as long as the result stays large enough
+            box = (width, height or 1)
+            image.draft('RGB', box[::-1] if rotated else box)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA' if image.mode in ('LA', 'PA') or 'transparency' in image.info else 'RGB')
+        if width and height:
+            image = ImageOps.fit(image, (width, height), Image.LANCZOS)
+        elif width:
+            image.thumbnail((width, image.height), Image.LANCZOS)
+        return image, image_format
+
+
+def encode(image, target, image_format):
+    """Save `image` to a path or file object as `image_format`"""
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(target, image_format, **ENCODE_OPTIONS.get(image_format, {}))
+
+
+derivatives = DerivativeCache(os.environ.get('IMAGE_CACHE_DIR', os.path.join(app.instance_path, 'image_cache')),
+                              max_bytes=int(os.environ.get('IMAGE_CACHE_MB', 512)) * 1024 * 1024)
+
+
+@app.template_global()
+def image_url(filename, size_name):
+    width, height = IMAGE_SIZES[size_name]
+    return url_for('resized_image', width=width, height=height, filename=filename)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Reproducible load benchmark for the public catalog and the admin JSON API.
+
+Optionally seeds a synthetic catalog (see synthetic_catalog.py), then drives
+/marketplace, /browse (with and without search), /vehicle/<id> and
+/admin/api/vehicles with concurrent virtual users against a running server.
+The optional admin_write endpoint toggles vehicle status to measure write
+contention. Throughput and p50/p95/p99 latency are written to a JSON report that can be
+compared between versions.
+
+Usage:
+    gunicorn --bind 0.0.0.0:5000 wsgi:application &
+    python3 load_test.py --rows 100000 --truncate --users 32 --duration 60
+    python3 load_test.py --compare load_test_report_A.json load_test_report_B.json
+"""
+
+import argparse
+import json
+import logging
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+DEFAULT_MIX = {
+    'marketplace': 0.15,
+    'browse': 0.3,
+    'browse_search': 0.2,
+    'vehicle_detail': 0.3,
+    'admin_api': 0.05,
+    'admin_write': 0,  # opt in with --mix '{"admin_write": 0.2}'
+}
+CATEGORIES = ['Cars', 'Trucks', 'Commercial Vehicles', 'all']
+SEARCH_TERMS = ['Swift', 'Creta', 'Tata', 'Mahindra', 'Toyota', 'Thar', 'Ace', 'Dost', 'BMW', 'Nexon']
+ADMIN_CREDENTIALS = {'username': 'abc', 'password': '123'}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples, elapsed):
+    """Turn (latency_seconds, status) samples into a report entry"""
+    latencies = sorted(s[0] * 1000 for s in samples)
+    errors = sum(1 for s in samples if s[1] is None or s[1] >= 400)
+    redirects = sum(1 for s in samples if s[1] is not None and 300 <= s[1] < 400)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'redirects': redirects,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else None,
+        'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+        'max_ms': round(latencies[-1], 2) if latencies else None,
+    }
+
+
+class VirtualUser(threading.Thread):
+    """One simulated visitor issuing requests until the deadline"""
+
+    def __init__(self, index, tester):
+        super().__init__(name=f"vu-{index}", daemon=True)
+        self.tester = tester
+        self.rng = random.Random(tester.seed * 1000 + index)
+        self.session = requests.Session()
+        self.admin_session = None
+        self.samples = {name: [] for name in tester.mix}
+
+    def _request(self, name, session, path, params=None, method='GET'):
+        started = time.perf_counter()
+        try:
+            response = session.request(method, f"{self.tester.base_url}{path}", params=params,
+                                       allow_redirects=False, timeout=self.tester.timeout)
+            response.content  # make sure the full body is read
+            status = response.status_code
+        except requests.RequestException:
+            status = None
+        if time.perf_counter() < self.tester.deadline and self.tester.measuring.is_set():
+            self.samples[name].append((time.perf_counter() - started, status))
+
+    def _login_admin(self):
+        self.admin_session = requests.Session()
+        self.admin_session.post(f"{self.tester.base_url}/admin/auth", data=ADMIN_CREDENTIALS,
+                                allow_redirects=False, timeout=self.tester.timeout)
+
+    def run(self):
+        names, weights = zip(*self.tester.mix.items())
+        while time.perf_counter() < self.tester.deadline:
+            name = self.rng.choices(names, weights=weights, k=1)[0]
+            if name == 'marketplace':
+                self._request(name, self.session, '/marketplace')
+            elif name == 'browse':
+                self._request(name, self.session, '/browse', {'category': self.rng.choice(CATEGORIES)})
+            elif name == 'browse_search':
+                self._request(name, self.session, '/browse',
+                              {'category': 'all', 'search': self.rng.choice(SEARCH_TERMS)})
+            elif name == 'vehicle_detail':
+                if self.tester.vehicle_ids:
+                    self._request(name, self.session, f"/vehicle/{self.rng.choice(self.tester.vehicle_ids)}")
+            elif name == 'admin_api':
+                if self.admin_session is None:
+                    self._login_admin()
+                self._request(name, self.admin_session, '/admin/api/vehicles')
+            elif name == 'admin_write':
+                if self.admin_session is None:
+                    self._login_admin()
+                if self.tester.vehicle_ids:
+                    self._request(name, self.admin_session,
+                                  f"/admin/toggle_status/{self.rng.choice(self.tester.vehicle_ids)}", method='POST')
+
+
+class LoadTester:
+    def __init__(self, base_url, users, duration, warmup, mix, seed=42, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.users = users
+        self.duration = duration
+        self.warmup = warmup
+        self.mix = mix
+        self.seed = seed
+        self.timeout = timeout
+        self.vehicle_ids = []
+        self.deadline = 0
+        self.measuring = threading.Event()
+
+    def load_vehicle_ids(self, sample_size=1000):
+        """Sample listing ids straight from the configured database"""
+        from sqlalchemy import func, select
+        from app import app, db
+        from models import Vehicle
+
+        with app.app_context():
+            self.vehicle_ids = list(db.session.scalars(
+                select(Vehicle.id).order_by(func.random()).limit(sample_size)
+            ))
+        return len(self.vehicle_ids)
+
+    def run(self):
+        started = time.perf_counter()
+        self.deadline = started + self.warmup + self.duration
+        workers = [VirtualUser(i, self) for i in range(self.users)]
+        for worker in workers:
+            worker.start()
+
+        time.sleep(self.warmup)
+        self.measuring.set()
+        measured_from = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - measured_from
+
+        endpoints = {}
+        everything = []
+        for name in self.mix:
+            samples = [s for worker in workers for s in worker.samples[name]]
+            everything.extend(samples)
+            endpoints[name] = summarize(samples, elapsed)
+        return {'elapsed_seconds': round(elapsed, 3), 'overall': summarize(everything, elapsed), 'endpoints': endpoints}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_reports(baseline_path, candidate_path):
+    """Print per-endpoint throughput and latency deltas between two reports"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(candidate_path) as f:
+        candidate = json.load(f)
+
+    print(f"{'endpoint':<16}{'metric':<16}{'baseline':>12}{'candidate':>12}{'change':>10}")
+    for name, after in candidate['results']['endpoints'].items():
+        before = baseline['results']['endpoints'].get(name)
+        if not before:
+            continue
+        for metric in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            old, new = before.get(metric), after.get(metric)
+            if not old or new is None:
+                continue
+            print(f"{name:<16}{metric:<16}{old:>12}{new:>12}{(new - old) / old * 100:>+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Catalog load benchmark')
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--users', type=int, default=16, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured warm-up seconds')
+    parser.add_argument('--rows', type=int, help='seed this many synthetic vehicles before the run')
+    parser.add_argument('--truncate', action='store_true', help='delete existing vehicles before seeding')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mix', help='JSON object overriding the endpoint weights')
+    parser.add_argument('--output', help='report path (default: load_test_report_<timestamp>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'), help='compare two reports and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return 0
+
+    mix = dict(DEFAULT_MIX, **json.loads(args.mix)) if args.mix else dict(DEFAULT_MIX)
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+    # Importing the app turns on debug logging; keep per-request noise out of the run
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+    seeding = None
+    if args.rows:
+        from app import app
+        from synthetic_catalog import seed_catalog
+        with app.app_context():
+            seeding = seed_catalog(args.rows, seed=args.seed, truncate=args.truncate)
+        print(f"✅ Seeded {seeding['rows']} vehicles in {seeding['seconds']}s")
+
+    tester = LoadTester(args.base_url, args.users, args.duration, args.warmup, mix, seed=args.seed)
+    if ('vehicle_detail' in mix or 'admin_write' in mix) and not tester.load_vehicle_ids():
+        print("⚠ No vehicles found in the database; /vehicle/<id> will be skipped")
+
+    print(f"🚀 Running {args.users} virtual users for {args.duration}s against {tester.base_url}")
+    results = tester.run()
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    report = {
+        'timestamp': timestamp,
+        'git_revision': git_revision(),
+        'config': {
+            'base_url': tester.base_url,
+            'users': args.users,
+            'duration_seconds': args.duration,
+            'warmup_seconds': args.warmup,
+            'seed': args.seed,
+            'mix': mix,
+            'seeded_rows': seeding['rows'] if seeding else None,
+            'sampled_vehicle_ids': len(tester.vehicle_ids),
+        },
+        'seeding': seeding,
+        'results': results,
+    }
+    output = args.output or f"load_test_report_{timestamp}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 72)
+    print(f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, stats in list(results['endpoints'].items()) + [('overall', results['overall'])]:
+        print(f"{name:<16}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput_rps'] or 0:>10}"
+              f"{stats['p50_ms'] or 0:>9}{stats['p95_ms'] or 0:>9}{stats['p99_ms'] or 0:>9}")
+    print("=" * 72)
+    print(f"📄 Report written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,14 @@
 from app import app
 
-# Initialize sample data on startup
-with app.app_context():
-    try:
-        from models import initialize_sample_data
-        initialize_sample_data()
-    except Exception as e:
-        app.logger.error(f"Error initializing sample data: {e}")
+# Schema and sample data are no longer created at import time; run
+# `flask db upgrade` and `flask seed` once per deployment instead.
 
 if __name__ == '__main__':
+    from flask_migrate import upgrade
+    from models import initialize_sample_data
+
+    # Local development convenience: bring the database up to date first
+    with app.app_context():
+        upgrade()
+        initialize_sample_data()
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+In-process microbenchmarks for model and rendering hot paths.
+
+Runs against an in-memory SQLite database (FLASK_CONFIG=testing) with the
+Flask test client, times each case over many repeats and compares the result
+with a stored baseline. Exits non-zero when a case regresses beyond the
+threshold.
+
+Usage:
+    python3 microbenchmarks.py --save-baseline         # record a baseline
+    python3 microbenchmarks.py                         # compare against it
+    python3 microbenchmarks.py --vehicles 500 --threshold 0.15
+"""
+
+import os
+
+os.environ.setdefault('FLASK_CONFIG', 'testing')
+
+import argparse
+import gc
+import json
+import logging
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from flask import render_template
+from sqlalchemy import insert
+
+from app import app, db
+from forms import VehicleForm
+from models import Vehicle, get_all_vehicles
+from routes import BROWSE_RANGES, BROWSE_SORTS
+from synthetic_catalog import generate_vehicle_rows
+
+BASELINE_FILE = 'microbenchmark_baseline.json'
+
+VALID_FORM = {
+    'title': '2021 Hyundai Creta SX', 'category': 'Cars', 'make': 'Hyundai', 'model': 'Creta',
+    'year': '2021', 'price': '1450000', 'mileage': '32000', 'description': 'Benchmark listing',
+    'status': 'available', 'fuel_type': 'Petrol', 'transmission': 'Automatic', 'drivetrain': 'FWD',
+    'number_of_owners': '1', 'contact_name': 'Friendscars', 'contact_phone': '+91 9876543210',
+    'contact_email': 'sales@example.com', 'condition_rating': 'Very Good',
+}
+
+
+def measure(func, repeats, min_time=0.05):
+    """Time `func` like timeit.autorange: calibrate a loop count, then repeat.
+
+    Returns per-call timings in microseconds, one sample per repeat.
+    """
+    func()  # warm caches (template compilation, ORM attribute loading)
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= min_time:
+            break
+        number *= 2
+
+    samples = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - started) / number * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return number, samples
+
+
+def describe(number, samples):
+    quartiles = statistics.quantiles(samples, n=4)
+    return {
+        'loops': number,
+        'repeats': len(samples),
+        'min_us': round(min(samples), 3),
+        'median_us': round(statistics.median(samples), 3),
+        'mean_us': round(statistics.fmean(samples), 3),
+        'stdev_us': round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        'q1_us': round(quartiles[0], 3),
+        'q3_us': round(quartiles[2], 3),
+    }
+
+
+def seed(count):
+    db.create_all()
+    db.session.execute(insert(Vehicle), list(generate_vehicle_rows(count, upload_folder=app.config['UPLOAD_FOLDER'])))
+    db.session.commit()
+
+
+def build_cases(client, vehicles):
+    """Return {name: zero-argument callable} for every hot path"""
+    one = vehicles[0]
+
+    def to_dict_all():
+        for vehicle in vehicles:
+            vehicle.to_dict()
+
+    def images_list_all():
+        for vehicle in vehicles:
+            vehicle.images_list
+
+    def admin_api_vehicles():
+        response = client.get('/admin/api/vehicles')
+        assert response.status_code == 200
+
+    def vehicle_form_validate():
+        with app.test_request_context('/admin/add_vehicle', method='POST', data=VALID_FORM):
+            form = VehicleForm()
+            assert form.validate(), form.errors
+
+    def vehicle_form_construct():
+        with app.test_request_context('/admin/add_vehicle_page'):
+            VehicleForm()
+
+    def render_browse():
+        with app.test_request_context('/browse?category=all'):
+            app.preprocess_request()
+            render_template('browse_vehicles.html', vehicles=vehicles,
+                            categories=['Cars', 'Trucks', 'Commercial Vehicles'],
+                            current_category='all', search='', feature_tags=[], selected_features=[],
+                            sorts=BROWSE_SORTS, sort='newest', ranges=dict.fromkeys(BROWSE_RANGES),
+                            total=len(vehicles), page=1, pages=1, page_url=lambda number: '')
+
+    def render_detail():
+        with app.test_request_context(f'/vehicle/{one.id}'):
+            app.preprocess_request()
+            render_template('vehicle_detail.html', vehicle=one)
+
+    return {
+        'vehicle_to_dict': to_dict_all,
+        'vehicle_images_list': images_list_all,
+        'admin_api_vehicles': admin_api_vehicles,
+        'vehicle_form_construct': vehicle_form_construct,
+        'vehicle_form_validate': vehicle_form_validate,
+        'render_browse_vehicles': render_browse,
+        'render_vehicle_detail': render_detail,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return names of cases that regressed beyond the threshold.
+
+    A case only counts as a regression when the median slowed down by more
+    than `threshold` AND the interquartile ranges no longer overlap, so that
+    ordinary run-to-run noise does not fail the build.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        ratio = current['median_us'] / previous['median_us']
+        current['baseline_median_us'] = previous['median_us']
+        current['change'] = round(ratio - 1, 4)
+        if ratio > 1 + threshold and current['q1_us'] > previous['q3_us']:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks for model and rendering hot paths')
+    parser.add_argument('--vehicles', type=int, default=200, help='number of vehicles per case (N)')
+    parser.add_argument('--repeats', type=int, default=15)
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed median slowdown (0.10 = 10%%)')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--only', nargs='*', help='run only these cases')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    app.logger.setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = {}
+    with app.app_context():
+        seed(args.vehicles)
+        vehicles = get_all_vehicles()
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['admin_logged_in'] = True
+
+        for name, func in build_cases(client, vehicles).items():
+            if args.only and name not in args.only:
+                continue
+            number, samples = measure(func, args.repeats)
+            results[name] = describe(number, samples)
+            print(f"{name:<26} median {results[name]['median_us']:>12.1f} µs  "
+                  f"IQR [{results[name]['q1_us']:.1f}, {results[name]['q3_us']:.1f}]")
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'vehicles': args.vehicles,
+        'results': results,
+    }
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Baseline written to {args.baseline}")
+        return 0
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('vehicles') != args.vehicles:
+            print(f"⚠ Baseline was recorded with {baseline.get('vehicles')} vehicles; comparison may be meaningless")
+        regressions = compare(results, baseline['results'], args.threshold)
+        for name, current in results.items():
+            if 'change' in current:
+                print(f"{name:<26} {current['change'] * 100:+7.1f}% vs baseline")
+    else:
+        print(f"⚠ No baseline at {args.baseline}; run with --save-baseline first")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if regressions:
+        print(f"❌ Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
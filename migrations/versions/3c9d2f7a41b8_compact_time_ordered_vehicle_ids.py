@@ -0,0 +1,92 @@
+"""compact time-ordered vehicle ids
+
+Rewrites vehicles.id from random uuid4 strings (VARCHAR(36)) to UUIDv7 keys
+stored as 16 bytes (native uuid on Postgres). Each new key embeds the row's
+created_at, so the table ends up in creation order. Each replaced id is
+recorded in legacy_vehicle_ids, so old /vehicle/<uuid4> links redirect to
+the listing's new address; the table outlives a downgrade, so the links
+keep working across a downgrade/upgrade round trip.
+
+Image files are named <random uuid>_<original name> and are not keyed by
+vehicle id, and no other table references vehicles.id, so nothing else needs
+rewriting.
+
+Revision ID: 3c9d2f7a41b8
+Revises: e8a0b0a79af6
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+from id_types import CompactUUID, parse_uuid, uuid7
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9d2f7a41b8'
+down_revision = 'e8a0b0a79af6'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _rebuild_vehicles(id_type, convert_id, legacy_ids=None):
+    """Copy vehicles into a table with a new id column type, then swap them;
+    ids that change are recorded in `legacy_ids` if given"""
+    bind = op.get_bind()
+    old = sa.Table('vehicles', sa.MetaData(), autoload_with=bind)
+    new = sa.Table('vehicles_rebuild', sa.MetaData(), *[
+        sa.Column('id', id_type, primary_key=True) if column.name == 'id'
+        else sa.Column(column.name, column.type, nullable=column.nullable)
+        for column in old.columns
+    ])
+    new.create(bind)
+
+    result = bind.execute(sa.select(old).order_by(old.c.created_at).execution_options(yield_per=BATCH_SIZE))
+    for rows in result.mappings().partitions():
+        batch = [dict(row, id=convert_id(row)) for row in rows]
+        bind.execute(new.insert(), batch)
+        moved = [{'legacy_id': row['id'], 'vehicle_id': copy['id']}
+                 for row, copy in zip(rows, batch) if copy['id'] != row['id']] if legacy_ids is not None else []
+        if moved:
+            bind.execute(legacy_ids.insert(), moved)
+
+    op.drop_table('vehicles')
+    op.rename_table('vehicles_rebuild', 'vehicles')
+
+
+def _uuid7_for(row):
+    existing = parse_uuid(row['id'])
+    if existing is not None and existing.version == 7:
+        return str(existing)  # kept across a downgrade/upgrade round trip
+    created_at = row['created_at'] or datetime.utcnow()
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return str(uuid7(int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1000)))
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    id_type = inspector.get_columns('vehicles')[0]['type']
+    if not isinstance(id_type, sa.String):
+        return  # already converted
+    # Left in place by downgrade(), so the mappings of an earlier upgrade still redirect
+    if not inspector.has_table('legacy_vehicle_ids'):
+        op.create_table('legacy_vehicle_ids',
+        sa.Column('legacy_id', sa.String(length=36), nullable=False),
+        sa.Column('vehicle_id', CompactUUID(), nullable=False),
+        sa.PrimaryKeyConstraint('legacy_id')
+        )
+    legacy_ids = sa.table('legacy_vehicle_ids',
+                          sa.column('legacy_id', sa.String), sa.column('vehicle_id', CompactUUID()))
+    _rebuild_vehicles(CompactUUID(), _uuid7_for, legacy_ids)
+
+
+def downgrade():
+    # Keys stay UUIDv7; only the storage goes back to 36-character strings.
+    # legacy_vehicle_ids is kept: it is the only record of the uuid4 ids, and
+    # upgrading again reuses it.
+    _rebuild_vehicles(sa.String(length=36), lambda row: str(parse_uuid(row['id'])))
@@ -0,0 +1,50 @@
+"""feature tags
+
+Adds the feature_tags vocabulary and the vehicle_features mapping, and fills
+them from each vehicle's comma-separated features plus its transmission,
+drivetrain and fuel type (see feature_tags). vehicles.features is kept as the
+editable source.
+
+Revision ID: 4e8f1a6c3b27
+Revises: 7b41e0c2d95a
+Create Date: 2026-10-19 11:20:06.337190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from feature_tags import backfill_feature_tags
+from id_types import CompactUUID
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8f1a6c3b27'
+down_revision = '7b41e0c2d95a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('feature_tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('slug', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('slug')
+    )
+    op.create_table('vehicle_features',
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('vehicle_id', CompactUUID(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['feature_tags.id'], ),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tag_id', 'vehicle_id')
+    )
+    op.create_index('ix_vehicle_features_vehicle_id', 'vehicle_features', ['vehicle_id'], unique=False)
+
+    backfill_feature_tags(op.get_bind())
+
+
+def downgrade():
+    op.drop_index('ix_vehicle_features_vehicle_id', table_name='vehicle_features')
+    op.drop_table('vehicle_features')
+    op.drop_table('feature_tags')
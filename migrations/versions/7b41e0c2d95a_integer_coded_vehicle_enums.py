@@ -0,0 +1,91 @@
+"""integer-coded vehicle enums
+
+Stores category, status, fuel_type, transmission, drivetrain and
+condition_rating as SMALLINT codes (see enum_types.CodedEnum). Values are
+matched case-insensitively, ignoring surrounding spaces; blanks become NULL.
+The upgrade stops before changing anything if a column holds a value outside
+its vocabulary; append that value to the vocabulary in enum_types.py (and
+here) first.
+
+Revision ID: 7b41e0c2d95a
+Revises: 3c9d2f7a41b8
+Create Date: 2026-10-19 10:03:17.502611
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b41e0c2d95a'
+down_revision = '3c9d2f7a41b8'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of enum_types.VOCABULARIES at this revision (code = position + 1)
+VOCABULARIES = {
+    'category': ['Cars', 'Trucks', 'Commercial Vehicles'],
+    'status': ['available', 'sold'],
+    'fuel_type': ['Petrol', 'Gasoline', 'Diesel', 'Hybrid', 'Electric', 'CNG'],
+    'transmission': ['Manual', 'Automatic', 'CVT'],
+    'drivetrain': ['FWD', 'RWD', 'AWD', '4WD', '6x4'],
+    'condition_rating': ['Excellent', 'Very Good', 'Good', 'Fair', 'Poor'],
+}
+REQUIRED = {'category', 'status'}
+STRING_TYPES = {
+    'category': sa.String(50), 'status': sa.String(20), 'fuel_type': sa.String(20),
+    'transmission': sa.String(20), 'drivetrain': sa.String(10), 'condition_rating': sa.String(20),
+}
+
+
+def _check_vocabularies(bind):
+    problems = []
+    for column, values in VOCABULARIES.items():
+        known = {value.lower() for value in values}
+        found = bind.execute(sa.text(
+            f"SELECT DISTINCT {column} FROM vehicles WHERE {column} IS NOT NULL AND TRIM({column}) != ''"
+        )).scalars()
+        unknown = sorted(value for value in found if value.strip().lower() not in known)
+        if unknown:
+            problems.append(f"{column}: {unknown}")
+    if problems:
+        raise RuntimeError("Values missing from the enum vocabularies, add them first: " + '; '.join(problems))
+
+
+def upgrade():
+    bind = op.get_bind()
+    columns = {column['name']: column['type'] for column in sa.inspect(bind).get_columns('vehicles')}
+    if isinstance(columns['category'], sa.Integer):
+        return  # already converted
+    _check_vocabularies(bind)
+
+    with op.batch_alter_table('vehicles') as batch_op:
+        for column in VOCABULARIES:
+            batch_op.add_column(sa.Column(f'{column}_code', sa.SmallInteger(), nullable=True))
+
+    for column, values in VOCABULARIES.items():
+        cases = ' '.join(f"WHEN '{value.lower()}' THEN {code}" for code, value in enumerate(values, start=1))
+        default = "1" if column == 'status' else "NULL"  # status was nullable with an 'available' default
+        op.execute(f"UPDATE vehicles SET {column}_code = CASE LOWER(TRIM({column})) {cases} ELSE {default} END")
+
+    with op.batch_alter_table('vehicles') as batch_op:
+        for column in VOCABULARIES:
+            batch_op.drop_column(column)
+            batch_op.alter_column(f'{column}_code', new_column_name=column,
+                                  existing_type=sa.SmallInteger(), nullable=column not in REQUIRED)
+
+
+def downgrade():
+    with op.batch_alter_table('vehicles') as batch_op:
+        for column in VOCABULARIES:
+            batch_op.add_column(sa.Column(f'{column}_text', STRING_TYPES[column], nullable=True))
+
+    for column, values in VOCABULARIES.items():
+        cases = ' '.join(f"WHEN {code} THEN '{value}'" for code, value in enumerate(values, start=1))
+        op.execute(f"UPDATE vehicles SET {column}_text = CASE {column} {cases} END")
+
+    with op.batch_alter_table('vehicles') as batch_op:
+        for column in VOCABULARIES:
+            batch_op.drop_column(column)
+            batch_op.alter_column(f'{column}_text', new_column_name=column,
+                                  existing_type=STRING_TYPES[column], nullable=column not in REQUIRED)
@@ -0,0 +1,76 @@
+"""typed insurance expiry
+
+Converts vehicles.insurance_expiry from free text (mostly MM/DD/YYYY, some
+DD/MM/YYYY such as the seeded "15/03/2025") to a DATE column with an index,
+so expiry windows are index range scans. Values are parsed with
+date_types.parse_date; the upgrade stops before changing anything if a value
+can't be parsed, listing the offending values. Fix those rows first.
+
+Revision ID: 9d2c6b8e1f40
+Revises: 4e8f1a6c3b27
+Create Date: 2026-10-19 12:41:55.904118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from date_types import format_date, parse_date
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2c6b8e1f40'
+down_revision = '4e8f1a6c3b27'
+branch_labels = None
+depends_on = None
+
+_vehicles = sa.table('vehicles', sa.column('id'), sa.column('insurance_expiry'),
+                     sa.column('insurance_expiry_date', sa.Date()), sa.column('insurance_expiry_text', sa.String()))
+
+_dated = sa.table('vehicles', sa.column('id'), sa.column('insurance_expiry', sa.Date()))
+
+
+def _parsed_or_none(value):
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+def upgrade():
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(_vehicles.c.id, _vehicles.c.insurance_expiry)
+                        .where(_vehicles.c.insurance_expiry.is_not(None))).all()
+    unparsed = sorted({value for _, value in rows if value.strip() and _parsed_or_none(value) is None})
+    if unparsed:
+        raise RuntimeError(f"insurance_expiry values that aren't dates, fix them first: {unparsed}")
+
+    with op.batch_alter_table('vehicles') as batch_op:
+        batch_op.add_column(sa.Column('insurance_expiry_date', sa.Date(), nullable=True))
+
+    updates = [{'row_id': row_id, 'expiry': parse_date(value)} for row_id, value in rows if value.strip()]
+    if updates:
+        bind.execute(_vehicles.update().where(_vehicles.c.id == sa.bindparam('row_id'))
+                     .values(insurance_expiry_date=sa.bindparam('expiry')), updates)
+
+    with op.batch_alter_table('vehicles') as batch_op:
+        batch_op.drop_column('insurance_expiry')
+        batch_op.alter_column('insurance_expiry_date', new_column_name='insurance_expiry', existing_type=sa.Date())
+    op.create_index('ix_vehicles_insurance_expiry', 'vehicles', ['insurance_expiry'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    op.drop_index('ix_vehicles_insurance_expiry', table_name='vehicles')
+    with op.batch_alter_table('vehicles') as batch_op:
+        batch_op.add_column(sa.Column('insurance_expiry_text', sa.String(length=10), nullable=True))
+
+    rows = bind.execute(sa.select(_dated.c.id, _dated.c.insurance_expiry)
+                        .where(_dated.c.insurance_expiry.is_not(None))).all()
+    updates = [{'row_id': row_id, 'expiry': format_date(value)} for row_id, value in rows]
+    if updates:
+        bind.execute(_vehicles.update().where(_vehicles.c.id == sa.bindparam('row_id'))
+                     .values(insurance_expiry_text=sa.bindparam('expiry')), updates)
+
+    with op.batch_alter_table('vehicles') as batch_op:
+        batch_op.drop_column('insurance_expiry')
+        batch_op.alter_column('insurance_expiry_text', new_column_name='insurance_expiry', existing_type=sa.String(length=10))
@@ -0,0 +1,41 @@
+"""browse range indexes
+
+(status, column, id) indexes behind the /browse sorts and price, year and
+mileage ranges, so every combination is an index seek on
+status='available'. (status, category) serves the result count for one
+category. (status, price, id) replaces (status, price) and also covers the
+dashboard stats.
+
+Revision ID: b7f3c1e58a24
+Revises: e1b4d7a9c362
+Create Date: 2026-10-19 15:06:31.418207
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7f3c1e58a24'
+down_revision = 'e1b4d7a9c362'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_vehicles_status_created_at_id': ['status', 'created_at', 'id'],
+    'ix_vehicles_status_price_id': ['status', 'price', 'id'],
+    'ix_vehicles_status_year_id': ['status', 'year', 'id'],
+    'ix_vehicles_status_mileage_id': ['status', 'mileage', 'id'],
+    'ix_vehicles_status_category': ['status', 'category'],
+}
+
+
+def upgrade():
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'vehicles', columns, unique=False)
+    op.drop_index('ix_vehicles_status_price', table_name='vehicles')
+
+
+def downgrade():
+    op.create_index('ix_vehicles_status_price', 'vehicles', ['status', 'price'], unique=False)
+    for name in INDEXES:
+        op.drop_index(name, table_name='vehicles')
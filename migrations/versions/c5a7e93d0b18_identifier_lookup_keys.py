@@ -0,0 +1,69 @@
+"""identifier lookup keys
+
+Adds indexed shadow keys for vin_number, registration_number and
+vehicle_number (uppercased, letters and digits only; see identifier_keys)
+and fills them from the existing values.
+
+The indexes are not unique: existing catalogs can hold the same plate on
+several listings (e.g. a car sold and listed again), so duplicates found
+here are only logged. New and edited listings are checked against the keys
+before they are saved (models.reject_duplicate_identifiers).
+
+Revision ID: c5a7e93d0b18
+Revises: 9d2c6b8e1f40
+Create Date: 2026-10-19 13:35:12.662907
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from identifier_keys import KEY_COLUMNS, identifier_key
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a7e93d0b18'
+down_revision = '9d2c6b8e1f40'
+branch_labels = None
+depends_on = None
+
+KEY_LENGTHS = {'vin_key': 17, 'registration_key': 50, 'vehicle_number_key': 50}
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+_vehicles = sa.table('vehicles', sa.column('id'), *[sa.column(name) for name in KEY_COLUMNS],
+                     *[sa.column(key) for key in KEY_COLUMNS.values()])
+
+
+def upgrade():
+    with op.batch_alter_table('vehicles') as batch_op:
+        for key in KEY_COLUMNS.values():
+            batch_op.add_column(sa.Column(key, sa.String(length=KEY_LENGTHS[key]), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(_vehicles.c.id, *[_vehicles.c[name] for name in KEY_COLUMNS])).mappings().all()
+    updates = []
+    for row in rows:
+        keys = {f'new_{key}': identifier_key(row[name]) for name, key in KEY_COLUMNS.items()}
+        if any(keys.values()):
+            updates.append(dict(keys, row_id=row['id']))
+    if updates:
+        bind.execute(_vehicles.update().where(_vehicles.c.id == sa.bindparam('row_id'))
+                     .values({key: sa.bindparam(f'new_{key}') for key in KEY_COLUMNS.values()}), updates)
+
+    for key in KEY_COLUMNS.values():
+        op.create_index(f'ix_vehicles_{key}', 'vehicles', [key], unique=False)
+        duplicates = bind.execute(sa.text(
+            f"SELECT {key}, COUNT(*) FROM vehicles WHERE {key} IS NOT NULL GROUP BY {key} HAVING COUNT(*) > 1"
+        )).all()
+        if duplicates:
+            logger.warning(f"{len(duplicates)} {key} values are shared by several vehicles, e.g. {duplicates[:5]}")
+
+
+def downgrade():
+    for key in KEY_COLUMNS.values():
+        op.drop_index(f'ix_vehicles_{key}', table_name='vehicles')
+    with op.batch_alter_table('vehicles') as batch_op:
+        for key in KEY_COLUMNS.values():
+            batch_op.drop_column(key)
@@ -0,0 +1,35 @@
+"""image info
+
+Adds image_info: the pixel size and a tiny inline placeholder of each
+upload, so pages can reserve the image's box and show a blurred preview
+before it loads. Uploads stored before this revision have no row until
+`flask image-info` fills them in.
+
+Revision ID: d3a9f6b2c815
+Revises: b7f3c1e58a24
+Create Date: 2026-10-19 18:42:10.527604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a9f6b2c815'
+down_revision = 'b7f3c1e58a24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('image_info',
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('placeholder', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('filename')
+    )
+
+
+def downgrade():
+    op.drop_table('image_info')
@@ -0,0 +1,36 @@
+"""admin sort indexes
+
+(sort column, id) indexes for the paged admin inventory: created_at, price,
+year and mileage. (status, price) covers the dashboard's stats query.
+
+Revision ID: e1b4d7a9c362
+Revises: c5a7e93d0b18
+Create Date: 2026-10-19 14:22:47.190385
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b4d7a9c362'
+down_revision = 'c5a7e93d0b18'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_vehicles_created_at_id': ['created_at', 'id'],
+    'ix_vehicles_price_id': ['price', 'id'],
+    'ix_vehicles_year_id': ['year', 'id'],
+    'ix_vehicles_mileage_id': ['mileage', 'id'],
+    'ix_vehicles_status_price': ['status', 'price'],
+}
+
+
+def upgrade():
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'vehicles', columns, unique=False)
+
+
+def downgrade():
+    for name in INDEXES:
+        op.drop_index(name, table_name='vehicles')
@@ -0,0 +1,85 @@
+"""initial schema
+
+Revision ID: e8a0b0a79af6
+Revises:
+Create Date: 2026-10-19 06:50:54.709319
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a0b0a79af6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by the old import-time db.create_all() already have
+    # these tables; adopt them instead of failing so `flask db upgrade` works
+    # on existing deployments.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'admin_users' not in existing:
+        op.create_table('admin_users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('password_hash', sa.String(length=256), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username')
+        )
+    if 'vehicles' not in existing:
+        op.create_table('vehicles',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('make', sa.String(length=50), nullable=False),
+        sa.Column('model', sa.String(length=50), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('mileage', sa.Integer(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('contact_name', sa.String(length=100), nullable=False),
+        sa.Column('contact_phone', sa.String(length=20), nullable=False),
+        sa.Column('contact_email', sa.String(length=100), nullable=True),
+        sa.Column('vehicle_number', sa.String(length=50), nullable=True),
+        sa.Column('images', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('fuel_type', sa.String(length=20), nullable=True),
+        sa.Column('transmission', sa.String(length=20), nullable=True),
+        sa.Column('engine_size', sa.String(length=20), nullable=True),
+        sa.Column('horsepower', sa.Integer(), nullable=True),
+        sa.Column('fuel_economy', sa.String(length=30), nullable=True),
+        sa.Column('drivetrain', sa.String(length=10), nullable=True),
+        sa.Column('number_of_owners', sa.Integer(), nullable=True),
+        sa.Column('previous_owner_name', sa.String(length=100), nullable=True),
+        sa.Column('previous_owner_phone', sa.String(length=20), nullable=True),
+        sa.Column('previous_owner_email', sa.String(length=100), nullable=True),
+        sa.Column('odometer_reading', sa.Integer(), nullable=True),
+        sa.Column('accident_history', sa.Text(), nullable=True),
+        sa.Column('service_records', sa.Text(), nullable=True),
+        sa.Column('insurance_company', sa.String(length=100), nullable=True),
+        sa.Column('insurance_policy_number', sa.String(length=50), nullable=True),
+        sa.Column('insurance_expiry', sa.String(length=10), nullable=True),
+        sa.Column('registration_number', sa.String(length=50), nullable=True),
+        sa.Column('vin_number', sa.String(length=17), nullable=True),
+        sa.Column('exterior_color', sa.String(length=30), nullable=True),
+        sa.Column('interior_color', sa.String(length=30), nullable=True),
+        sa.Column('features', sa.Text(), nullable=True),
+        sa.Column('condition_rating', sa.String(length=20), nullable=True),
+        sa.Column('warranty_info', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('vehicles')
+    op.drop_table('admin_users')
+    # ### end Alembic commands ###
@@ -1,10 +1,17 @@
-import uuid
-from datetime import datetime
+from datetime import date, datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
-from sqlalchemy import String, Integer, Float, Text, DateTime
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, Float, Text, Date, DateTime, Column, ForeignKey, Index, Table, case, event, func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship, validates
 from typing import Optional
+from id_types import CompactUUID, new_id, parse_uuid
+from enum_types import CodedEnum
+from date_types import format_date, parse_date
+from identifier_keys import KEY_COLUMNS, LABELS, PLATE_COLUMNS, identifier_key
+from feature_tags import SPEC_TAG_FIELDS, vehicle_tag_names
+from write_queue import run_write
+from unit_of_work import retry_transient
 
 class AdminUser(db.Model):
     __tablename__ = 'admin_users'
@@ -20,12 +27,59 @@ class AdminUser(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+class FeatureTag(db.Model):
+    """One normalized feature (or transmission/drivetrain/fuel type), see feature_tags"""
+    __tablename__ = 'feature_tags'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    slug: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+
+# (tag_id, vehicle_id) answers "vehicles with this tag"; the second index
+# serves "tags of this vehicle" when a listing is edited or deleted
+vehicle_features = Table(
+    'vehicle_features', db.metadata,
+    Column('tag_id', Integer, ForeignKey('feature_tags.id'), primary_key=True),
+    Column('vehicle_id', CompactUUID, ForeignKey('vehicles.id', ondelete='CASCADE'), primary_key=True),
+    Index('ix_vehicle_features_vehicle_id', 'vehicle_id'),
+)
+
+class ImageInfo(db.Model):
+    """Size and inline placeholder of one upload, recorded when it is stored (see image_placeholders)"""
+    __tablename__ = 'image_info'
+
+    filename: Mapped[str] = mapped_column(String(255), primary_key=True)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, nullable=False)
+    placeholder: Mapped[str] = mapped_column(Text, nullable=False)  # data: URI of a ~16px copy
+
+class LegacyVehicleId(db.Model):
+    """A listing's uuid4 id from before ids became UUIDv7, so old links can redirect (see get_renamed_vehicle_id)"""
+    __tablename__ = 'legacy_vehicle_ids'
+
+    legacy_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    vehicle_id: Mapped[str] = mapped_column(CompactUUID, nullable=False)
+
 class Vehicle(db.Model):
     __tablename__ = 'vehicles'
+    # (sort column, id) indexes: an admin page of ids is read straight off the
+    # index (OFFSET skips narrow index entries, not rows), see search_vehicles
+    __table_args__ = (
+        Index('ix_vehicles_created_at_id', 'created_at', 'id'),
+        Index('ix_vehicles_price_id', 'price', 'id'),
+        Index('ix_vehicles_year_id', 'year', 'id'),
+        Index('ix_vehicles_mileage_id', 'mileage', 'id'),
+        # /browse: status='available' plus a range and/or sort on one column (see browse_query)
+        Index('ix_vehicles_status_created_at_id', 'status', 'created_at', 'id'),
+        Index('ix_vehicles_status_price_id', 'status', 'price', 'id'),  # also covers get_inventory_stats
+        Index('ix_vehicles_status_year_id', 'status', 'year', 'id'),
+        Index('ix_vehicles_status_mileage_id', 'status', 'mileage', 'id'),
+        Index('ix_vehicles_status_category', 'status', 'category'),  # counts a category's listings
+    )
     
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(CompactUUID, primary_key=True, default=new_id)  # time-ordered UUIDv7, see id_types
     title: Mapped[str] = mapped_column(String(100), nullable=False)
-    category: Mapped[str] = mapped_column(String(50), nullable=False)  # Cars, Trucks, Commercial Vehicles
+    category: Mapped[str] = mapped_column(CodedEnum('category'), nullable=False)  # Cars, Trucks, Commercial Vehicles
     make: Mapped[str] = mapped_column(String(50), nullable=False)
     model: Mapped[str] = mapped_column(String(50), nullable=False)
     year: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -37,16 +91,16 @@ class Vehicle(db.Model):
     contact_email: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     vehicle_number: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # Vehicle identification number for internal tracking
     images: Mapped[str] = mapped_column(Text)  # JSON string of image filenames
-    status: Mapped[str] = mapped_column(String(20), default='available')  # available, sold
+    status: Mapped[str] = mapped_column(CodedEnum('status'), nullable=False, default='available')  # available, sold
     
     # Comprehensive Vehicle Details
     # Engine & Performance
-    fuel_type: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # Petrol, Gasoline, Diesel, Hybrid, Electric
-    transmission: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # Manual, Automatic, CVT
+    fuel_type: Mapped[Optional[str]] = mapped_column(CodedEnum('fuel_type'), nullable=True)  # Petrol, Gasoline, Diesel, Hybrid, Electric, CNG
+    transmission: Mapped[Optional[str]] = mapped_column(CodedEnum('transmission'), nullable=True)  # Manual, Automatic, CVT
     engine_size: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # e.g. 2.0L, 3.5L V6
     horsepower: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     fuel_economy: Mapped[Optional[str]] = mapped_column(String(30), nullable=True)  # e.g. 25 city / 32 highway mpg
-    drivetrain: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)  # FWD, RWD, AWD, 4WD
+    drivetrain: Mapped[Optional[str]] = mapped_column(CodedEnum('drivetrain'), nullable=True)  # FWD, RWD, AWD, 4WD, 6x4
     
     # Ownership & History
     number_of_owners: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -60,23 +114,31 @@ class Vehicle(db.Model):
     # Insurance & Documentation
     insurance_company: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     insurance_policy_number: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
-    insurance_expiry: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)  # MM/DD/YYYY
+    insurance_expiry: Mapped[Optional[date]] = mapped_column(Date, nullable=True, index=True)  # shown as MM/DD/YYYY
     registration_number: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     vin_number: Mapped[Optional[str]] = mapped_column(String(17), nullable=True)  # Vehicle Identification Number
+
+    # Normalized copies of the identifiers for indexed lookups (see identifier_keys)
+    vin_key: Mapped[Optional[str]] = mapped_column(String(17), nullable=True, index=True)
+    registration_key: Mapped[Optional[str]] = mapped_column(String(50), nullable=True, index=True)
+    vehicle_number_key: Mapped[Optional[str]] = mapped_column(String(50), nullable=True, index=True)
     
     # Additional Features & Condition
     exterior_color: Mapped[Optional[str]] = mapped_column(String(30), nullable=True)
     interior_color: Mapped[Optional[str]] = mapped_column(String(30), nullable=True)
     features: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Comma-separated features
-    condition_rating: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # Excellent, Good, Fair, Poor
+    condition_rating: Mapped[Optional[str]] = mapped_column(CodedEnum('condition_rating'), nullable=True)  # Excellent, Very Good, Good, Fair, Poor
     warranty_info: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Warranty details
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Kept in sync with features/transmission/drivetrain/fuel_type on flush
+    tags = relationship(FeatureTag, secondary=vehicle_features)
+
     def __init__(self, title, category, make, model, year, price, mileage, 
                  description, contact_name, contact_phone, images=None, contact_email=None, **kwargs):
-        self.id = str(uuid.uuid4())
+        self.id = new_id()
         self.title = title
         self.category = category
         self.make = make
@@ -111,6 +173,15 @@ class Vehicle(db.Model):
         """Set images from a list"""
         self.images = ','.join(value) if value else ''
     
+    @validates(*KEY_COLUMNS)
+    def _set_identifier_key(self, key, value):
+        setattr(self, KEY_COLUMNS[key], identifier_key(value))
+        return value
+
+    @validates('insurance_expiry')
+    def _parse_insurance_expiry(self, key, value):
+        return parse_date(value)  # accepts the form's text; raises ValueError for non-dates
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -145,7 +216,7 @@ class Vehicle(db.Model):
             'service_records': self.service_records,
             'insurance_company': self.insurance_company,
             'insurance_policy_number': self.insurance_policy_number,
-            'insurance_expiry': self.insurance_expiry,
+            'insurance_expiry': format_date(self.insurance_expiry),
             'registration_number': self.registration_number,
             'vin_number': self.vin_number,
             'exterior_color': self.exterior_color,
@@ -158,14 +229,140 @@ class Vehicle(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
     
-    def update_from_dict(self, **kwargs):
+    def changed_fields(self, **kwargs):
+        """Return {field: new value} for the values that differ from the loaded state"""
+        changes = {}
         for key, value in kwargs.items():
-            if hasattr(self, key) and key not in ['id', 'created_at']:
-                if key == 'images' and isinstance(value, list):
-                    self.images_list = value
-                else:
-                    setattr(self, key, value)
-        self.updated_at = datetime.utcnow()
+            if not hasattr(self, key) or key in ['id', 'created_at', 'updated_at']:
+                continue
+            current = self.images_list if key == 'images' and isinstance(value, list) else getattr(self, key)
+            if not _same_value(current, value):
+                changes[key] = value
+        return changes
+
+    def update_from_dict(self, **kwargs):
+        """Apply only the values that changed and return their field names.
+
+        updated_at moves only when something changed, so a no-op save issues
+        no UPDATE at all and a real edit updates just the changed columns.
+        """
+        changes = self.changed_fields(**kwargs)
+        for key, value in changes.items():
+            if key == 'images' and isinstance(value, list):
+                self.images_list = value
+            else:
+                setattr(self, key, value)
+        if changes:
+            self.updated_at = datetime.utcnow()
+        return list(changes)
+
+def _same_value(current, new):
+    """Compare a loaded column value with form input (blank == None, '25000' == 25000.0)"""
+    if current == new or (current in (None, '') and new in (None, '')):
+        return True
+    if isinstance(current, date) and not isinstance(current, datetime):
+        try:
+            return current == parse_date(new)
+        except ValueError:
+            return False
+    if isinstance(current, (int, float)) and not isinstance(current, bool) and new not in (None, ''):
+        try:
+            return float(current) == float(new)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _insert_feature_tags(session, names):
+    """Insert {slug: name} tags, each in its own savepoint: another worker may have just added the same slug"""
+    connection = session.connection()
+    for slug, name in names.items():
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(FeatureTag).values(name=name, slug=slug))
+        except IntegrityError:
+            pass  # theirs is re-selected by the caller
+
+@event.listens_for(Session, 'before_flush')  # db.session and the write queue's session
+def sync_feature_tags(session, flush_context, instances):
+    """Re-map the tags of new vehicles and of vehicles whose tag sources changed"""
+    fields = ['features'] + SPEC_TAG_FIELDS
+    vehicles = [obj for obj in session.new if isinstance(obj, Vehicle)]
+    vehicles += [obj for obj in session.dirty if isinstance(obj, Vehicle)
+                 and any(db.inspect(obj).attrs[name].history.has_changes() for name in fields)]
+    if not vehicles:
+        return
+
+    wanted = {vehicle: vehicle_tag_names(*(getattr(vehicle, name) for name in fields)) for vehicle in vehicles}
+    slugs = set().union(*wanted.values())
+    with session.no_autoflush:
+        known = {tag.slug: tag for tag in session.scalars(select(FeatureTag).where(FeatureTag.slug.in_(slugs)))}
+        known.update((obj.slug, obj) for obj in session.new if isinstance(obj, FeatureTag))
+        missing = {}
+        for names in wanted.values():
+            for slug, name in names.items():
+                if slug not in known:
+                    missing.setdefault(slug, name)
+        if missing:
+            _insert_feature_tags(session, missing)
+            known.update((tag.slug, tag) for tag in
+                         session.scalars(select(FeatureTag).where(FeatureTag.slug.in_(missing))))
+        for vehicle, names in wanted.items():
+            tags = [known[slug] for slug in names]
+            if {tag.slug for tag in vehicle.tags} != set(names):
+                vehicle.tags = tags
+
+class DuplicateVehicleError(ValueError):
+    """A VIN or plate already belongs to another available listing"""
+
+    def __init__(self, matches):
+        self.matches = matches
+        super().__init__('; '.join(f"{LABELS[match['field']]} {match['value']} is already used by \"{match['title']}\""
+                                   for match in matches))
+
+class VehicleNotFound(LookupError):
+    """The vehicle a unit of work was about to change no longer exists"""
+
+def vehicle_for_update(session, vehicle_id):
+    """The vehicle to change in a unit of work (see write_queue); raises VehicleNotFound if it's gone"""
+    vehicle = session.get(Vehicle, vehicle_id)
+    if vehicle is None:
+        raise VehicleNotFound(vehicle_id)
+    return vehicle
+
+def find_duplicate_identifiers(session, vehicle):
+    """[{field, value, vehicle_id, title}] for other available listings sharing this vehicle's VIN or a plate.
+
+    Sold listings don't count: a car sold earlier may be listed again.
+    """
+    others = select(Vehicle.id, Vehicle.title, Vehicle.vin_key, Vehicle.registration_key,
+                    Vehicle.vehicle_number_key).where(Vehicle.id != vehicle.id, Vehicle.status == 'available')
+    matches = []
+    if vehicle.vin_key:
+        for row in session.execute(others.where(Vehicle.vin_key == vehicle.vin_key)):
+            matches.append({'field': 'vin_number', 'value': vehicle.vin_number, 'vehicle_id': row.id, 'title': row.title})
+
+    # A plate may sit in either plate column, so compare against both
+    plates = {identifier_key(getattr(vehicle, name)): getattr(vehicle, name) for name in PLATE_COLUMNS}
+    plates.pop(None, None)
+    if plates:
+        for row in session.execute(others.where(or_(Vehicle.registration_key.in_(plates),
+                                                    Vehicle.vehicle_number_key.in_(plates)))):
+            key = row.registration_key if row.registration_key in plates else row.vehicle_number_key
+            field = next(name for name in PLATE_COLUMNS if identifier_key(getattr(vehicle, name)) == key)
+            matches.append({'field': field, 'value': plates[key], 'vehicle_id': row.id, 'title': row.title})
+    return matches
+
+@event.listens_for(Session, 'before_flush')
+def reject_duplicate_identifiers(session, flush_context, instances):
+    """Refuse to save a new or re-identified vehicle whose VIN or plate is taken by an available listing"""
+    vehicles = [obj for obj in session.new if isinstance(obj, Vehicle)]
+    vehicles += [obj for obj in session.dirty if isinstance(obj, Vehicle)
+                 and any(db.inspect(obj).attrs[name].history.has_changes() for name in KEY_COLUMNS)]
+    with session.no_autoflush:
+        for vehicle in vehicles:
+            matches = find_duplicate_identifiers(session, vehicle)
+            if matches:
+                raise DuplicateVehicleError(matches)
 
 def initialize_sample_data():
     """Initialize sample data if database is empty"""
@@ -638,42 +835,170 @@ def initialize_sample_data():
     db.session.commit()
 
 # Helper functions for backward compatibility
+@retry_transient
 def get_vehicle(vehicle_id):
-    """Safely get vehicle with proper session handling"""
-    try:
-        return db.session.get(Vehicle, vehicle_id)
-    except Exception as e:
-        db.session.rollback()
-        db.session.close()
-        # Fallback method
-        try:
-            return Vehicle.query.filter_by(id=vehicle_id).first()
-        except:
-            return None
+    """Get a vehicle by id, or None if it doesn't exist"""
+    return db.session.get(Vehicle, vehicle_id)
+
+@retry_transient
+def get_renamed_vehicle_id(legacy_id):
+    """Current id of the listing that had `legacy_id` before ids became UUIDv7, or None"""
+    parsed = parse_uuid(legacy_id)
+    if parsed is None:
+        return None
+    # Rows of deleted listings are left behind; the join skips them
+    return db.session.scalar(select(LegacyVehicleId.vehicle_id)
+                             .join(Vehicle, Vehicle.id == LegacyVehicleId.vehicle_id)
+                             .where(LegacyVehicleId.legacy_id == str(parsed)))
 
+@retry_transient
 def get_all_vehicles():
     return Vehicle.query.order_by(Vehicle.created_at.desc()).all()
 
+@retry_transient
 def get_vehicles_by_category(category):
     return Vehicle.query.filter_by(category=category).order_by(Vehicle.created_at.desc()).all()
 
+@retry_transient
 def get_available_vehicles():
     return Vehicle.query.filter_by(status='available').order_by(Vehicle.created_at.desc()).all()
 
+# sort name -> ORDER BY; the id tie-breaker runs the same direction so the
+# (column, id) indexes serve every order
+VEHICLE_SORTS = {
+    'newest': (Vehicle.created_at.desc(), Vehicle.id.desc()),
+    'oldest': (Vehicle.created_at.asc(), Vehicle.id.asc()),
+    'price_asc': (Vehicle.price.asc(), Vehicle.id.asc()),
+    'price_desc': (Vehicle.price.desc(), Vehicle.id.desc()),
+    'year_desc': (Vehicle.year.desc(), Vehicle.id.desc()),
+    'year_asc': (Vehicle.year.asc(), Vehicle.id.asc()),
+    'mileage_asc': (Vehicle.mileage.asc(), Vehicle.id.asc()),
+    'mileage_desc': (Vehicle.mileage.desc(), Vehicle.id.desc()),
+}
+
+def _contains(column, text):
+    # SQLite's LIKE already ignores ASCII case and is about twice as fast as lower() LIKE lower()
+    if db.engine.dialect.name == 'sqlite':
+        return column.contains(text, autoescape=True)
+    return column.icontains(text, autoescape=True)
+
+def _search_clause(text):
+    """Title, make, model, owner phone or plate containing `text`"""
+    clauses = [_contains(Vehicle.title, text), _contains(Vehicle.make, text), _contains(Vehicle.model, text),
+               _contains(Vehicle.previous_owner_phone, text)]
+    key = identifier_key(text)
+    if key:
+        clauses += [Vehicle.registration_key.contains(key, autoescape=True),
+                    Vehicle.vehicle_number_key.contains(key, autoescape=True)]
+    return or_(*clauses)
+
+@retry_transient
+def search_vehicles(search=None, status=None, category=None, sort='newest', page=1, per_page=50):
+    """One page of the admin inventory and the number of matching vehicles.
+
+    The page's ids come off a (sort column, id) index and only those rows are
+    loaded, so deep pages don't read and discard full rows. A text search
+    has to scan the table anyway, so it collects every matching id in that
+    one scan and the count is its length.
+    """
+    filters = []
+    if status:
+        filters.append(Vehicle.status == status)
+    if category:
+        filters.append(Vehicle.category == category)
+    ids_query = select(Vehicle.id).order_by(*VEHICLE_SORTS[sort])
+    offset = (page - 1) * per_page
+
+    if search:
+        matching = db.session.scalars(ids_query.where(_search_clause(search), *filters)).all()
+        total, ids = len(matching), matching[offset:offset + per_page]
+    else:
+        total = db.session.scalar(select(func.count()).select_from(Vehicle).where(*filters))
+        ids = db.session.scalars(ids_query.where(*filters).limit(per_page).offset(offset)).all()
+
+    loaded = {vehicle.id: vehicle for vehicle in Vehicle.query.filter(Vehicle.id.in_(ids))} if ids else {}
+    return [loaded[vehicle_id] for vehicle_id in ids if vehicle_id in loaded], total
+
+def browse_query(category=None, search=None, min_price=None, max_price=None, min_year=None, max_year=None,
+                 max_mileage=None, sort='newest'):
+    """Available vehicles for /browse, filtered and in `sort` order.
+
+    Every sort and range column has a (status, column, id) index, so the
+    query is always an index seek on status='available': in sort order when
+    there's no range on another column, otherwise a range seek whose (smaller)
+    result is sorted.
+    """
+    query = Vehicle.query.filter(Vehicle.status == 'available')
+    if category:
+        query = query.filter(Vehicle.category == category)
+    if search:
+        query = query.filter(or_(_contains(Vehicle.title, search), _contains(Vehicle.make, search),
+                                 _contains(Vehicle.model, search)))
+    for column, low, high in ((Vehicle.price, min_price, max_price), (Vehicle.year, min_year, max_year),
+                              (Vehicle.mileage, None, max_mileage)):
+        if low is not None:
+            query = query.filter(column >= low)
+        if high is not None:
+            query = query.filter(column <= high)
+    return query.order_by(*VEHICLE_SORTS[sort])
+
+@retry_transient
+def get_inventory_stats():
+    """Totals for the admin dashboard cards, in one aggregate query"""
+    total, available, sold, value = db.session.execute(select(
+        func.count(),
+        func.coalesce(func.sum(case((Vehicle.status == 'available', 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Vehicle.status == 'sold', 1), else_=0)), 0),
+        func.coalesce(func.sum(Vehicle.price), 0),
+    )).one()
+    return {'total': total, 'available': available, 'sold': sold, 'inventory_value': float(value)}
+
+@retry_transient
+def get_expiring_insurance(start, end, limit=100):
+    """Vehicles whose insurance expires between start and end (inclusive), soonest first.
+
+    Returns (vehicles, total); both come from a range scan on the expiry index.
+    """
+    query = Vehicle.query.filter(Vehicle.insurance_expiry.between(start, end))
+    total = query.count()
+    vehicles = query.order_by(Vehicle.insurance_expiry).limit(limit).all()
+    return vehicles, total
+
+@retry_transient
+def find_vehicles_by_identifier(value, limit=20):
+    """Vehicles whose VIN, registration number or vehicle number matches `value` in any spelling"""
+    key = identifier_key(value)
+    if not key:
+        return []
+    return Vehicle.query.filter(or_(Vehicle.vin_key == key, Vehicle.registration_key == key,
+                                    Vehicle.vehicle_number_key == key)).limit(limit).all()
+
+@retry_transient
+def get_image_info(filenames):
+    """{filename: (filename, width, height, placeholder) row} for the uploads that have their size recorded"""
+    if not filenames:
+        return {}
+    rows = db.session.execute(select(ImageInfo.filename, ImageInfo.width, ImageInfo.height, ImageInfo.placeholder)
+                              .where(ImageInfo.filename.in_(filenames)))
+    return {row.filename: row for row in rows}
+
+@retry_transient
+def get_feature_tags():
+    return FeatureTag.query.order_by(FeatureTag.name).all()
+
 def add_vehicle(**vehicle_data):
     """Create and add a new vehicle to the database"""
     vehicle = Vehicle(**vehicle_data)
-    db.session.add(vehicle)
-    db.session.commit()
+    run_write(lambda session: session.add(vehicle))
     return vehicle
 
 def delete_vehicle(vehicle_id):
-    vehicle = Vehicle.query.get(vehicle_id)
-    if vehicle:
-        db.session.delete(vehicle)
-        db.session.commit()
-        return True
-    return False
+    def delete(session):
+        vehicle = session.get(Vehicle, vehicle_id)
+        if vehicle:
+            session.delete(vehicle)
+        return vehicle is not None
+    return run_write(delete)
 
 def verify_admin(username, password):
     user = AdminUser.query.filter_by(username=username).first()
@@ -0,0 +1,240 @@
+"""
+Whole-page cache for the anonymous catalog pages.
+
+/marketplace, /browse and /vehicle/<id> look the same to every visitor who
+isn't logged in as an admin, so a view hands its rendering to
+`cached_page(render)` and each worker keeps the HTML per normalized URL
+(path plus sorted, non-empty query parameters):
+
+- fresh (younger than PAGE_CACHE_TTL seconds, default 30): served as is;
+- stale (up to PAGE_CACHE_STALE seconds more, default 300): served as is
+  while one background thread renders a replacement;
+- missing or older: rendered in the request. Concurrent requests for the
+  same URL wait for that one render instead of each running it, so a burst
+  of hits on a new listing costs one render. A render that isn't a page
+  (e.g. the redirect for a listing that is gone) isn't cached, but the
+  waiting requests still get it rather than rendering again one by one.
+
+Admin sessions, requests with flashed messages waiting to be shown and
+non-GET requests always render. A page keeps the surrogate keys its render
+added (http_cache.add_surrogate_keys), so hits send the same Surrogate-Key,
+and committing a vehicle change in this worker marks only the pages tagged
+with the keys it purges stale (the listing, its categories, category-all
+and marketplace); other workers catch up within the TTL.
+PAGE_CACHE_SIZE bounds the pages kept per worker (default 500); 0, or
+PAGE_CACHE = False in the app config (as in TestingConfig), turns the cache
+off.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import app, db
+from http_cache import changed_keys, has_pending_flashes, is_admin
+
+# How long a leader's render may take before waiting requests render themselves
+COALESCE_TIMEOUT = 10
+
+
+class RenderedPage(str):
+    """A page's HTML and the surrogate keys of what it shows"""
+    surrogate_keys = frozenset()
+
+
+class SharedResponse:
+    """A response a render returned instead of a page, as data each waiting request makes its own copy of"""
+
+    def __init__(self, response):
+        self.body = response.get_data()
+        self.status = response.status_code
+        self.headers = list(response.headers.items())
+
+    def to_response(self):
+        return app.response_class(self.body, self.status, self.headers)
+
+
+class _Render:
+    """A render in progress; `result` is what it returned, for the requests waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class PageCache:
+    """Bounded LRU of rendered pages with stale-while-revalidate and one render per key at a time"""
+
+    def __init__(self, size, ttl, stale):
+        self.size = size
+        self.ttl = ttl
+        self.stale = stale
+        self.renders = 0
+        self._lock = threading.Lock()
+        self._pages = OrderedDict()  # key -> (rendered_at, html)
+        self._rendering = {}  # key -> _Render in progress
+
+    def serve(self, key, render, refresh):
+        """(html, 'HIT' | 'STALE' | 'MISS'); `refresh` re-renders in the background"""
+        while True:
+            with self._lock:
+                entry = self._pages.get(key)
+                age = time.monotonic() - entry[0] if entry else None
+                if entry is not None and age <= self.ttl + self.stale:
+                    self._pages.move_to_end(key)
+                    if age <= self.ttl:
+                        return entry[1], 'HIT'
+                    if key not in self._rendering:
+                        self._rendering[key] = _Render()
+                        threading.Thread(target=self._refresh, args=(key, refresh), daemon=True).start()
+                    return entry[1], 'STALE'
+                pending = self._rendering.get(key)
+                if pending is None:
+                    self._rendering[key] = _Render()
+                    break
+            # Someone is rendering this page already: wait for it and use theirs
+            if not pending.done.wait(COALESCE_TIMEOUT):
+                return render(), 'MISS'
+            if pending.result is not None and not isinstance(pending.result, str):
+                return pending.result, 'MISS'  # not cached, but no need to render it again
+
+        html = None
+        try:
+            html = render()
+            if isinstance(html, str):
+                self._store(key, html)
+            return html, 'MISS'
+        finally:
+            self._finish(key, html)
+
+    def mark_stale(self, keys=None):
+        """Serve the pages tagged with any of the surrogate `keys` (default: every page) at most once
+        more before they are re-rendered"""
+        with self._lock:
+            expired = time.monotonic() - self.ttl - 0.001
+            for key, (rendered_at, html) in self._pages.items():
+                if keys is None or not keys.isdisjoint(getattr(html, 'surrogate_keys', ())):
+                    self._pages[key] = (min(rendered_at, expired), html)
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+            self.renders = 0
+
+    def __len__(self):
+        return len(self._pages)
+
+    def _refresh(self, key, refresh):
+        html = None
+        try:
+            html = refresh()
+            if isinstance(html, str):
+                self._store(key, html)
+            else:
+                self._drop(key)  # e.g. the listing is gone and the page now redirects
+        except Exception as e:
+            app.logger.error(f"Background refresh of {key} failed: {e}")
+        finally:
+            self._finish(key, html)
+
+    def _store(self, key, html):
+        with self._lock:
+            self.renders += 1
+            self._pages[key] = (time.monotonic(), html)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.size:
+                self._pages.popitem(last=False)
+
+    def _drop(self, key):
+        with self._lock:
+            self._pages.pop(key, None)
+
+    def _finish(self, key, result):
+        with self._lock:
+            pending = self._rendering.pop(key)
+        pending.result = result
+        pending.done.set()
+
+
+page_cache = PageCache(size=int(os.environ.get('PAGE_CACHE_SIZE', 500)),
+                       ttl=float(os.environ.get('PAGE_CACHE_TTL', 30)),
+                       stale=float(os.environ.get('PAGE_CACHE_STALE', 300)))
+
+
+def page_key():
+    """The request's path with its non-empty query parameters in a fixed order"""
+    params = sorted((name, value) for name, value in request.args.items(multi=True) if value.strip())
+    return f"{request.path}?{urlencode(params)}" if params else request.path
+
+
+def cacheable():
+    return (page_cache.size > 0 and app.config.get('PAGE_CACHE', True) and request.method == 'GET'
+            and not is_admin() and not has_pending_flashes() and not g.get('snapshot'))
+
+
+def cached_page(render):
+    """The page `render()` returns (HTML text, or a response that isn't cached) for this URL.
+
+    `render` may run later in a background thread under a fresh request
+    context for the same URL, so it should read the request, not close over
+    request-specific objects.
+    """
+    if not cacheable():
+        return render()
+    key = page_key()
+    url = request.full_path
+    replica = g.get('db_read_replica', False)
+
+    def render_page():
+        html = render()
+        if isinstance(html, str):
+            html = RenderedPage(html)
+            html.surrogate_keys = frozenset(g.get('surrogate_keys', ()))
+            return html
+        # Requests waiting on this render get the same result; each needs its own Response
+        return SharedResponse(app.make_response(html))
+
+    def refresh():
+        with app.test_request_context(url):
+            g.db_read_replica = replica
+            try:
+                return render_page()
+            finally:
+                db.session.remove()
+
+    html, status = page_cache.serve(key, render_page, refresh)
+    g.page_cache_status = status
+    g.surrogate_keys = set(getattr(html, 'surrogate_keys', ()))
+    return html.to_response() if isinstance(html, SharedResponse) else html
+
+
+@app.after_request
+def _page_cache_header(response):
+    status = g.get('page_cache_status')
+    if status:
+        response.headers['X-Page-Cache'] = status
+    return response
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_vehicle_pages(session, flush_context):
+    keys = changed_keys(session)
+    if keys:
+        session.info.setdefault('stale_page_keys', set()).update(keys)
+
+
+@event.listens_for(Session, 'after_commit')
+def _expire_vehicle_pages(session):
+    keys = session.info.pop('stale_page_keys', None)
+    if keys:
+        page_cache.mark_stale(keys)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_vehicle_pages(session):
+    session.info.pop('stale_page_keys', None)
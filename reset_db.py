@@ -2,15 +2,20 @@
 #!/usr/bin/env python3
 """Reset database and add sample vehicles"""
 
+from flask_migrate import upgrade
+from sqlalchemy import text
+
 from app import app, db
 from models import initialize_sample_data
 
 def reset_database():
     """Reset the database and add sample data"""
     with app.app_context():
-        # Drop all tables and recreate
+        # Drop all tables and rebuild them from the migrations
         db.drop_all()
-        db.create_all()
+        db.session.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        db.session.commit()
+        upgrade()
         
         # Add sample data including the new vehicles
         initialize_sample_data()
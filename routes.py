@@ -1,11 +1,24 @@
 import os
 import uuid
-from flask import render_template, request, redirect, url_for, flash, session, jsonify, render_template_string
+from datetime import date, timedelta
+from flask import render_template, request, redirect, url_for, flash, session, jsonify, render_template_string, send_file
 from werkzeug.utils import secure_filename
 
 from app import app, db
-from models import Vehicle, AdminUser, add_vehicle, get_all_vehicles, get_vehicle, delete_vehicle, verify_admin, get_available_vehicles, get_vehicles_by_category, initialize_sample_data
+from models import Vehicle, AdminUser, DuplicateVehicleError, VehicleNotFound, vehicle_for_update, add_vehicle, get_all_vehicles, get_vehicle, get_renamed_vehicle_id, delete_vehicle, verify_admin, get_available_vehicles, get_vehicles_by_category, get_feature_tags, get_expiring_insurance, find_vehicles_by_identifier, search_vehicles, get_inventory_stats, browse_query, VEHICLE_SORTS, initialize_sample_data
+from feature_index import filter_by_features
+from feature_tags import parse_tag_filter
+from date_types import format_date
+from identifier_keys import KEY_COLUMNS, identifier_key
+from enum_types import CATEGORIES, STATUSES, vocabulary_errors
 from forms import VehicleForm, LoginForm, ImageManagementForm
+from db_routing import read_replica
+from page_cache import cached_page
+from http_cache import add_surrogate_keys, category_key, vehicle_key
+from image_ingest import save_photo
+from image_placeholders import record as record_image_info
+from image_resize import ALLOWED_SIZES, RESIZING, derivatives, negotiate
+from write_queue import run_write
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'png', 'jpg', 'jpeg', 'gif'}
@@ -27,6 +40,7 @@ def save_uploaded_files(files):
     
     app.logger.info(f"Processing {len(limited_files)} valid files out of {len(files)} total files")
 
+    infos = {}
     for file in limited_files:
         if file and hasattr(file, 'filename') and file.filename and allowed_file(file.filename):
             try:
@@ -38,9 +52,11 @@ def save_uploaded_files(files):
                 # Ensure upload directory exists
                 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
                 
-                # Save the file
-                file.save(filepath)
+                # Save the file upright, without camera metadata and at most UPLOAD_MAX_EDGE pixels
+                info = save_photo(file, filepath)
                 filenames.append(filename)
+                if info:
+                    infos[filename] = info
                 app.logger.info(f"Successfully saved file: {filename} at path: {filepath}")
                 
                 # Verify file was saved
@@ -56,83 +72,137 @@ def save_uploaded_files(files):
             if file and hasattr(file, 'filename'):
                 app.logger.warning(f"File rejected - invalid filename or type: {file.filename}")
     
+    # Size and placeholder for the templates' <img> tags (image_placeholders)
+    record_image_info(infos)
     app.logger.info(f"Total files saved: {len(filenames)}")
     return filenames
 
+def remove_upload(filename):
+    """Delete an uploaded file no listing uses any more; failures are only logged"""
+    try:
+        path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        if os.path.exists(path):
+            os.remove(path)
+    except Exception as e:
+        app.logger.warning(f"Could not delete uploaded file {filename}: {e}")
+
 @app.route('/')
 def index():
     """Landing page redirects to admin login"""
     return redirect(url_for('admin_login'))
 
 @app.route('/marketplace')
+@read_replica
 def marketplace():
     """Category selection page - users must select vehicle type first"""
-    categories = ['Cars', 'Trucks', 'Commercial Vehicles']
-    vehicle_counts = {}
-    
-    # Get counts for each category
-    all_vehicles = get_available_vehicles()
-    for category in categories:
-        vehicle_counts[category] = len([v for v in all_vehicles if v.category == category])
-    
-    # Set session flag to indicate user visited category selection
-    session['visited_marketplace'] = True
-    # Clear any previous category session data
-    session.pop('current_category', None)
-    
-    return render_template('category_selection.html', categories=categories, vehicle_counts=vehicle_counts)
+    def render():
+        add_surrogate_keys('marketplace')
+        categories = ['Cars', 'Trucks', 'Commercial Vehicles']
+        vehicle_counts = {}
+
+        # Get counts for each category
+        all_vehicles = get_available_vehicles()
+        for category in categories:
+            vehicle_counts[category] = len([v for v in all_vehicles if v.category == category])
+
+        return render_template('category_selection.html', categories=categories, vehicle_counts=vehicle_counts)
+
+    return cached_page(render)
+
+# sort name (see models.VEHICLE_SORTS) -> label
+BROWSE_SORTS = {
+    'newest': 'Newest first',
+    'price_asc': 'Price: low to high',
+    'price_desc': 'Price: high to low',
+    'year_desc': 'Year: newest first',
+    'mileage_asc': 'Mileage: lowest first',
+}
+BROWSE_RANGES = ['min_price', 'max_price', 'min_year', 'max_year', 'max_mileage']
+BROWSE_PER_PAGE = 24
 
 @app.route('/browse')
+@read_replica
 def browse_vehicles():
     """Customer-facing catalog page with filtered vehicles"""
     category = request.args.get('category')
     search = request.args.get('search', '')
     
-    # Redirect to marketplace if no category is selected or if accessing directly
-    if not category:
-        return redirect(url_for('marketplace'))
-    
-    # Check if user visited marketplace first (session-based check)
-    # Allow if they have marketplace session or coming from browse/marketplace
-    referrer = request.referrer or ''
-    has_marketplace_session = session.get('visited_marketplace')
-    from_valid_page = any(x in referrer for x in ['/marketplace', '/browse'])
-    
-    if not has_marketplace_session and not from_valid_page:
+    # Redirect to marketplace if no (known) category is selected; the URL is all the state there is
+    if category != 'all' and category not in CATEGORIES:
         return redirect(url_for('marketplace'))
 
-    # Get available vehicles based on category
-    if category == 'all':
-        vehicles = get_available_vehicles()
-    else:
-        vehicles = [v for v in get_available_vehicles() if v.category == category]
-
-    # Simple search filter
-    if search:
-        vehicles = [v for v in vehicles if 
-                   search.lower() in v.title.lower() or 
-                   search.lower() in v.make.lower() or 
-                   search.lower() in v.model.lower()]
-
-    # Debug: Log vehicle images for troubleshooting
-    for vehicle in vehicles:
-        if not vehicle.images_list or len(vehicle.images_list) == 0:
-            app.logger.warning(f"Vehicle \"{vehicle.title}\" has no images: {vehicle.images_list}")
-        else:
-            app.logger.info(f"Vehicle \"{vehicle.title}\" has images: {vehicle.images_list}")
+    def render():
+        # Available vehicles in the category, in range, with every selected feature tag
+        selected_features = parse_tag_filter(request.args.getlist('feature') + request.args.getlist('features'))
+        sort = request.args.get('sort') if request.args.get('sort') in BROWSE_SORTS else 'newest'
+        ranges = {name: request.args.get(name, type=int) for name in BROWSE_RANGES}
+        query = browse_query(category=None if category == 'all' else category, search=search.strip(), sort=sort, **ranges)
+        query = filter_by_features(query, selected_features, available_only=True)
+
+        page = max(request.args.get('page', 1, type=int), 1)
+        total = query.order_by(None).count()
+        pages = max((total + BROWSE_PER_PAGE - 1) // BROWSE_PER_PAGE, 1)
+        page = min(page, pages)
+        vehicles = query.limit(BROWSE_PER_PAGE).offset((page - 1) * BROWSE_PER_PAGE).all()
+        add_surrogate_keys(category_key(category), *(vehicle_key(vehicle.id) for vehicle in vehicles))
+
+        # Debug: Log vehicle images for troubleshooting
+        for vehicle in vehicles:
+            if not vehicle.images_list or len(vehicle.images_list) == 0:
+                app.logger.warning(f"Vehicle \"{vehicle.title}\" has no images: {vehicle.images_list}")
+            else:
+                app.logger.info(f"Vehicle \"{vehicle.title}\" has images: {vehicle.images_list}")
 
-    categories = ['Cars', 'Trucks', 'Commercial Vehicles']
-    return render_template('browse_vehicles.html', vehicles=vehicles, categories=categories, 
-                         current_category=category, search=search)
+        def page_url(number):
+            args = request.args.to_dict(flat=False)
+            args['page'] = number
+            return url_for('browse_vehicles', **args)
+
+        categories = ['Cars', 'Trucks', 'Commercial Vehicles']
+        return render_template('browse_vehicles.html', vehicles=vehicles, categories=categories, 
+                             current_category=category, search=search,
+                             feature_tags=get_feature_tags(), selected_features=selected_features,
+                             sorts=BROWSE_SORTS, sort=sort, ranges=ranges, total=total, page=page, pages=pages,
+                             page_url=page_url)
+
+    return cached_page(render)
 
 @app.route('/vehicle/<vehicle_id>')
+@read_replica
 def vehicle_detail(vehicle_id):
     """Vehicle detail page"""
-    vehicle = get_vehicle(vehicle_id)
-    if not vehicle:
-        flash('Vehicle not found', 'error')
-        return redirect(url_for('marketplace'))
-    return render_template('vehicle_detail.html', vehicle=vehicle)
+    def render():
+        vehicle = get_vehicle(vehicle_id)
+        if not vehicle:
+            renamed_id = get_renamed_vehicle_id(vehicle_id)
+            if renamed_id:
+                return redirect(url_for('vehicle_detail', vehicle_id=renamed_id), 301)
+            flash('Vehicle not found', 'error')
+            return redirect(url_for('marketplace'))
+        add_surrogate_keys(vehicle_key(vehicle.id))
+        return render_template('vehicle_detail.html', vehicle=vehicle)
+
+    return cached_page(render)
+
+@app.route('/img/<int:width>x<int:height>/<filename>')
+def resized_image(width, height, filename):
+    """An uploaded photo at one of the allowed sizes (see image_resize)"""
+    # A bare 404 rather than the site's redirect, so a broken <img> doesn't load a page
+    source = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    if (width, height) not in ALLOWED_SIZES or secure_filename(filename) != filename or not os.path.isfile(source):
+        return 'Image not found', 404
+    if not RESIZING:
+        return redirect(url_for('static', filename='uploads/' + filename))
+    mimetype = negotiate(request.accept_mimetypes)
+    try:
+        path = derivatives.get(source, width, height, mimetype)
+    except OSError as e:  # not an image Pillow can read
+        app.logger.warning(f"Could not resize {filename} to {width}x{height}: {e}")
+        return 'Image not found', 404
+    # Upload names are never reused, so a copy never changes
+    response = send_file(os.path.abspath(path), mimetype=mimetype, max_age=365 * 24 * 3600)
+    response.vary.add('Accept')
+    return response
 
 @app.route('/secret-admin-access-2025', methods=['GET', 'POST'])
 def admin_login():
@@ -195,13 +265,26 @@ def admin_wizard():
         return redirect(url_for('admin_login'))
 
 @app.route('/admin/api/vehicles')
+@read_replica
 def admin_api_vehicles():
-    """API endpoint to get all vehicles as JSON"""
+    """API endpoint to get one page of vehicles as JSON.
+
+    Query parameters: search, status, category, sort (see VEHICLE_SORTS),
+    page and per_page (max 200).
+    """
     if not session.get('admin_logged_in'):
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     
+    search = request.args.get('search', '').strip()
+    status = request.args.get('status') if request.args.get('status') in STATUSES else None
+    category = request.args.get('category') if request.args.get('category') in CATEGORIES else None
+    sort = request.args.get('sort') if request.args.get('sort') in VEHICLE_SORTS else 'newest'
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+    page = max(request.args.get('page', 1, type=int), 1)
+
     try:
-        vehicles = get_all_vehicles()  # Already ordered by newest first from models.py
+        vehicles, total = search_vehicles(search=search, status=status, category=category, sort=sort,
+                                          page=page, per_page=per_page)
         vehicles_data = []
         
         for vehicle in vehicles:
@@ -235,7 +318,7 @@ def admin_api_vehicles():
                 'service_records': vehicle.service_records,
                 'insurance_company': vehicle.insurance_company,
                 'insurance_policy_number': vehicle.insurance_policy_number,
-                'insurance_expiry': vehicle.insurance_expiry,
+                'insurance_expiry': format_date(vehicle.insurance_expiry),
                 'registration_number': vehicle.registration_number,
                 'vin_number': vehicle.vin_number,
                 'exterior_color': vehicle.exterior_color,
@@ -252,12 +335,84 @@ def admin_api_vehicles():
         return jsonify({
             'success': True,
             'vehicles': vehicles_data,
-            'total': len(vehicles_data)
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page,
+            'sort': sort,
+            'stats': get_inventory_stats()
         })
     except Exception as e:
         app.logger.error(f"Error fetching vehicles API: {e}")
         return jsonify({'success': False, 'message': 'Failed to fetch vehicles'}), 500
 
+@app.route('/admin/api/vehicles/lookup')
+@read_replica
+def admin_api_lookup_vehicle():
+    """API endpoint finding vehicles by exact VIN, registration number or vehicle number (?q=)"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+
+    key = identifier_key(request.args.get('q'))
+    if not key:
+        return jsonify({'success': False, 'message': 'Enter a VIN or plate number'}), 400
+
+    try:
+        vehicles = find_vehicles_by_identifier(key)
+        return jsonify({
+            'success': True,
+            'key': key,
+            'vehicles': [{
+                'id': vehicle.id,
+                'title': vehicle.title,
+                'status': vehicle.status,
+                'vin_number': vehicle.vin_number,
+                'registration_number': vehicle.registration_number,
+                'vehicle_number': vehicle.vehicle_number,
+                'matched': [field for field, key_field in KEY_COLUMNS.items() if getattr(vehicle, key_field) == key],
+            } for vehicle in vehicles]
+        })
+    except Exception as e:
+        app.logger.error(f"Error looking up vehicle {key}: {e}")
+        return jsonify({'success': False, 'message': 'Failed to look up vehicle'}), 500
+
+@app.route('/admin/api/insurance/expiring')
+@read_replica
+def admin_api_expiring_insurance():
+    """API endpoint listing vehicles whose insurance expires within ?days= (default 30)"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+
+    days = min(max(request.args.get('days', 30, type=int), 0), 366)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 500)
+    today = date.today()
+    # ?expired=1 also lists policies that have already lapsed
+    start = date.min if request.args.get('expired') == '1' else today
+    end = today + timedelta(days=days)
+
+    try:
+        vehicles, total = get_expiring_insurance(start, end, limit=limit)
+        return jsonify({
+            'success': True,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'total': total,
+            'vehicles': [{
+                'id': vehicle.id,
+                'title': vehicle.title,
+                'vehicle_number': vehicle.vehicle_number,
+                'registration_number': vehicle.registration_number,
+                'status': vehicle.status,
+                'insurance_company': vehicle.insurance_company,
+                'insurance_policy_number': vehicle.insurance_policy_number,
+                'insurance_expiry': format_date(vehicle.insurance_expiry),
+                'days_left': (vehicle.insurance_expiry - today).days,
+            } for vehicle in vehicles]
+        })
+    except Exception as e:
+        app.logger.error(f"Error fetching expiring insurance: {e}")
+        return jsonify({'success': False, 'message': 'Failed to fetch expiring insurance'}), 500
+
 @app.route('/admin/spa')
 def admin_dashboard_spa():
     """Single Page Admin Dashboard (Alternative)"""
@@ -383,10 +538,15 @@ def add_vehicle_route():
                 warranty_info=form.warranty_info.data or None
             )
 
-            db.session.add(vehicle)
-            db.session.commit()
-            return jsonify({'success': True, 'message': 'Vehicle added successfully', 'vehicle': vehicle.to_dict()})
+            def create(session):
+                session.add(vehicle)
+                session.flush()
+                return vehicle.to_dict()
 
+            return jsonify({'success': True, 'message': 'Vehicle added successfully', 'vehicle': run_write(create)})
+
+        except DuplicateVehicleError as e:
+            return jsonify({'success': False, 'message': str(e), 'duplicates': e.matches}), 409
         except Exception as e:
             app.logger.error(f"Error adding vehicle: {str(e)}")
             db.session.rollback()
@@ -414,20 +574,14 @@ def get_vehicle_for_edit(vehicle_id):
         return jsonify({'success': False, 'message': 'Authentication required'}), 401
 
     try:
-        # Close any existing connections and get fresh session
-        db.session.close()
-        
-        # Use fresh query with proper session handling
-        with db.session.begin():
-            vehicle = db.session.get(Vehicle, vehicle_id)
-            
-            if not vehicle:
-                app.logger.warning(f"Vehicle not found: {vehicle_id}")
-                return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
+        vehicle = get_vehicle(vehicle_id)
+        if not vehicle:
+            app.logger.warning(f"Vehicle not found: {vehicle_id}")
+            return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
+
+        # Convert vehicle data to format expected by form
+        vehicle_data = vehicle.to_dict()
 
-            # Convert vehicle data to format expected by form
-            vehicle_data = vehicle.to_dict()
-            
         # Ensure all fields have proper values for form binding
         form_data = {
             'id': vehicle_data.get('id', ''),
@@ -475,21 +629,6 @@ def get_vehicle_for_edit(vehicle_id):
 
     except Exception as e:
         app.logger.error(f"Database error when fetching vehicle {vehicle_id}: {str(e)}")
-        # Try to refresh the database connection
-        try:
-            db.session.rollback()
-            db.session.close()
-        except:
-            pass
-        
-        # Try alternative query method as fallback
-        try:
-            vehicle = Vehicle.query.filter_by(id=vehicle_id).first()
-            if vehicle:
-                return jsonify({'success': True, 'vehicle': vehicle.to_dict()})
-        except:
-            pass
-            
         return jsonify({'success': False, 'message': 'Database connection error. Please refresh the page and try again.'}), 500
 
 @app.route('/admin/edit_vehicle/<vehicle_id>', methods=['GET', 'POST'])
@@ -556,12 +695,30 @@ def edit_vehicle(vehicle_id):
                 'warranty_info': form.warranty_info.data or None
             }
 
+            errors = vocabulary_errors(update_data)
+            if errors:
+                return jsonify({'success': False, 'message': 'Validation failed', 'errors': errors}), 400
+
             # Images are managed separately - no image updates here
 
-            vehicle.update_from_dict(**update_data)
-            db.session.commit()
-            return jsonify({'success': True, 'message': 'Vehicle updated successfully', 'vehicle': vehicle.to_dict()})
+            changes = vehicle.changed_fields(**update_data)
+            if not changes:
+                return jsonify({'success': True, 'message': 'No changes to save',
+                                'vehicle': vehicle.to_dict(), 'changed_fields': []})
+
+            def update(session):
+                target = vehicle_for_update(session, vehicle_id)
+                target.update_from_dict(**changes)
+                session.flush()
+                return target.to_dict()
 
+            return jsonify({'success': True, 'message': 'Vehicle updated successfully',
+                            'vehicle': run_write(update), 'changed_fields': list(changes)})
+
+        except VehicleNotFound:
+            return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
+        except DuplicateVehicleError as e:
+            return jsonify({'success': False, 'message': str(e), 'duplicates': e.matches}), 409
         except Exception as e:
             return jsonify({'success': False, 'message': f'Error updating vehicle: {str(e)}'}), 500
 
@@ -597,12 +754,8 @@ def delete_vehicle_route(vehicle_id):
         return jsonify({'success': False, 'message': 'Authentication required'}), 401
 
     try:
-        vehicle = Vehicle.query.get(vehicle_id)
-        if not vehicle:
+        if not delete_vehicle(vehicle_id):
             return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
-        
-        db.session.delete(vehicle)
-        db.session.commit()
         return jsonify({'success': True, 'message': 'Vehicle deleted successfully'})
     except Exception as e:
         db.session.rollback()
@@ -615,15 +768,17 @@ def toggle_vehicle_status(vehicle_id):
     if not session.get('admin_logged_in'):
         return jsonify({'success': False, 'message': 'Authentication required'}), 401
 
+    def toggle(session):
+        target = vehicle_for_update(session, vehicle_id)
+        new_status = 'sold' if target.status == 'available' else 'available'
+        target.update_from_dict(status=new_status)
+        return new_status
+
     try:
-        vehicle = Vehicle.query.get(vehicle_id)
-        if not vehicle:
-            return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
-        
-        new_status = 'sold' if vehicle.status == 'available' else 'available'
-        vehicle.update_from_dict(status=new_status)
-        db.session.commit()
+        new_status = run_write(toggle)
         return jsonify({'success': True, 'message': f'Vehicle marked as {new_status}', 'new_status': new_status})
+    except VehicleNotFound:
+        return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error toggling vehicle status {vehicle_id}: {str(e)}")
@@ -638,6 +793,9 @@ def admin_api_create_vehicle():
     
     try:
         form_data = request.form.to_dict()
+        errors = vocabulary_errors(form_data)
+        if errors:
+            return jsonify({'success': False, 'message': 'Validation failed', 'errors': errors}), 400
         
         # Handle file uploads
         files = request.files.getlist('images[]') if 'images[]' in request.files else []
@@ -671,8 +829,7 @@ def admin_api_create_vehicle():
         vehicle = Vehicle(**vehicle_data)
         
         # Add the vehicle to database
-        db.session.add(vehicle)
-        db.session.commit()
+        run_write(lambda session: session.add(vehicle))
         
         return jsonify({
             'success': True, 
@@ -693,6 +850,8 @@ def admin_api_create_vehicle():
             }
         })
         
+    except DuplicateVehicleError as e:
+        return jsonify({'success': False, 'message': str(e), 'duplicates': e.matches}), 409
     except Exception as e:
         app.logger.error(f"Error creating vehicle: {e}")
         return jsonify({'success': False, 'message': 'Error creating vehicle'}), 500
@@ -709,6 +868,9 @@ def admin_api_update_vehicle(vehicle_id):
             return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
         
         form_data = request.form.to_dict()
+        errors = vocabulary_errors(form_data)
+        if errors:
+            return jsonify({'success': False, 'message': 'Validation failed', 'errors': errors}), 400
         
         # Handle file uploads
         files = request.files.getlist('images[]') if 'images[]' in request.files else []
@@ -739,15 +901,21 @@ def admin_api_update_vehicle(vehicle_id):
         
         if all_images:
             update_data['images'] = all_images
-            
-        vehicle.update_from_dict(**update_data)
-        
-        # Save to database
-        db.session.commit()
+
+        # Only write (and invalidate) when something actually changed
+        changes = vehicle.changed_fields(**update_data)
+        if changes:
+            def update(session):
+                target = vehicle_for_update(session, vehicle_id)
+                target.update_from_dict(**changes)
+                return target
+
+            vehicle = run_write(update)
         
         return jsonify({
             'success': True, 
-            'message': 'Vehicle updated successfully',
+            'message': 'Vehicle updated successfully' if changes else 'No changes to save',
+            'changed_fields': list(changes),
             'vehicle': {
                 'id': vehicle.id,
                 'title': vehicle.title,
@@ -764,6 +932,10 @@ def admin_api_update_vehicle(vehicle_id):
             }
         })
         
+    except VehicleNotFound:
+        return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
+    except DuplicateVehicleError as e:
+        return jsonify({'success': False, 'message': str(e), 'duplicates': e.matches}), 409
     except Exception as e:
         app.logger.error(f"Error updating vehicle: {e}")
         return jsonify({'success': False, 'message': 'Error updating vehicle'}), 500
@@ -786,6 +958,7 @@ def admin_api_delete_vehicle(vehicle_id):
 
 # Vehicle Selection and Image Management Routes
 @app.route('/admin/select-vehicle')
+@read_replica
 def admin_select_vehicle():
     """Vehicle selection interface"""
     if not session.get('admin_logged_in'):
@@ -814,10 +987,6 @@ def admin_upload_image_to_slot(vehicle_id):
     if not session.get('admin_logged_in'):
         return jsonify({'success': False, 'message': 'Authentication required'}), 401
 
-    vehicle = Vehicle.query.get(vehicle_id)
-    if not vehicle:
-        return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
-
     try:
         slot_index = int(request.form.get('slot', 0))
         image_file = request.files.get('image')
@@ -834,32 +1003,33 @@ def admin_upload_image_to_slot(vehicle_id):
             return jsonify({'success': False, 'message': 'Failed to save image'}), 500
             
         new_image = image_filenames[0]
-        
-        # Get current images and ensure we have a list with 6 slots
-        current_images = vehicle.images_list[:]
-        while len(current_images) < 6:
-            current_images.append('')
-            
-        # Replace or add image at specific slot
-        if slot_index < len(current_images):
-            # If there was an old image at this slot, we could delete it here
-            old_image = current_images[slot_index]
-            if old_image:
-                try:
-                    old_path = os.path.join(app.config['UPLOAD_FOLDER'], old_image)
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
-                except Exception as e:
-                    app.logger.warning(f"Could not delete old image {old_image}: {e}")
-            
-            current_images[slot_index] = new_image
-        
-        # Remove empty strings from the end and save
-        while current_images and current_images[-1] == '':
-            current_images.pop()
-            
-        vehicle.images_list = current_images
-        db.session.commit()
+
+        def place_image(session):
+            """Put new_image in the slot and return the image it replaced, if any"""
+            target = vehicle_for_update(session, vehicle_id)
+            # Get current images and ensure we have a list with 6 slots
+            current_images = target.images_list[:]
+            while len(current_images) < 6:
+                current_images.append('')
+
+            old_image = None
+            if slot_index < len(current_images):
+                old_image = current_images[slot_index] or None
+                current_images[slot_index] = new_image
+
+            # Remove empty strings from the end and save
+            while current_images and current_images[-1] == '':
+                current_images.pop()
+            target.images_list = current_images
+            return old_image
+
+        try:
+            old_image = run_write(place_image)
+        except VehicleNotFound:
+            remove_upload(new_image)
+            return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
+        if old_image:
+            remove_upload(old_image)
         
         app.logger.info(f"Saved image {new_image} to slot {slot_index} for vehicle {vehicle_id}")
         
@@ -881,36 +1051,27 @@ def admin_delete_image_from_slot(vehicle_id, slot_index):
     if not session.get('admin_logged_in'):
         return jsonify({'success': False, 'message': 'Authentication required'}), 401
 
-    vehicle = Vehicle.query.get(vehicle_id)
-    if not vehicle:
-        return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
-
-    try:
-        current_images = vehicle.images_list[:]
-        
+    def clear_slot(session):
+        """Empty the slot and return the image that was in it, or None if it was empty"""
+        target = vehicle_for_update(session, vehicle_id)
+        current_images = target.images_list[:]
         if slot_index >= len(current_images) or not current_images[slot_index]:
-            return jsonify({'success': False, 'message': 'No image found at this slot'}), 404
-        
-        # Get the image filename to delete
-        image_to_delete = current_images[slot_index]
-        
-        # Remove image from the list
+            return None
+
+        image = current_images[slot_index]
         current_images[slot_index] = ''
-        
         # Clean up empty strings from the end
         while current_images and current_images[-1] == '':
             current_images.pop()
-            
-        vehicle.images_list = current_images
-        db.session.commit()
-        
-        # Try to delete the physical file
-        try:
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], image_to_delete)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception as e:
-            app.logger.warning(f"Could not delete physical file {image_to_delete}: {e}")
+        target.images_list = current_images
+        return image
+
+    try:
+        image_to_delete = run_write(clear_slot)
+        if image_to_delete is None:
+            return jsonify({'success': False, 'message': 'No image found at this slot'}), 404
+
+        remove_upload(image_to_delete)
         
         app.logger.info(f"Deleted image {image_to_delete} from slot {slot_index} for vehicle {vehicle_id}")
         
@@ -920,6 +1081,8 @@ def admin_delete_image_from_slot(vehicle_id, slot_index):
             'slot': slot_index
         })
 
+    except VehicleNotFound:
+        return jsonify({'success': False, 'message': 'Vehicle not found'}), 404
     except Exception as e:
         app.logger.error(f"Error deleting image from slot: {str(e)}")
         db.session.rollback()
@@ -6,6 +6,8 @@ Run this script to initialize the database and create admin user.
 
 import os
 import sys
+from flask_migrate import upgrade
+
 from app import app, db
 from models import initialize_sample_data
 
@@ -15,9 +17,9 @@ def setup_database():
     
     with app.app_context():
         try:
-            # Create all tables
-            db.create_all()
-            print("✓ Database tables created successfully")
+            # Apply all schema migrations
+            upgrade()
+            print("✓ Database schema is up to date")
             
             # Initialize sample data
             initialize_sample_data()
@@ -0,0 +1,110 @@
+"""
+SQLite engine profile for running the app on a local database file.
+
+With the default rollback journal, an admin saving a vehicle locks the whole
+file and every gunicorn worker serving the catalog waits. In WAL mode readers
+keep reading the last committed snapshot while a single writer appends to the
+log, and `busy_timeout` makes concurrent writers queue instead of failing with
+"database is locked".
+
+The pragmas are applied on every new DBAPI connection through a SQLAlchemy
+`connect` event. `PRAGMA optimize` runs when a connection is opened and then
+periodically when a connection is returned to the pool, so the query planner
+statistics stay current without a cron job.
+
+The sqlite3 module's own transaction handling is switched off so SQLAlchemy
+emits BEGIN itself: SAVEPOINTs then work, and a connection can ask for
+`BEGIN IMMEDIATE` (take the write lock up front) with the `sqlite_begin`
+execution option, as the single writer in write_queue does.
+"""
+import os
+import sqlite3
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+OPTIMIZE_INTERVAL = int(os.environ.get('SQLITE_OPTIMIZE_INTERVAL', 3600))  # seconds
+
+# Applied in order on every new connection. cache_size is per connection
+# (negative = KiB), so it is kept modest: each worker holds a few connections.
+SQLITE_PRAGMAS = [
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),  # durable in WAL mode except on power loss; no fsync per commit
+    ('busy_timeout', BUSY_TIMEOUT_MS),
+    ('mmap_size', int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+    ('cache_size', int(os.environ.get('SQLITE_CACHE_SIZE', -20000))),
+    ('temp_store', 'MEMORY'),
+    ('analysis_limit', 400),  # bounds the work PRAGMA optimize may do
+]
+
+
+def is_memory_database(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+
+def sqlite_engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for a SQLite URI.
+
+    File databases get a bounded QueuePool sized for gunicorn's threads.
+    Connections to a local file can't go stale, so pool_pre_ping and
+    pool_recycle would only add a round trip per checkout. In-memory databases
+    keep Flask-SQLAlchemy's single shared connection.
+    """
+    if is_memory_database(uri):
+        return {}
+    return {
+        'pool_size': int(os.environ.get('SQLITE_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('SQLITE_MAX_OVERFLOW', 5)),
+        'pool_timeout': 30,
+        # sqlite3's own lock wait, in seconds; matches busy_timeout
+        'connect_args': {'timeout': BUSY_TIMEOUT_MS / 1000},
+    }
+
+
+@event.listens_for(Engine, 'connect')
+def apply_pragmas(dbapi_connection, connection_record):
+    """Set the SQLite pragmas on every new connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    # Let SQLAlchemy emit BEGIN (see begin_transaction)
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    try:
+        memory = cursor.execute('PRAGMA database_list').fetchone()[2] == ''
+        for name, value in SQLITE_PRAGMAS:
+            if memory and name in ('journal_mode', 'mmap_size'):
+                continue
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if not memory:
+            # Recommended for long-lived connections: analyze tables that need it
+            cursor.execute('PRAGMA optimize = 0x10002')
+    finally:
+        cursor.close()
+    connection_record.info['sqlite_optimized_at'] = time.monotonic()
+
+
+@event.listens_for(Engine, 'begin')
+def begin_transaction(connection):
+    """Start SQLite transactions explicitly: DEFERRED, or IMMEDIATE for writers"""
+    if connection.dialect.name != 'sqlite':
+        return
+    mode = connection.get_execution_options().get('sqlite_begin', 'DEFERRED')
+    connection.exec_driver_sql(f'BEGIN {mode}')
+
+
+@event.listens_for(Engine, 'checkin')
+def optimize_periodically(dbapi_connection, connection_record):
+    """Run PRAGMA optimize on pooled connections once per OPTIMIZE_INTERVAL"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    last = connection_record.info.get('sqlite_optimized_at')
+    if last is None or time.monotonic() - last < OPTIMIZE_INTERVAL:
+        return
+    connection_record.info['sqlite_optimized_at'] = time.monotonic()
+    try:
+        dbapi_connection.execute('PRAGMA optimize')
+    except sqlite3.Error:
+        # Busy or read-only: try again after the next interval
+        pass
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Worker startup report: per-module import time and time to first request.
+
+Each measurement runs in a fresh interpreter, the same way a gunicorn worker
+boots. The report also records how many database connections were opened
+while importing the app (it should be zero: schema and seed data are handled
+by `flask db upgrade` / `flask seed`, not at import time).
+
+Usage:
+    python3 startup_report.py
+    python3 startup_report.py --path /browse?category=Cars --budget 1.0
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Every top-level module of the app, so new ones aren't reported as third-party imports
+PROJECT_MODULES = sorted(name[:-3] for name in os.listdir(os.path.dirname(os.path.abspath(__file__)))
+                         if name.endswith('.py'))
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+BOOT_PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+import wsgi
+imported = time.perf_counter()
+from app import app, db
+with app.app_context():
+    pool = db.engine.pool
+    opened = pool.checkedout() + (pool.checkedin() if hasattr(pool, 'checkedin') else 0)
+client = app.test_client()
+response = client.get(sys.argv[1])
+answered = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - started,
+    'first_request_seconds': answered - imported,
+    'time_to_first_request_seconds': answered - started,
+    'first_request_status': response.status_code,
+    'db_connections_after_import': opened,
+}))
+'''
+
+
+def import_times(entry_module='wsgi'):
+    """Parse `python -X importtime` output.
+
+    Returns {module: (self_us, cumulative_us)} and {module: parent}. Children
+    are printed before their parent, one indentation level deeper.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {entry_module}'],
+                            capture_output=True, text=True)
+    modules = {}
+    parents = {}
+    pending = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        modules[name] = (int(self_us), int(cumulative_us))
+        for child in pending.pop(depth + 1, []):
+            parents[child] = name
+        pending.setdefault(depth, []).append(name)
+    return modules, parents
+
+
+def boot_probe(path):
+    """Boot the app in a fresh interpreter and serve one request"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', BOOT_PROBE, path], capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Boot probe failed:\n{result.stderr[-2000:]}")
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    probe['process_wall_seconds'] = wall
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in probe.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure worker import time and time to first request')
+    parser.add_argument('--path', default='/marketplace', help='path requested as the first request')
+    parser.add_argument('--runs', type=int, default=3, help='boot probes to run (best and median are reported)')
+    parser.add_argument('--budget', type=float, default=1.0, help='boot budget in seconds (import + first request)')
+    parser.add_argument('--top', type=int, default=10, help='heaviest third-party imports to list')
+    parser.add_argument('--output', help='report path (default: startup_report_<timestamp>.json)')
+    args = parser.parse_args()
+
+    modules, parents = import_times()
+    project = {
+        name: {'self_ms': round(modules[name][0] / 1000, 2), 'cumulative_ms': round(modules[name][1] / 1000, 2)}
+        for name in PROJECT_MODULES if name in modules
+    }
+    # Third-party packages imported directly by one of our modules
+    direct = [name for name, parent in parents.items() if parent in PROJECT_MODULES and name not in PROJECT_MODULES]
+    top_level = sorted(((name, modules[name]) for name in direct), key=lambda item: item[1][1], reverse=True)[:args.top]
+    heaviest = {name: round(data[1] / 1000, 2) for name, data in top_level}
+
+    probes = [boot_probe(args.path) for _ in range(args.runs)]
+    probes.sort(key=lambda p: p['time_to_first_request_seconds'])
+    median = probes[len(probes) // 2]
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    report = {
+        'timestamp': timestamp,
+        'first_request_path': args.path,
+        'budget_seconds': args.budget,
+        'within_budget': median['time_to_first_request_seconds'] <= args.budget,
+        'best': probes[0],
+        'median': median,
+        'project_modules': project,
+        'heaviest_third_party_imports_ms': heaviest,
+    }
+    output = args.output or f"startup_report_{timestamp}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("=" * 60)
+    print("WORKER STARTUP REPORT")
+    print("=" * 60)
+    for name, data in project.items():
+        print(f"  {name:<20} self {data['self_ms']:>8.1f} ms   cumulative {data['cumulative_ms']:>8.1f} ms")
+    print("Heaviest third-party imports:")
+    for name, cumulative in heaviest.items():
+        print(f"  {name:<24} {cumulative:>8.1f} ms")
+    print(f"Import time (median):          {median['import_seconds'] * 1000:.1f} ms")
+    print(f"First request {args.path}: {median['first_request_seconds'] * 1000:.1f} ms "
+          f"(status {median['first_request_status']})")
+    print(f"Time to first request:         {median['time_to_first_request_seconds'] * 1000:.1f} ms")
+    print(f"DB connections during import:  {median['db_connections_after_import']}")
+    print(("✅" if report['within_budget'] else "❌") + f" Budget {args.budget}s")
+    print(f"📄 Report written to {output}")
+    return 0 if report['within_budget'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Static HTML snapshots of the public catalog pages, for nginx to serve
+without calling the app.
+
+Each page is rendered exactly as an anonymous visitor would get it and
+written under SNAPSHOT_DIR, named after its surrogate key (http_cache):
+
+    /marketplace               -> marketplace.html
+    /browse?category=<name>    -> category-<name>.html  (first page, default sort)
+    /vehicle/<id>              -> vehicle-<id>.html
+
+`flask snapshots` renders every page using a process pool. After that
+the build is incremental: with SNAPSHOT_DIR set, a committed vehicle change
+re-renders just the pages for the keys http_cache purges (the vehicle, its
+old and new category, category-all and marketplace) in the purge thread.
+A page that no longer renders (a deleted listing) loses its file, so nginx
+falls through to the app. Files are replaced atomically and only when their
+content changed. Incremental rebuilds run one at a time, across threads and
+worker processes (a lock file in SNAPSHOT_DIR), so a render that started
+before a later change can never be written after that change's render.
+"""
+import fcntl
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlencode
+
+from flask import g
+from sqlalchemy import select
+
+from app import app, db
+from enum_types import CATEGORIES
+from http_cache import category_key, purge_hooks, vehicle_key
+from models import Vehicle
+
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR')
+# Pages per task handed to a pool worker
+CHUNK_SIZE = 200
+
+BROWSE_CATEGORIES = {category_key(category): category for category in ['all', *CATEGORIES]}
+
+
+def snapshot_url(key):
+    """The URL a surrogate key's snapshot is rendered from, or None if it has no snapshot"""
+    if key == 'marketplace':
+        return '/marketplace'
+    if key in BROWSE_CATEGORIES:
+        return '/browse?' + urlencode({'category': BROWSE_CATEGORIES[key]})
+    if key.startswith('vehicle-'):
+        return '/vehicle/' + key[len('vehicle-'):]
+    return None
+
+
+def all_keys():
+    with app.app_context():
+        vehicle_ids = db.session.scalars(select(Vehicle.id).order_by(Vehicle.id)).all()
+    return ['marketplace', *BROWSE_CATEGORIES, *(vehicle_key(vehicle_id) for vehicle_id in vehicle_ids)]
+
+
+def render_snapshot(key):
+    """The anonymous page for `key` as bytes, or None if it isn't a 200"""
+    url = snapshot_url(key)
+    if url is None:
+        return None
+    # A fresh app context each time: its own g and database session
+    with app.app_context(), app.test_request_context(url):
+        g.snapshot = True  # straight from the primary, past the page cache
+        response = app.full_dispatch_request()
+        return response.get_data() if response.status_code == 200 else None
+
+
+def write_snapshot(out_dir, key):
+    """Render `key` into out_dir; 'written', 'unchanged' or 'removed'"""
+    path = os.path.join(out_dir, f'{key}.html')
+    html = render_snapshot(key)
+    if html is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return 'removed'
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == html:
+                return 'unchanged'
+    except FileNotFoundError:
+        pass
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(html)
+    os.replace(tmp_path, path)
+    return 'written'
+
+
+def write_snapshots(out_dir, keys):
+    """Render `keys` into out_dir and count the outcomes"""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {'written': 0, 'unchanged': 0, 'removed': 0}
+    for key in keys:
+        counts[write_snapshot(out_dir, key)] += 1
+    return counts
+
+
+def _init_worker():
+    # Forked workers must not share the parent's pooled connections
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def build_all(out_dir, workers=None):
+    """Render every snapshot, `workers` processes at a time (0: in this process), and remove leftovers"""
+    keys = all_keys()
+    os.makedirs(out_dir, exist_ok=True)
+    chunks = [keys[i:i + CHUNK_SIZE] for i in range(0, len(keys), CHUNK_SIZE)]
+    counts = {'written': 0, 'unchanged': 0, 'removed': 0}
+    if workers == 0:
+        results = [write_snapshots(out_dir, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(write_snapshots, [out_dir] * len(chunks), chunks))
+    for result in results:
+        for outcome, count in result.items():
+            counts[outcome] += count
+
+    # Listings deleted since the last build
+    current = {f'{key}.html' for key in keys}
+    for name in os.listdir(out_dir):
+        if name.endswith('.html') and name not in current:
+            os.remove(os.path.join(out_dir, name))
+            counts['removed'] += 1
+    return counts
+
+
+_rebuild_lock = threading.Lock()
+
+
+def rebuild_hook(out_dir):
+    def rebuild_snapshots(keys):
+        # Each purge has its own thread; render after the previous rebuild is written, from the newest data
+        with _rebuild_lock:
+            os.makedirs(out_dir, exist_ok=True)
+            with open(os.path.join(out_dir, '.rebuild.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    counts = write_snapshots(out_dir, sorted(keys))
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        app.logger.info(f"Snapshots rebuilt for {len(keys)} keys: {counts}")
+    return rebuild_snapshots
+
+
+if SNAPSHOT_DIR:
+    purge_hooks.append(rebuild_hook(SNAPSHOT_DIR))
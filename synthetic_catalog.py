@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Synthetic catalog generator for load and performance testing.
+Bulk-inserts realistic Vehicle rows (make/model/category mix, prices,
+mileage and image references) into the configured database.
+
+Usage:
+    python3 synthetic_catalog.py --rows 100000
+    python3 synthetic_catalog.py --rows 1000000 --truncate
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from feature_tags import backfill_feature_tags
+from id_types import uuid7
+from identifier_keys import identifier_key
+
+# Category -> (weight, [(make, [models], weight), ...], base price in rupees)
+CATALOG_MIX = {
+    'Cars': (0.62, [
+        ('Maruti Suzuki', ['Swift', 'Baleno', 'Brezza', 'Dzire', 'Ertiga'], 0.24),
+        ('Hyundai', ['Creta', 'i20', 'Venue', 'Verna'], 0.18),
+        ('Tata', ['Nexon', 'Punch', 'Harrier', 'Altroz'], 0.12),
+        ('Mahindra', ['Thar', 'XUV700', 'Scorpio-N', 'XUV300'], 0.11),
+        ('Toyota', ['Fortuner', 'Innova Crysta', 'Camry', 'Glanza'], 0.1),
+        ('Honda', ['City', 'Civic', 'Amaze'], 0.08),
+        ('Kia', ['Seltos', 'Sonet', 'Carens'], 0.07),
+        ('BMW', ['330i', 'X1', '520d'], 0.04),
+        ('Mercedes-Benz', ['C300', 'E220d', 'GLA 200'], 0.03),
+        ('Audi', ['A4', 'Q3', 'A6'], 0.03),
+    ], 900000),
+    'Trucks': (0.24, [
+        ('Tata', ['407 Gold', 'Signa 1923', 'Ultra 1518', 'Intra V30'], 0.34),
+        ('Ashok Leyland', ['Ecomet 1415', 'Boss 1115', 'Partner'], 0.24),
+        ('Mahindra', ['Bolero Pickup', 'Blazo X 28', 'Furio 14'], 0.2),
+        ('Eicher', ['Pro 2049', 'Pro 3015'], 0.12),
+        ('Isuzu', ['D-Max', 'D-Max V-Cross'], 0.1),
+    ], 1500000),
+    'Commercial Vehicles': (0.14, [
+        ('Tata', ['Ace Gold', 'Winger', 'Magic'], 0.32),
+        ('Mahindra', ['Supro', 'Jeeto', 'Treo'], 0.24),
+        ('Ashok Leyland', ['Dost', 'Bada Dost'], 0.18),
+        ('Force', ['Traveller', 'Trax Cruiser'], 0.16),
+        ('Piaggio', ['Ape Xtra', 'Porter 700'], 0.1),
+    ], 700000),
+}
+
+FUEL_TYPES = [('Petrol', 0.38), ('Diesel', 0.42), ('CNG', 0.1), ('Hybrid', 0.04), ('Electric', 0.06)]
+TRANSMISSIONS = [('Manual', 0.62), ('Automatic', 0.32), ('CVT', 0.06)]
+DRIVETRAINS = [('FWD', 0.5), ('RWD', 0.25), ('AWD', 0.1), ('4WD', 0.15)]
+CONDITIONS = [('Excellent', 0.25), ('Very Good', 0.35), ('Good', 0.3), ('Fair', 0.08), ('Poor', 0.02)]
+COLORS = ['Pearl White', 'Phantom Black', 'Silky Silver', 'Fiery Red', 'Ocean Blue', 'Grey', 'Brown']
+FEATURES = [
+    'Sunroof', 'Heated Seats', 'Navigation', 'Touchscreen Infotainment', 'Wireless Charging',
+    'Automatic Climate Control', 'Keyless Entry', 'Rear Camera', '360-degree Camera',
+    'Cruise Control', 'Leather Seats', 'Alloy Wheels', 'Power Steering', 'Dual Airbags',
+    'ABS', 'Parking Sensors', 'Ventilated Seats', 'Apple CarPlay',
+]
+STATE_CODES = ['KA', 'MH', 'TN', 'DL', 'GJ', 'KL', 'TS', 'AP', 'RJ', 'UP']
+FALLBACK_IMAGES = [
+    'audi_a4_front.jpg', 'audi_a4_interior.jpg', 'audi_a4_profile.jpg', 'bmw_330i_side.jpg',
+    'mercedes_c300_front.jpg', 'mercedes_c300_interior.jpg', 'mercedes_c300_rear.jpg',
+]
+STATUS_AVAILABLE_SHARE = 0.9
+
+
+def _weighted(rng, pairs):
+    """Pick a value from [(value, weight), ...]"""
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights=weights, k=1)[0]
+
+
+def _image_pool(upload_folder):
+    """Return real upload filenames so image requests hit actual files"""
+    try:
+        names = sorted(
+            name for name in os.listdir(upload_folder)
+            if name.rsplit('.', 1)[-1].lower() in {'png', 'jpg', 'jpeg', 'gif'}
+        )
+    except OSError:
+        names = []
+    return names or FALLBACK_IMAGES
+
+
+def generate_vehicle_rows(count, seed=42, upload_folder='static/uploads', start=0):
+    """Yield `count` dicts suitable for a bulk insert into the vehicles table.
+
+    Rows are deterministic for a given seed and start offset, so two runs of
+    the same benchmark always see the same catalog.
+    """
+    rng = random.Random(seed + start)
+    images = _image_pool(upload_folder)
+    categories = [(name, spec[0]) for name, spec in CATALOG_MIX.items()]
+    now = datetime.utcnow()
+
+    for index in range(start, start + count):
+        category = _weighted(rng, categories)
+        _, makes, base_price = CATALOG_MIX[category]
+        make, models, _ = rng.choices(makes, weights=[m[2] for m in makes], k=1)[0]
+        model = rng.choice(models)
+        year = min(2025, max(2005, int(rng.gauss(2019, 3.5))))
+        age = max(0, now.year - year)
+        mileage = max(0, int(rng.gauss(11000 * age + 4000, 6000)))
+        price = round(base_price * rng.uniform(0.6, 2.4) * (0.92 ** age), -3)
+        created_at = now - timedelta(seconds=rng.randint(0, 3 * 365 * 24 * 3600))
+        feature_count = rng.randint(0, 6)
+
+        row = {
+            'id': str(uuid7(int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1000), rng)),
+            'title': f"{year} {make} {model}",
+            'category': category,
+            'make': make,
+            'model': model,
+            'year': year,
+            'price': price,
+            'mileage': mileage,
+            'description': f"Well maintained {make} {model}, {age} years old. Synthetic listing #{index}.",
+            'contact_name': 'Friendscars',
+            'contact_phone': f"+91 9{rng.randint(100000000, 999999999)}",
+            'contact_email': None,
+            'vehicle_number': f"{rng.choice(STATE_CODES)}{rng.randint(1, 99):02d}{rng.choice('ABCDEFGHJK')}{rng.randint(1000, 9999)}",
+            'images': ','.join(rng.sample(images, k=min(len(images), rng.randint(1, 6)))),
+            'status': 'available' if rng.random() < STATUS_AVAILABLE_SHARE else 'sold',
+            'fuel_type': _weighted(rng, FUEL_TYPES),
+            'transmission': _weighted(rng, TRANSMISSIONS),
+            'drivetrain': _weighted(rng, DRIVETRAINS),
+            'number_of_owners': rng.choice([1, 1, 1, 2, 2, 3]),
+            'exterior_color': rng.choice(COLORS),
+            'features': ', '.join(rng.sample(FEATURES, k=feature_count)) or None,
+            'condition_rating': _weighted(rng, CONDITIONS),
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+        row['vehicle_number_key'] = identifier_key(row['vehicle_number'])  # bulk inserts skip the model's validators
+        yield row
+
+
+def seed_catalog(rows, batch_size=5000, seed=42, truncate=False):
+    """Bulk-insert `rows` synthetic vehicles; must run inside an app context"""
+    from app import app, db
+    from models import Vehicle
+
+    if truncate:
+        db.session.query(Vehicle).delete()
+        db.session.commit()
+
+    started = time.perf_counter()
+    inserted = 0
+    batch = []
+    for row in generate_vehicle_rows(rows, seed=seed, upload_folder=app.config['UPLOAD_FOLDER']):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(Vehicle), batch)
+            db.session.commit()
+            inserted += len(batch)
+            batch = []
+            app.logger.info(f"Inserted {inserted}/{rows} synthetic vehicles")
+    if batch:
+        db.session.execute(insert(Vehicle), batch)
+        db.session.commit()
+        inserted += len(batch)
+
+    # Bulk inserts skip the ORM's tag sync, so map feature tags in one pass
+    backfill_feature_tags(db.session.connection())
+    db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    return {'rows': inserted, 'seconds': round(elapsed, 3), 'rows_per_second': round(inserted / elapsed, 1) if elapsed else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed the database with a synthetic vehicle catalog')
+    parser.add_argument('--rows', type=int, default=1000, help='number of vehicles to insert (e.g. 1000, 100000, 1000000)')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--truncate', action='store_true', help='delete existing vehicles first')
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        result = seed_catalog(args.rows, batch_size=args.batch_size, seed=args.seed, truncate=args.truncate)
+
+    print(f"✅ Inserted {result['rows']} vehicles in {result['seconds']}s ({result['rows_per_second']} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for the server-side admin inventory: paging, sorting, filtering,
+search and the dashboard stats.
+"""
+import pytest
+
+
+@pytest.fixture(scope='module')
+def inventory(database, make_vehicle, add_vehicles):
+    add_vehicles([make_vehicle(title=f'Listing {number}', category='Trucks' if number == 6 else 'Cars',
+                               make='Tata' if number % 2 else 'Honda', year=2010 + number,
+                               price=100000 * (number + 1), mileage=1000 * (7 - number),
+                               status='sold' if number < 2 else 'available',
+                               registration_number=f'KA 01 AB 10{number}0')
+                  for number in range(7)])
+
+
+def titles(data):
+    return [vehicle['title'] for vehicle in data['vehicles']]
+
+
+def test_pages_follow_the_sort(inventory, admin_client):
+    first = admin_client.get('/admin/api/vehicles?sort=price_desc&per_page=3').get_json()
+    assert titles(first) == ['Listing 6', 'Listing 5', 'Listing 4']
+    assert (first['total'], first['pages'], first['page']) == (7, 3, 1)
+    last = admin_client.get('/admin/api/vehicles?sort=price_desc&per_page=3&page=3').get_json()
+    assert titles(last) == ['Listing 0']
+    data = admin_client.get('/admin/api/vehicles?sort=mileage_asc&per_page=2').get_json()
+    assert titles(data) == ['Listing 6', 'Listing 5']
+
+
+def test_filters_and_search(inventory, admin_client):
+    data = admin_client.get('/admin/api/vehicles?status=sold&sort=year_asc').get_json()
+    assert titles(data) == ['Listing 0', 'Listing 1']
+    assert admin_client.get('/admin/api/vehicles?category=Trucks').get_json()['total'] == 1
+    assert titles(admin_client.get('/admin/api/vehicles?search=ka-01-ab-1030').get_json()) == ['Listing 3']
+    data = admin_client.get('/admin/api/vehicles?search=tata&status=available&sort=price_asc').get_json()
+    assert titles(data) == ['Listing 3', 'Listing 5']
+
+
+def test_stats_cover_the_whole_inventory(inventory, admin_client):
+    data = admin_client.get('/admin/api/vehicles?per_page=1&search=honda').get_json()
+    assert data['stats'] == {'total': 7, 'available': 5, 'sold': 2, 'inventory_value': 2800000.0}
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
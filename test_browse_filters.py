@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the /browse price, year and mileage ranges, sort orders and
+paging.
+"""
+import re
+
+import pytest
+
+from app import app
+
+# title -> (price, year, mileage)
+LISTINGS = {
+    'Budget Hatch': (350000, 2015, 90000),
+    'Family Sedan': (850000, 2019, 42000),
+    'Nearly New SUV': (1450000, 2023, 8000),
+    'City Runabout': (600000, 2018, 51000),
+}
+
+
+@pytest.fixture(scope='module')
+def catalog(database, make_vehicle, add_vehicles):
+    add_vehicles([make_vehicle(title=title, make='Maruti', model='Swift', year=year, price=price, mileage=mileage)
+                  for title, (price, year, mileage) in LISTINGS.items()]
+                 + [make_vehicle(title='Sold Sedan', make='Maruti', model='Swift', price=700000, status='sold')])
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def browse_titles(client, query):
+    """Listing titles in page order"""
+    response = client.get('/browse?category=Cars&' + query)
+    assert response.status_code == 200
+    found = re.findall('|'.join(map(re.escape, [*LISTINGS, 'Sold Sedan'])), response.get_data(as_text=True))
+    return list(dict.fromkeys(found))
+
+
+def test_sorts(catalog, client):
+    assert browse_titles(client, 'sort=price_asc') == ['Budget Hatch', 'City Runabout', 'Family Sedan', 'Nearly New SUV']
+    assert browse_titles(client, 'sort=year_desc') == ['Nearly New SUV', 'Family Sedan', 'City Runabout', 'Budget Hatch']
+    assert browse_titles(client, 'sort=mileage_asc')[0] == 'Nearly New SUV'
+    assert browse_titles(client, 'sort=bogus') == browse_titles(client, 'sort=newest')
+
+
+def test_ranges_combine(catalog, client):
+    assert browse_titles(client, 'max_price=1000000&min_year=2018&max_mileage=50000') == ['Family Sedan']
+    assert browse_titles(client, 'min_price=500000&max_price=900000&sort=price_desc') == ['Family Sedan', 'City Runabout']
+    assert browse_titles(client, 'max_year=2015') == ['Budget Hatch']
+    assert browse_titles(client, 'min_price=abc&sort=price_asc')[0] == 'Budget Hatch'  # ignored, not an error
+
+
+def test_pages(catalog, client, monkeypatch):
+    monkeypatch.setattr('routes.BROWSE_PER_PAGE', 3)
+    assert browse_titles(client, 'sort=price_asc&page=2') == ['Nearly New SUV']
+    assert browse_titles(client, 'sort=price_asc&page=9') == ['Nearly New SUV']  # clamped to the last page
+    assert 'page=2' in client.get('/browse?category=Cars&sort=price_asc').get_data(as_text=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
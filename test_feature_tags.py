@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for normalized feature tags: the mapping follows edits, and the
+/browse feature filter is an AND over tags with and without bitsets.
+"""
+import pytest
+from sqlalchemy import insert
+
+from app import app, db
+from feature_index import feature_bitsets
+from feature_tags import split_features, tag_slug
+from models import FeatureTag, Vehicle
+import models
+from write_queue import run_write
+
+LISTINGS = [
+    ('Sunroof, Heated Seats', 'Automatic', 'AWD'),
+    ('sunroof ,Navigation', 'Automatic', 'FWD'),
+    ('Heated  seats', 'Manual', 'AWD'),
+    (None, 'Automatic', 'AWD'),
+]
+
+
+@pytest.fixture(scope='module')
+def vehicle_ids(database, make_vehicle, add_vehicles):
+    return add_vehicles([make_vehicle(title=f'Listing {i}', features=features, transmission=transmission,
+                                      drivetrain=drivetrain)
+                         for i, (features, transmission, drivetrain) in enumerate(LISTINGS)])
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def browse_titles(client, query):
+    response = client.get('/browse?category=Cars&' + query)
+    assert response.status_code == 200
+    return sorted(f'Listing {i}' for i in range(len(LISTINGS)) if f'Listing {i}<' in response.get_data(as_text=True))
+
+
+def test_split_features_dedupes_by_slug():
+    assert tag_slug(' Heated-Seats ') == 'heated-seats'
+    assert split_features('Sunroof, sunroof ,Heated  Seats,,') == {'sunroof': 'Sunroof', 'heated-seats': 'Heated Seats'}
+
+
+@pytest.mark.parametrize('bitsets', ['0', '1'])
+def test_browse_requires_every_feature(vehicle_ids, client, monkeypatch, bitsets):
+    monkeypatch.setenv('FEATURE_BITSETS', bitsets)
+    assert browse_titles(client, 'feature=Sunroof') == ['Listing 0', 'Listing 1']
+    assert browse_titles(client, 'feature=Sunroof&feature=AWD&feature=Automatic') == ['Listing 0']
+    assert browse_titles(client, 'features=heated-seats,awd') == ['Listing 0', 'Listing 2']
+    assert browse_titles(client, 'feature=Sunroof&feature=Towbar') == []
+
+
+def test_tags_follow_edits(vehicle_ids, client, monkeypatch):
+    monkeypatch.setenv('FEATURE_BITSETS', '1')
+    assert browse_titles(client, 'feature=Navigation') == ['Listing 1']
+
+    def edit(session):
+        return session.get(Vehicle, vehicle_ids[3]).update_from_dict(features='Navigation')
+    with app.app_context():
+        assert run_write(edit) == ['features']
+
+    assert browse_titles(client, 'feature=Navigation') == ['Listing 1', 'Listing 3']
+    with app.app_context():
+        assert sorted(tag.slug for tag in db.session.get(Vehicle, vehicle_ids[3]).tags) == ['automatic', 'awd', 'navigation']
+        assert feature_bitsets.counts()['navigation'] == 2
+
+
+def test_tag_added_meanwhile_by_another_worker_is_reused(vehicle_ids, make_vehicle, monkeypatch):
+    insert_feature_tags = models._insert_feature_tags
+
+    def racing(session, names):
+        # Another worker commits the same new slug between our lookup and our insert
+        session.connection().execute(insert(FeatureTag).values(name='Tow Hitch', slug='tow-hitch'))
+        insert_feature_tags(session, names)
+    monkeypatch.setattr(models, '_insert_feature_tags', racing)
+
+    vehicle = make_vehicle(title='Towing', features='tow hitch')
+    with app.app_context():
+        run_write(lambda session: session.add(vehicle))
+        assert [tag.name for tag in FeatureTag.query.filter_by(slug='tow-hitch')] == ['Tow Hitch']
+        assert 'tow-hitch' in {tag.slug for tag in db.session.get(Vehicle, vehicle.id).tags}
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the listing-card fragment cache: warm pages reuse cards, and a
+changed vehicle is re-rendered.
+"""
+import pytest
+
+from app import app
+from fragment_cache import FragmentCache, listing_cards
+from models import Vehicle
+from write_queue import run_write
+
+
+@pytest.fixture(scope='module')
+def vehicle_ids(database, make_vehicle, add_vehicles):
+    return add_vehicles([make_vehicle(title=f'Card {i}') for i in range(3)])
+
+
+@pytest.fixture
+def client():
+    listing_cards.clear()
+    return app.test_client()
+
+
+def browse(client):
+    response = client.get('/browse?category=Cars')
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_warm_page_reuses_cards(vehicle_ids, client):
+    cold = browse(client)
+    assert (listing_cards.hits, listing_cards.misses) == (0, 3)
+    assert browse(client) == cold
+    assert (listing_cards.hits, listing_cards.misses) == (3, 3)
+
+
+def test_edit_rerenders_the_card(vehicle_ids, client):
+    browse(client)
+
+    def rename(session):
+        session.get(Vehicle, vehicle_ids[1]).title = 'Renamed Card'
+    with app.app_context():
+        run_write(rename)
+
+    assert len(listing_cards) == 2  # dropped on commit
+    html = browse(client)
+    assert 'Renamed Card' in html and 'Card 1<' not in html
+    assert listing_cards.hits == 2
+
+
+def test_stale_stamp_misses_and_size_is_bounded():
+    cache = FragmentCache(size=2)
+    cache.put('a', 1, 'A')
+    assert cache.get('a', 2) is None  # e.g. updated elsewhere, or a new template version
+    cache.put('b', 1, 'B')
+    cache.get('a', 1)
+    cache.put('c', 1, 'C')
+    assert cache.get('b', 1) is None and cache.get('a', 1) == 'A'
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
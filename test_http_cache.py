@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared-cache headers on the public catalog pages: no session
+cookie for anonymous visitors, public vs private Cache-Control, Surrogate-Key
+tags, and purging them when a vehicle changes.
+"""
+import threading
+
+import pytest
+
+from app import app
+from http_cache import purge_hooks
+from models import Vehicle
+from page_cache import page_cache
+from write_queue import run_write
+
+
+@pytest.fixture(scope='module')
+def vehicle_id(database, make_vehicle, add_vehicles):
+    [vehicle_id] = add_vehicles([make_vehicle(title='Public Listing')])
+    return vehicle_id
+
+
+@pytest.fixture
+def anonymous():
+    return app.test_client(use_cookies=False)
+
+
+def test_anonymous_pages_are_public(vehicle_id, anonymous):
+    # /browse no longer needs a marketplace visit or a referrer first
+    for url, key in [('/marketplace', 'marketplace'), ('/browse?category=Cars', 'category-cars'),
+                     (f'/vehicle/{vehicle_id}', f'vehicle-{vehicle_id}')]:
+        response = anonymous.get(url)
+        assert response.status_code == 200, url
+        assert 'Set-Cookie' not in response.headers, url
+        assert response.headers['Cache-Control'].startswith('public, max-age='), url
+        assert 'Cookie' not in response.vary and 'Accept-Encoding' in response.vary, url
+        assert key in response.headers['Surrogate-Key'].split(), url
+    assert f'vehicle-{vehicle_id}' in anonymous.get('/browse?category=Cars').headers['Surrogate-Key'].split()
+
+
+def test_session_cookie_makes_pages_private(vehicle_id, admin_client):
+    response = admin_client.get(f'/vehicle/{vehicle_id}')
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Surrogate-Key' not in response.headers
+    assert 'Admin Panel' in response.get_data(as_text=True)
+
+
+def test_errors_are_not_stored(anonymous):
+    response = anonymous.get('/browse?category=Boats')
+    assert response.status_code == 302 and response.headers['Cache-Control'] == 'no-store'
+
+
+def test_page_cache_hits_keep_surrogate_keys(vehicle_id, anonymous, monkeypatch):
+    monkeypatch.setitem(app.config, 'PAGE_CACHE', True)
+    page_cache.clear()
+    anonymous.get(f'/vehicle/{vehicle_id}')
+    response = anonymous.get(f'/vehicle/{vehicle_id}')
+    assert response.headers['X-Page-Cache'] == 'HIT'
+    assert response.headers['Surrogate-Key'] == f'vehicle-{vehicle_id}'
+
+
+def test_vehicle_change_purges_its_keys(vehicle_id, monkeypatch):
+    purged = []
+    done = threading.Event()
+
+    def hook(keys):
+        purged.append(keys)
+        done.set()
+    monkeypatch.setattr('http_cache.purge_hooks', purge_hooks + [hook])
+
+    def recategorize(session):
+        session.get(Vehicle, vehicle_id).category = 'Trucks'
+    with app.app_context():
+        run_write(recategorize)
+    assert done.wait(5)
+    assert purged == [{f'vehicle-{vehicle_id}', 'category-cars', 'category-trucks', 'category-all', 'marketplace'}]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for normalized VIN/plate keys: exact lookup in any spelling and
+duplicate detection when listings are added or edited.
+"""
+import pytest
+
+from identifier_keys import identifier_key
+
+LISTING = {'title': 'Lookup Test', 'category': 'Cars', 'make': 'Honda', 'model': 'City', 'year': '2020',
+           'price': '900000', 'mileage': '100', 'description': 'Lookup test listing', 'contact_name': 'Friendscars',
+           'contact_phone': '5555555555', 'status': 'available'}
+
+
+@pytest.fixture(scope='module')
+def vehicle_id(database, make_vehicle, add_vehicles):
+    [vehicle_id] = add_vehicles([make_vehicle(title='Registered', vin_number='1hgcm82633a004352',
+                                              registration_number='KA 01 AB 1234')])
+    return vehicle_id
+
+
+def test_identifier_key():
+    assert identifier_key(' ka-01 ab.1234 ') == 'KA01AB1234'
+    assert identifier_key(' - ') is None
+
+
+def test_lookup_matches_any_spelling(vehicle_id, admin_client):
+    data = admin_client.get('/admin/api/vehicles/lookup?q=ka-01-ab-1234').get_json()
+    assert [(vehicle['id'], vehicle['matched']) for vehicle in data['vehicles']] == [(vehicle_id, ['registration_number'])]
+    data = admin_client.get('/admin/api/vehicles/lookup?q=1HGCM82633A004352').get_json()
+    assert data['vehicles'][0]['matched'] == ['vin_number']
+    assert admin_client.get('/admin/api/vehicles/lookup?q=KA01AB9999').get_json()['vehicles'] == []
+
+
+def test_duplicate_plate_or_vin_is_rejected(vehicle_id, admin_client):
+    # The same plate typed into the other plate field still counts
+    response = admin_client.post('/admin/add_vehicle', data=dict(LISTING, vehicle_number='ka01ab1234'))
+    assert response.status_code == 409
+    assert response.get_json()['duplicates'][0]['vehicle_id'] == vehicle_id
+
+    response = admin_client.post('/admin/api/vehicles', data=dict(LISTING, vehicle_number='KA01AB5678'))
+    assert response.status_code == 200
+    new_id = response.get_json()['vehicle']['id']
+
+    response = admin_client.post(f'/admin/edit_vehicle/{new_id}',
+                                 data=dict(LISTING, vehicle_number='KA01AB5678', vin_number='1HGCM82633A004352'))
+    assert response.status_code == 409
+    assert 'VIN' in response.get_json()['message']
+
+
+
+def test_sold_car_can_be_listed_again(vehicle_id, admin_client):
+    response = admin_client.post('/admin/add_vehicle',
+                                 data=dict(LISTING, vin_number='JH4KA8260MC000123', vehicle_number='MH12CD4321'))
+    assert response.status_code == 200
+    sold_id = response.get_json()['vehicle']['id']
+    assert admin_client.post(f'/admin/toggle_status/{sold_id}').get_json()['new_status'] == 'sold'
+
+    response = admin_client.post('/admin/add_vehicle',
+                                 data=dict(LISTING, vin_number='jh4ka8260mc000123', registration_number='MH 12 CD 4321'))
+    assert response.status_code == 200
+    relisted_id = response.get_json()['vehicle']['id']
+    matched = admin_client.get('/admin/api/vehicles/lookup?q=JH4KA8260MC000123').get_json()['vehicles']
+    assert {vehicle['id'] for vehicle in matched} == {sold_id, relisted_id}
+
+    # While the new listing is available, a third one is still refused
+    response = admin_client.post('/admin/add_vehicle', data=dict(LISTING, vin_number='JH4KA8260MC000123'))
+    assert response.status_code == 409
+    assert response.get_json()['duplicates'][0]['vehicle_id'] == relisted_id
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for upload normalization: orientation applied, camera metadata (GPS)
+stripped, oversized photos capped, originals optionally kept as uploaded.
+
+Needs Pillow.
+"""
+import io
+import os
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from werkzeug.datastructures import FileStorage
+
+from app import app
+from image_ingest import UPLOAD_MAX_EDGE
+from routes import save_uploaded_files
+
+GPS_IFD = 0x8825
+ORIENTATION = 0x0112
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch, database):
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+    return tmp_path
+
+
+def phone_photo(size=(4000, 3000)):
+    """A JPEG stored sideways (orientation 6) with a GPS position and a camera comment"""
+    photo = Image.new('RGB', size, 'navy')
+    photo.paste('white', (0, 0, size[0] // 4, size[1] // 4))  # top-left before rotation
+    exif = photo.getexif()
+    exif[ORIENTATION] = 6
+    exif[0x010F] = 'PhoneMaker'
+    exif.get_ifd(GPS_IFD).update({1: 'N', 2: (12.0, 58.0, 0.0)})
+    data = io.BytesIO()
+    photo.save(data, 'JPEG', exif=exif, comment=b'shot on a phone', quality=95)
+    return data.getvalue()
+
+
+def upload(data, name):
+    return FileStorage(stream=io.BytesIO(data), filename=name, content_type='image/jpeg')
+
+
+def stored(uploads, filename):
+    return Image.open(uploads / 'uploads' / filename)
+
+
+def test_phone_photo_is_normalized(uploads):
+    original = phone_photo()
+    with app.app_context():
+        [filename] = save_uploaded_files([upload(original, 'IMG-20250825-WA0060.jpg')])
+    image = stored(uploads, filename)
+    # Upright and capped: 4000x3000 sideways becomes portrait with a long edge of UPLOAD_MAX_EDGE
+    assert image.size == (UPLOAD_MAX_EDGE * 3 // 4, UPLOAD_MAX_EDGE)
+    # The white corner was top-left of the stored pixels; rotated upright it is top-right
+    assert image.getpixel((image.width - 5, 5)) > (200, 200, 200)
+    assert not image.getexif() and 'comment' not in image.info and 'exif' not in image.info
+    assert os.path.getsize(uploads / 'uploads' / filename) < len(original)
+
+
+def test_small_png_keeps_size_and_transparency(uploads):
+    data = io.BytesIO()
+    Image.new('RGBA', (300, 200), (255, 0, 0, 128)).save(data, 'PNG')
+    with app.app_context():
+        [filename] = save_uploaded_files([upload(data.getvalue(), 'badge.png')])
+    image = stored(uploads, filename)
+    assert (image.format, image.mode, image.size) == ('PNG', 'RGBA', (300, 200))
+
+
+def test_unreadable_upload_is_rejected(uploads):
+    with app.app_context():
+        assert save_uploaded_files([upload(b'not an image', 'fake.jpg')]) == []
+
+
+def test_multi_picture_jpeg_is_stored_as_jpeg(uploads):
+    data = io.BytesIO()
+    Image.new('RGB', (4000, 3000), 'navy').save(data, 'MPO', save_all=True,
+                                               append_images=[Image.new('RGB', (4000, 3000), 'gray')])
+    assert Image.open(io.BytesIO(data.getvalue())).format == 'MPO'
+    with app.app_context():
+        [filename] = save_uploaded_files([upload(data.getvalue(), 'IMG-20250825-WA0001.jpg')])
+    image = stored(uploads, filename)
+    assert (image.format, image.size, getattr(image, 'n_frames', 1)) == ('JPEG', (UPLOAD_MAX_EDGE, 1800), 1)
+    assert image.getpixel((5, 5))[2] > 100  # the first (navy) picture
+
+
+def test_originals_kept_in_cold_storage(uploads, monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_ORIGINALS_FOLDER', str(uploads / 'originals'))
+    original = phone_photo(size=(800, 600))
+    with app.app_context():
+        [filename] = save_uploaded_files([upload(original, '1000694076.jpg')])
+    assert (uploads / 'originals' / filename).read_bytes() == original
+    assert stored(uploads, filename).size == (600, 800)
+    # A rejected upload leaves nothing behind
+    with app.app_context():
+        assert save_uploaded_files([upload(b'not an image', 'fake.jpg')]) == []
+    assert os.listdir(uploads / 'originals') == [filename]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for image_info: size and inline placeholder recorded at upload, the
+<img> attributes the listing card and detail page render from them, and
+the backfill command for older uploads.
+
+Each test gets fresh tables and a temporary upload directory (needs Pillow).
+"""
+import base64
+import io
+import re
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from werkzeug.datastructures import FileStorage
+
+from app import app, db
+from fragment_cache import listing_cards
+from image_placeholders import BLANK_IMAGE, image_info
+import image_placeholders
+from models import ImageInfo, get_image_info
+from routes import save_uploaded_files
+from write_queue import run_write
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    upload_dir = tmp_path / 'uploads'
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(upload_dir))
+    listing_cards.clear()
+    image_placeholders._cache.clear()
+    with app.app_context():
+        db.create_all()
+    yield upload_dir
+    with app.app_context():
+        db.drop_all()
+
+
+def photo(size, color='navy'):
+    data = io.BytesIO()
+    Image.new('RGB', size, color).save(data, 'JPEG')
+    return FileStorage(stream=io.BytesIO(data.getvalue()), filename='photo.jpg', content_type='image/jpeg')
+
+
+@pytest.fixture
+def listing(make_vehicle):
+    def add(images):
+        vehicle = make_vehicle(title='Placeholder Test', images=images)
+        with app.app_context():
+            run_write(lambda session: session.add(vehicle))
+            return vehicle.id
+    return add
+
+
+def page(url):
+    response = app.test_client().get(url)
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def img_tags(html, size):
+    return [tag for tag in re.findall(r'<img [^>]*>', html, re.S) if f'/img/{size}/' in tag]
+
+
+def test_upload_records_size_and_placeholder(uploads):
+    with app.app_context():
+        [filename] = save_uploaded_files([photo((3000, 2000))])
+        row = get_image_info([filename])[filename]
+    assert (row.width, row.height) == (2400, 1600)
+    assert row.placeholder.startswith('data:image/') and len(row.placeholder) < 1000
+    preview = Image.open(io.BytesIO(base64.b64decode(row.placeholder.split(',', 1)[1])))
+    assert max(preview.size) == 16
+
+
+def test_card_and_detail_reserve_space_and_show_placeholder(uploads, listing):
+    with app.app_context():
+        [filename] = save_uploaded_files([photo((3000, 2000))])
+    (uploads / 'legacy.jpg').write_bytes(photo((640, 480)).read())
+    vehicle_id = listing([filename, 'legacy.jpg'])
+    with app.app_context():
+        placeholder = image_info([filename])[filename].placeholder
+
+    cards = img_tags(page('/browse?category=Cars'), '480x240')
+    assert len(cards) == 2 and 'placeholder.jpg' not in ''.join(cards)
+    for tag in cards:
+        assert 'width="480" height="240"' in tag and 'loading="lazy"' in tag and BLANK_IMAGE in tag
+    assert placeholder in cards[0] and 'url(' not in cards[1]  # no row yet for the older upload
+
+    detail, legacy = img_tags(page(f'/vehicle/{vehicle_id}'), '1200x0')
+    assert 'width="1200" height="800"' in detail and placeholder in detail
+    assert 'loading=' not in detail  # first slide is on screen straight away
+    assert 'width=' not in legacy and 'loading="lazy"' in legacy
+
+
+def test_backfill_command(uploads, listing):
+    uploads.mkdir()
+    (uploads / 'legacy.jpg').write_bytes(photo((640, 480)).read())
+    listing(['legacy.jpg', 'gone.jpg'])
+    result = app.test_cli_runner().invoke(args=['image-info'])
+    assert 'Recorded 1 of 2' in result.output, result.output
+    with app.app_context():
+        assert (db.session.get(ImageInfo, 'legacy.jpg').width, db.session.get(ImageInfo, 'gone.jpg')) == (640, None)
+    assert 'Recorded 0 of 1' in app.test_cli_runner().invoke(args=['image-info']).output
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
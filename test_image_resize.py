@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for /img/<w>x<h>/<filename>: allowed sizes only, the on-disk copy,
+conditional and range requests, least-recently-used eviction, and WebP/AVIF
+by content negotiation.
+
+Runs against temporary upload and cache directories (needs Pillow).
+"""
+import io
+import os
+import shutil
+import time
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from app import app
+from image_resize import EVICT_TO, DerivativeCache, IMAGE_SIZES, image_url, offered_formats
+from image_report import measure
+import routes
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    upload_dir = tmp_path / 'uploads'
+    upload_dir.mkdir()
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(upload_dir))
+    monkeypatch.setattr(routes, 'derivatives', DerivativeCache(str(tmp_path / 'cache'), max_bytes=10 * 1024 * 1024))
+    # A portrait phone photo stored sideways: 2000x1500 pixels with EXIF orientation 6 (rotate 90)
+    photo = Image.new('RGB', (2000, 1500), 'navy')
+    exif = photo.getexif()
+    exif[0x0112] = 6
+    photo.save(upload_dir / 'photo.jpg', 'JPEG', exif=exif)
+    Image.new('RGBA', (300, 200), (255, 0, 0, 128)).save(upload_dir / 'badge.png')
+    (upload_dir / 'notes.jpg').write_text('not an image')
+    return upload_dir
+
+
+def fetch_image(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, url
+    return response, Image.open(io.BytesIO(response.data))
+
+
+def test_resizes_to_allowed_sizes(uploads):
+    client = app.test_client()
+    response, image = fetch_image(client, '/img/80x60/photo.jpg')
+    assert (image.format, image.size) == ('JPEG', (80, 60))
+    assert 'max-age=31536000' in response.headers['Cache-Control']
+    # Width-only sizes keep the (upright) aspect ratio
+    assert fetch_image(client, '/img/1200x0/photo.jpg')[1].size == (1200, 1600)
+    _, image = fetch_image(client, '/img/480x240/badge.png')
+    assert (image.format, image.mode, image.size) == ('PNG', 'RGBA', (480, 240))
+
+
+def test_rejects_other_sizes_and_files(uploads):
+    client = app.test_client()
+    for url in ['/img/81x60/photo.jpg', '/img/4000x4000/photo.jpg', '/img/80x60/missing.jpg', '/img/80x60/notes.jpg']:
+        assert client.get(url).status_code == 404, url
+    assert client.get('/img/80x60/..%2Fuploads%2Fphoto.jpg').status_code != 200
+
+
+def test_cached_copy_is_reused(uploads):
+    client = app.test_client()
+    first = client.get('/img/80x60/photo.jpg')
+    second = client.get('/img/80x60/photo.jpg')
+    assert routes.derivatives.resizes == 1
+    assert first.headers['ETag'] == second.headers['ETag']
+
+    assert client.get('/img/80x60/photo.jpg', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    partial = client.get('/img/80x60/photo.jpg', headers={'Range': 'bytes=0-9'})
+    assert partial.status_code == 206 and partial.data == first.data[:10]
+
+
+def test_least_recently_served_copies_are_evicted(uploads):
+    client = app.test_client()
+    cache = routes.derivatives
+    for name in ['a.jpg', 'b.jpg', 'c.jpg']:
+        shutil.copy(uploads / 'photo.jpg', uploads / name)
+    client.get('/img/80x60/a.jpg')
+    client.get('/img/80x60/b.jpg')
+    # Serve the older copy again, then add a third that takes the cache over its two-copy budget
+    time.sleep(0.01)
+    client.get('/img/80x60/a.jpg')
+    cache.max_bytes = int(2 * os.path.getsize(cache.path(80, 60, 'a.jpg')) / EVICT_TO) + 1
+    assert fetch_image(client, '/img/80x60/c.jpg')[1].size == (80, 60)
+    assert [os.path.exists(cache.path(80, 60, name)) for name in ['a.jpg', 'b.jpg', 'c.jpg']] == [True, False, True]
+
+
+def test_modern_formats_by_accept_header(uploads):
+    client = app.test_client()
+    browser = 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8'
+    for accept, mimetype in [('image/webp,*/*', 'image/webp'), ('*/*', 'image/jpeg'), ('image/avif;q=0,*/*', 'image/jpeg'),
+                             (browser, offered_formats()[0])]:
+        response = client.get('/img/480x240/photo.jpg', headers={'Accept': accept})
+        assert response.mimetype == mimetype, accept
+        assert 'Accept' in response.vary
+        assert Image.open(io.BytesIO(response.data)).size == (480, 240)
+    assert os.path.exists(routes.derivatives.path(480, 240, 'photo.jpg', 'image/webp'))
+
+
+def test_savings_report(uploads):
+    totals, skipped = measure(str(uploads), ['original', 'card'], ['WEBP'])
+    assert totals['card']['files'] == 2 and [entry.split(':')[0] for entry in skipped] == ['notes.jpg']
+    assert 0 < totals['card']['WEBP'] < totals['card']['source']
+
+
+def test_image_url():
+    with app.test_request_context():
+        assert image_url('photo.jpg', 'admin') == '/img/80x60/photo.jpg'
+        assert set(IMAGE_SIZES) >= {'admin', 'thumb', 'card', 'detail'}
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the typed insurance_expiry column: lenient parsing of typed dates
+and the admin endpoint listing upcoming expiries.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from app import app
+from date_types import parse_date
+
+
+@pytest.fixture(scope='module')
+def expiries(database, make_vehicle, add_vehicles):
+    today = date.today()
+    dates = {'soon': today + timedelta(days=3), 'later': today + timedelta(days=20),
+             'lapsed': today - timedelta(days=5), 'far': today + timedelta(days=90)}
+    add_vehicles([make_vehicle(title=name, insurance_expiry=expiry.strftime('%m/%d/%Y'))
+                  for name, expiry in dates.items()])
+    return dates
+
+
+def test_parse_date_formats():
+    assert parse_date('03/15/2025') == date(2025, 3, 15)
+    assert parse_date('15/03/2025') == date(2025, 3, 15)
+    assert parse_date('2025-03-15') == date(2025, 3, 15)
+    assert parse_date('04/03/2025') == date(2025, 4, 3)  # ambiguous: MM/DD wins
+    assert parse_date('  ') is None
+    with pytest.raises(ValueError):
+        parse_date('next spring')
+
+
+def test_expiring_lists_upcoming_soonest_first(expiries, admin_client):
+    data = admin_client.get('/admin/api/insurance/expiring?days=30').get_json()
+    assert [vehicle['title'] for vehicle in data['vehicles']] == ['soon', 'later']
+    assert data['vehicles'][0]['days_left'] == 3
+    assert data['vehicles'][0]['insurance_expiry'] == expiries['soon'].strftime('%m/%d/%Y')
+
+    data = admin_client.get('/admin/api/insurance/expiring?days=30&expired=1').get_json()
+    assert [vehicle['title'] for vehicle in data['vehicles']] == ['lapsed', 'soon', 'later']
+
+
+def test_expiring_requires_admin(expiries):
+    assert app.test_client().get('/admin/api/insurance/expiring').status_code == 401
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
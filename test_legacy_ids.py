@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for links from before vehicle ids became UUIDv7: migration
+3c9d2f7a41b8 records each replaced uuid4 in legacy_vehicle_ids, and
+/vehicle/<uuid4> redirects permanently to the listing's new address.
+
+The migration test upgrades a temporary SQLite file with `flask db upgrade`.
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+from app import app, db
+from models import LegacyVehicleId, delete_vehicle, get_renamed_vehicle_id
+
+OLD_IDS = ['0f8b1c2e-4a5d-4e6f-8a9b-0c1d2e3f4a5b', '1a2b3c4d-5e6f-4a1b-9c2d-3e4f5a6b7c8d']
+
+
+@pytest.fixture(scope='module')
+def renamed(database, make_vehicle, add_vehicles):
+    kept, deleted = add_vehicles([make_vehicle(title='Renamed'), make_vehicle(title='Deleted later')])
+    with app.app_context():
+        db.session.add_all([LegacyVehicleId(legacy_id=OLD_IDS[0], vehicle_id=kept),
+                            LegacyVehicleId(legacy_id=OLD_IDS[1], vehicle_id=deleted)])
+        db.session.commit()
+        delete_vehicle(deleted)  # its legacy_vehicle_ids row stays behind
+    return kept
+
+
+def test_old_link_redirects_permanently(renamed):
+    client = app.test_client()
+    response = client.get(f'/vehicle/{OLD_IDS[0].upper()}')
+    assert response.status_code == 301
+    assert response.location == f'/vehicle/{renamed}'
+    assert 'Renamed' in client.get(response.location).get_data(as_text=True)
+
+
+def test_unknown_and_deleted_listings_still_go_to_the_marketplace(renamed):
+    for vehicle_id in [OLD_IDS[1], str(uuid.uuid4()), 'not-an-id']:
+        response = app.test_client().get(f'/vehicle/{vehicle_id}')
+        assert (response.status_code, response.location) == (302, '/marketplace'), vehicle_id
+    with app.app_context():
+        assert get_renamed_vehicle_id(OLD_IDS[1]) is None
+
+
+def flask_db(database_path, *args):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database_path}')
+    env.pop('FLASK_CONFIG', None)
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'db', *args], env=env, check=True,
+                   capture_output=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_migration_records_replaced_ids(tmp_path):
+    path = tmp_path / 'old.db'
+    flask_db(path, 'upgrade', 'e8a0b0a79af6')
+    with sqlite3.connect(path) as connection:
+        for vehicle_id, created_at in zip(OLD_IDS, ['2025-01-02 10:00:00', '2025-03-04 11:00:00']):
+            connection.execute(
+                "INSERT INTO vehicles (id, title, category, make, model, year, price, mileage, description, "
+                "contact_name, contact_phone, images, status, created_at, updated_at) "
+                "VALUES (?, 'Old', 'Cars', 'Honda', 'City', 2020, 900000, 30000, 'Test', 'Friendscars', '555', '', "
+                "'available', ?, ?)", (vehicle_id, created_at, created_at))
+    flask_db(path, 'upgrade', '3c9d2f7a41b8')
+    with sqlite3.connect(path) as connection:
+        new_ids = [uuid.UUID(bytes=row[0]) for row in connection.execute('SELECT id FROM vehicles ORDER BY id')]
+        legacy = {old: uuid.UUID(bytes=new) for old, new in connection.execute('SELECT * FROM legacy_vehicle_ids')}
+    assert [new.version for new in new_ids] == [7, 7]
+    assert [legacy[old] for old in OLD_IDS] == new_ids  # created_at order is kept
+
+    # Keys stay UUIDv7 across a downgrade and the mappings survive it
+    flask_db(path, 'downgrade', 'e8a0b0a79af6')
+    flask_db(path, 'upgrade', '3c9d2f7a41b8')
+    with sqlite3.connect(path) as connection:
+        assert [uuid.UUID(bytes=row[0]) for row in connection.execute('SELECT id FROM vehicles ORDER BY id')] == new_ids
+        kept = {old: uuid.UUID(bytes=new) for old, new in connection.execute('SELECT * FROM legacy_vehicle_ids')}
+    assert kept == legacy
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
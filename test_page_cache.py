@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the anonymous full-page cache: URL normalization, admin and flash
+bypass, stale-while-revalidate, and one render per burst of requests.
+"""
+import threading
+import time
+
+import pytest
+
+from app import app
+from models import Vehicle
+from page_cache import PageCache, page_cache
+from write_queue import run_write
+import routes
+
+
+@pytest.fixture(scope='module')
+def vehicle_id(database, make_vehicle, add_vehicles):
+    [vehicle_id] = add_vehicles([make_vehicle(title='Cached Listing')])
+    return vehicle_id
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(app.config, 'PAGE_CACHE', True)
+    page_cache.clear()
+    return app.test_client()
+
+
+def cache_status(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.headers.get('X-Page-Cache')
+
+
+def test_anonymous_pages_are_cached_by_normalized_url(vehicle_id, client):
+    assert cache_status(client, f'/vehicle/{vehicle_id}') == 'MISS'
+    assert cache_status(client, f'/vehicle/{vehicle_id}') == 'HIT'
+    assert cache_status(client, '/browse?category=Cars&sort=price_asc') == 'MISS'
+    assert cache_status(client, '/browse?sort=price_asc&search=&category=Cars') == 'HIT'
+    assert cache_status(client, '/browse?category=Cars&sort=price_desc') == 'MISS'
+
+
+def test_admins_and_pending_flashes_bypass(vehicle_id, client):
+    cache_status(client, f'/vehicle/{vehicle_id}')
+    with client.session_transaction() as sess:
+        sess['_flashes'] = [('success', 'Saved')]
+    response = client.get(f'/vehicle/{vehicle_id}')
+    assert 'X-Page-Cache' not in response.headers and 'Saved' in response.get_data(as_text=True)
+
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+    assert cache_status(client, f'/vehicle/{vehicle_id}') is None
+
+
+def test_vehicle_commit_marks_its_pages_stale(vehicle_id, client):
+    cache_status(client, f'/vehicle/{vehicle_id}')
+    cache_status(client, '/browse?category=Trucks')
+
+    def rename(session):
+        session.get(Vehicle, vehicle_id).title = 'Renamed Listing'
+    with app.app_context():
+        run_write(rename)
+
+    refreshed = []
+    html, status = page_cache.serve(f'/vehicle/{vehicle_id}', render=None, refresh=lambda: refreshed.append(1))
+    assert status == 'STALE' and 'Cached Listing' in html
+    time.sleep(0.05)
+    assert refreshed == [1]
+    assert cache_status(client, '/browse?category=Trucks') == 'HIT'  # doesn't show the listing
+
+
+def test_burst_on_a_new_page_renders_once():
+    cache = PageCache(size=10, ttl=30, stale=60)
+    renders = []
+
+    def render():
+        renders.append(1)
+        time.sleep(0.2)
+        return '<html>listing</html>'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.serve('/vehicle/new', render, render)))
+               for _ in range(200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(renders) == 1
+    assert len(results) == 200 and {html for html, _ in results} == {'<html>listing</html>'}
+
+
+def test_burst_on_a_redirect_renders_once(database, client, monkeypatch):
+    lookups = []
+
+    def slow_missing_vehicle(vehicle_id):
+        lookups.append(vehicle_id)
+        time.sleep(0.2)
+    monkeypatch.setattr(routes, 'get_vehicle', slow_missing_vehicle)
+
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(app.test_client().get('/vehicle/gone')))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert lookups == ['gone']  # the waiting requests got the leader's redirect
+    assert {(response.status_code, response.location) for response in responses} == {(302, '/marketplace')}
+    assert len({id(response) for response in responses}) == 10
+
+
+def test_stale_page_is_served_while_one_refresh_runs():
+    cache = PageCache(size=10, ttl=0.2, stale=60)
+    cache.serve('/marketplace', lambda: 'old', None)
+    time.sleep(0.21)
+    refreshes = []
+
+    def refresh():
+        refreshes.append(1)
+        time.sleep(0.1)
+        return 'new'
+
+    assert {cache.serve('/marketplace', None, refresh) for _ in range(20)} == {('old', 'STALE')}
+    time.sleep(0.12)
+    assert refreshes == [1]
+    assert cache.serve('/marketplace', None, refresh) == ('new', 'HIT')
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
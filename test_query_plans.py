@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression tests for the catalog.
+
+Seeds a synthetic catalog (100k vehicles by default), collects the
+statements that the catalog helpers in models.py and the filtered views in
+routes.py actually send, and EXPLAINs each one. A vehicles lookup must go
+through an index; a plan that reads the whole vehicles table (SQLite
+"SCAN vehicles", Postgres "Seq Scan on vehicles") fails the test and names
+the statement.
+
+SQLite (in-memory, ANALYZEd like PRAGMA optimize does in production):
+    python -m pytest test_query_plans.py -q
+
+Postgres, against a scratch database that the test empties. Run the file on
+its own so the app is configured for it:
+    QUERY_PLAN_POSTGRES_URL=postgresql://localhost/automarket_plans python -m pytest test_query_plans.py -q
+
+QUERY_PLAN_ROWS changes the catalog size (seeding 100k rows takes ~30s).
+"""
+import os
+import re
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+POSTGRES_URL = os.environ.get('QUERY_PLAN_POSTGRES_URL')  # conftest points the app at it
+
+import pytest
+from sqlalchemy import event, select
+
+from app import app, db
+from models import (Vehicle, VEHICLE_SORTS, browse_query, find_vehicles_by_identifier, get_all_vehicles,
+                    get_available_vehicles, get_expiring_insurance, get_feature_tags, get_inventory_stats,
+                    get_vehicle, get_vehicles_by_category, search_vehicles)
+from routes import BROWSE_RANGES, BROWSE_SORTS
+from synthetic_catalog import seed_catalog
+
+ROWS = int(os.environ.get('QUERY_PLAN_ROWS', 100000))
+
+# Plan lines that read every row of the vehicles table
+FULL_SCANS = {
+    'sqlite': re.compile(r'^SCAN vehicles(?! USING)'),
+    'postgresql': re.compile(r'Seq Scan on vehicles\b'),
+}
+# ...and, for pages whose order should come straight off an index, sorting them
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+# Helpers that return (almost) the whole table. On Postgres a sequential read
+# is the right plan for them; SQLite must still walk an index for the order.
+UNBOUNDED = {'get_all_vehicles', 'get_available_vehicles', 'get_vehicles_by_category', 'marketplace'}
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    with app.app_context():
+        if POSTGRES_URL and db.engine.dialect.name != 'postgresql':
+            pytest.skip('the app was already configured for another database; run this file on its own')
+        db.drop_all()
+        db.create_all()
+        seed_catalog(ROWS)
+        with db.engine.connect() as connection:
+            if db.engine.dialect.name == 'postgresql':
+                connection.execution_options(isolation_level='AUTOCOMMIT').exec_driver_sql('VACUUM ANALYZE')
+            else:
+                connection.exec_driver_sql('ANALYZE')
+                connection.commit()
+        sample = db.session.scalars(select(Vehicle).where(Vehicle.vehicle_number_key.is_not(None)).limit(1)).one()
+        values = {'id': sample.id, 'plate': sample.vehicle_number, 'make': sample.make}
+        db.session.remove()
+    yield values
+    with app.app_context():
+        db.drop_all()
+
+
+@contextmanager
+def captured_selects():
+    """Collect (statement, parameters) for every SELECT sent while active"""
+    statements = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def explain(statement, parameters):
+    """The plan as a list of lines"""
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        return [row[0] for row in connection.exec_driver_sql('EXPLAIN ' + statement, parameters)]
+    return [row[3] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+
+
+def full_scans(name, statements, ordered=False):
+    """Statements whose plan reads all of vehicles (or, when `ordered`, sorts a page), with that plan"""
+    dialect = db.engine.dialect.name
+    failures = []
+    for statement, parameters in statements:
+        if 'vehicles' not in statement:
+            continue
+        # On Postgres reading every row (no WHERE, or a helper that returns them all) may be sequential
+        if dialect == 'postgresql' and (name in UNBOUNDED or ' WHERE ' not in statement):
+            continue
+        plan = explain(statement, parameters)
+        sorted_page = ordered and dialect == 'sqlite' and ' LIMIT ' in statement and TEMP_SORT in plan
+        if sorted_page or any(FULL_SCANS[dialect].search(line) for line in plan):
+            failures.append(f"{statement}\n  params: {parameters}\n  plan: {plan}")
+    return failures
+
+
+def helper_cases(values):
+    """name -> (callable running one catalog helper or filtered view, whether its pages come in index order)"""
+    today = date.today()
+    cases = {
+        'get_vehicle': lambda client: get_vehicle(values['id']),
+        'get_all_vehicles': lambda client: get_all_vehicles(),
+        'get_available_vehicles': lambda client: get_available_vehicles(),
+        'get_vehicles_by_category': lambda client: get_vehicles_by_category('Trucks'),
+        'get_inventory_stats': lambda client: get_inventory_stats(),
+        'get_expiring_insurance': lambda client: get_expiring_insurance(today, today + timedelta(days=30)),
+        'find_vehicles_by_identifier': lambda client: find_vehicles_by_identifier(values['plate']),
+        'get_feature_tags': lambda client: get_feature_tags(),
+        'marketplace': lambda client: client.get('/marketplace'),
+        'vehicle_detail': lambda client: client.get(f"/vehicle/{values['id']}"),
+        'admin_lookup': lambda client: client.get(f"/admin/api/vehicles/lookup?q={values['plate']}"),
+        'admin_insurance_expiring': lambda client: client.get('/admin/api/insurance/expiring?days=30&expired=1'),
+        'browse_features': lambda client: client.get('/browse?category=Cars&feature=Sunroof&feature=Automatic'),
+        'browse_search': lambda client: client.get(f"/browse?category=all&search={values['make']}"),
+    }
+    cases = {name: (run, False) for name, run in cases.items()}
+    for sort in VEHICLE_SORTS:
+        cases[f'search_vehicles[{sort}]'] = (lambda client, sort=sort: search_vehicles(sort=sort, page=20), True)
+        cases[f'search_vehicles[{sort},status,category]'] = (
+            lambda client, sort=sort: search_vehicles(status='sold', category='Trucks', sort=sort, page=3), True)
+        cases[f'admin_api[{sort}]'] = (
+            lambda client, sort=sort: client.get(f'/admin/api/vehicles?sort={sort}&status=available&page=5'), True)
+    ranges = {'min_price': 300000, 'max_price': 1000000, 'min_year': 2018, 'max_year': 2022, 'max_mileage': 50000}
+    for sort in BROWSE_SORTS:
+        for name in [None, *BROWSE_RANGES]:
+            for category in ['all', 'Cars']:
+                query = f'category={category}&sort={sort}' + (f'&{name}={ranges[name]}' if name else '')
+                # A range on another column is a range seek on that column's index whose matches get sorted
+                ordered = name is None or name.split('_')[1] in sort
+                cases[f'browse[{query}]'] = (lambda client, query=query: client.get(f'/browse?{query}&page=3'), ordered)
+        cases[f'browse_query[{sort},all ranges]'] = (
+            lambda client, sort=sort: browse_query(sort=sort, **ranges).limit(24).all(), False)
+    return cases
+
+
+def test_catalog_queries_use_indexes(catalog, admin_client):
+    failures = []
+    with app.app_context():
+        for name, (run, ordered) in helper_cases(catalog).items():
+            with captured_selects() as statements:
+                response = run(admin_client)
+            if hasattr(response, 'status_code'):
+                assert response.status_code == 200, name
+            assert statements, f'{name} sent no query'
+            failures += [f'{name}: {failure}' for failure in full_scans(name, statements, ordered)]
+            db.session.remove()
+    assert not failures, 'full table scans or sorted pages:\n' + '\n\n'.join(failures)
+
+
+def test_full_scan_is_detected(catalog):
+    # Guard against the check passing because the plan format changed
+    with app.app_context():
+        statements = [('SELECT * FROM vehicles WHERE description = ?', ('nothing',))]
+        if db.engine.dialect.name == 'postgresql':
+            statements = [('SELECT * FROM vehicles WHERE description = %(d)s', {'d': 'nothing'})]
+        assert full_scans('unindexed', statements)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the static snapshots: a full build, incremental rebuilds of the
+pages a vehicle change affects, and removal of deleted listings.
+
+The full build renders in this process (workers=0), since pool workers
+can't see the in-memory database.
+"""
+import threading
+
+import pytest
+
+from app import app
+from models import Vehicle
+from static_snapshots import build_all, rebuild_hook
+from write_queue import run_write
+
+
+@pytest.fixture(scope='module')
+def vehicle_ids(database, make_vehicle, add_vehicles):
+    return add_vehicles([make_vehicle(title=title, category=category)
+                         for title, category in [('Snapshot Sedan', 'Cars'), ('Snapshot Hauler', 'Trucks')]])
+
+
+@pytest.fixture
+def rebuilds(tmp_path, monkeypatch):
+    """(snapshot directory with the incremental hook installed, event set once a rebuild ran)"""
+    done = threading.Event()
+    rebuild = rebuild_hook(str(tmp_path))
+
+    def hook(keys):
+        rebuild(keys)
+        done.set()
+    monkeypatch.setattr('http_cache.purge_hooks', [hook])
+    build_all(str(tmp_path), workers=0)
+    return tmp_path, done
+
+
+def read(snapshots, key):
+    return (snapshots / f'{key}.html').read_text()
+
+
+def test_full_build(vehicle_ids, tmp_path):
+    (tmp_path / 'vehicle-gone.html').write_text('old')
+    counts = build_all(str(tmp_path), workers=0)
+    assert counts == {'written': 7, 'unchanged': 0, 'removed': 1}
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        ['marketplace.html', 'category-all.html', 'category-cars.html', 'category-trucks.html',
+         'category-commercial-vehicles.html', *(f'vehicle-{vehicle_id}.html' for vehicle_id in vehicle_ids)])
+    assert 'Snapshot Sedan' in read(tmp_path, f'vehicle-{vehicle_ids[0]}')
+    assert 'Snapshot Hauler' in read(tmp_path, 'category-trucks')
+    assert build_all(str(tmp_path), workers=0)['unchanged'] == 7
+
+
+def test_change_rebuilds_affected_pages(vehicle_ids, rebuilds):
+    snapshots, done = rebuilds
+    untouched = snapshots / f'vehicle-{vehicle_ids[1]}.html'
+    mtime = untouched.stat().st_mtime_ns
+
+    def move(session):
+        vehicle = session.get(Vehicle, vehicle_ids[0])
+        vehicle.title, vehicle.category = 'Snapshot Pickup', 'Trucks'
+    with app.app_context():
+        run_write(move)
+    assert done.wait(5)
+    assert 'Snapshot Pickup' in read(snapshots, f'vehicle-{vehicle_ids[0]}')
+    assert 'Snapshot Pickup' in read(snapshots, 'category-trucks')
+    assert 'Snapshot Pickup' not in read(snapshots, 'category-cars')
+    assert untouched.stat().st_mtime_ns == mtime
+
+
+def test_deleted_listing_loses_its_page(vehicle_ids, rebuilds):
+    snapshots, done = rebuilds
+
+    def delete(session):
+        session.delete(session.get(Vehicle, vehicle_ids[1]))
+    with app.app_context():
+        run_write(delete)
+    assert done.wait(5)
+    assert not (snapshots / f'vehicle-{vehicle_ids[1]}.html').exists()
+    assert 'Snapshot Hauler' not in read(snapshots, 'category-all')
+
+
+
+def test_concurrent_rebuilds_run_one_at_a_time(vehicle_ids, tmp_path):
+    rebuild = rebuild_hook(str(tmp_path))
+    errors = []
+
+    def save():
+        try:
+            rebuild({'marketplace', 'category-all'})
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['.rebuild.lock', 'category-all.html', 'marketplace.html']
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Tests for the request-scoped unit of work: every request checks out exactly
+one pooled connection and returns it, transient errors are retried, and
+edits write only the columns that changed.
+"""
+import base64
+import io
+
+import pytest
+from sqlalchemy import event, select, text
+from sqlalchemy.exc import OperationalError, StatementError
+
+from app import app, db
+from enum_types import STATUSES
+from id_types import CompactUUID
+from models import Vehicle, get_vehicle
+from synthetic_catalog import generate_vehicle_rows
+from unit_of_work import is_transient, retry_transient
+import routes
+
+GIF_1X1 = 'R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+
+
+@pytest.fixture(scope='module')
+def vehicle_ids(database, add_vehicles):
+    rows = generate_vehicle_rows(5, upload_folder=app.config['UPLOAD_FOLDER'])
+    return add_vehicles([Vehicle(**row) for row in rows])
+
+
+@pytest.fixture
+def pool_events():
+    counts = {'checkout': 0, 'checkin': 0}
+
+    def on_checkout(*args):
+        counts['checkout'] += 1
+
+    def on_checkin(*args):
+        counts['checkin'] += 1
+
+    with app.app_context():
+        pool = db.engine.pool
+    event.listen(pool, 'checkout', on_checkout)
+    event.listen(pool, 'checkin', on_checkin)
+    yield counts
+    event.remove(pool, 'checkout', on_checkout)
+    event.remove(pool, 'checkin', on_checkin)
+
+
+def assert_one_checkout(counts, response, expected_status=200):
+    assert response.status_code == expected_status
+    assert counts['checkout'] == 1, f"expected one connection checkout, got {counts['checkout']}"
+    assert counts['checkin'] == counts['checkout'], "connection was not returned to the pool"
+
+
+def test_public_pages_use_one_connection(vehicle_ids, pool_events, admin_client):
+    for path in ['/marketplace', '/browse?category=all', f'/vehicle/{vehicle_ids[0]}']:
+        pool_events.update(checkout=0, checkin=0)
+        assert_one_checkout(pool_events, admin_client.get(path))
+
+
+def test_admin_reads_use_one_connection(vehicle_ids, pool_events, admin_client):
+    for path in ['/admin/api/vehicles', f'/admin/vehicle/{vehicle_ids[1]}']:
+        pool_events.update(checkout=0, checkin=0)
+        assert_one_checkout(pool_events, admin_client.get(path))
+
+
+def test_admin_writes_use_one_connection(vehicle_ids, pool_events, admin_client):
+    assert_one_checkout(pool_events, admin_client.post(f'/admin/toggle_status/{vehicle_ids[2]}'))
+
+    pool_events.update(checkout=0, checkin=0)
+    response = admin_client.put(f'/admin/api/vehicles/{vehicle_ids[3]}', data={'title': 'Updated title'})
+    assert_one_checkout(pool_events, response)
+    assert response.get_json()['vehicle']['title'] == 'Updated title'
+
+
+def test_missing_vehicle_returns_404_without_fallback_queries(pool_events, admin_client):
+    assert_one_checkout(pool_events, admin_client.get('/admin/vehicle/does-not-exist'), 404)
+
+
+def test_vehicle_deleted_mid_request_returns_404(monkeypatch, tmp_path, database, admin_client, make_vehicle,
+                                                 add_vehicles):
+    """Each write looks the vehicle up again in its unit of work; if it's gone by then, the route says 404"""
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    write = routes.run_write
+    for method, path, data in [('post', '/admin/toggle_status/{}', None),
+                               ('delete', '/admin/delete-image-from-slot/{}/0', None),
+                               ('post', '/admin/upload-image-to-slot/{}', {'slot': '0'}),
+                               ('put', '/admin/api/vehicles/{}', {'title': 'Gone'})]:
+        [vehicle_id] = add_vehicles([make_vehicle(title='Deleted meanwhile', images=['front.jpg'])])
+
+        def delete_first(unit_of_work):
+            write(lambda session: session.delete(session.get(Vehicle, vehicle_id)))
+            return write(unit_of_work)
+        monkeypatch.setattr(routes, 'run_write', delete_first)
+        if data and 'slot' in data:
+            data = dict(data, image=(io.BytesIO(base64.b64decode(GIF_1X1)), 'photo.gif'))
+        response = getattr(admin_client, method)(path.format(vehicle_id), data=data)
+        assert response.status_code == 404, path
+        assert response.get_json()['message'] == 'Vehicle not found'
+    assert list(tmp_path.iterdir()) == []  # the slot upload was removed again
+    assert admin_client.post('/admin/delete_vehicle/does-not-exist').status_code == 404
+
+
+def test_transient_errors_are_retried():
+    calls = []
+
+    @retry_transient
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError('SELECT 1', {}, Exception('database is locked'))
+        return 'ok'
+
+    with app.app_context():
+        assert flaky() == 'ok'
+    assert len(calls) == 3
+
+
+def test_permanent_errors_are_not_retried():
+    calls = []
+
+    @retry_transient
+    def broken():
+        calls.append(1)
+        raise OperationalError('SELECT 1', {}, Exception('no such table: vehicles'))
+
+    with app.app_context(), pytest.raises(OperationalError):
+        broken()
+    assert len(calls) == 1
+    assert not is_transient(ValueError('database is locked'))
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', on_execute)
+
+
+def test_noop_edit_skips_the_write(vehicle_ids, statements, admin_client):
+    vehicle_id = vehicle_ids[0]
+    with app.app_context():
+        before = db.session.get(Vehicle, vehicle_id).to_dict()
+    statements.clear()
+
+    response = admin_client.put(f'/admin/api/vehicles/{vehicle_id}',
+                                data={'title': before['title'], 'price': str(before['price'])})
+    assert response.get_json()['changed_fields'] == []
+    assert not [sql for sql in statements if sql.startswith('UPDATE')]
+    with app.app_context():
+        assert db.session.get(Vehicle, vehicle_id).to_dict()['updated_at'] == before['updated_at']
+
+
+def test_edit_updates_only_changed_columns(vehicle_ids, statements, admin_client):
+    response = admin_client.put(f'/admin/api/vehicles/{vehicle_ids[1]}', data={'mileage': '4242'})
+    assert response.get_json()['changed_fields'] == ['mileage']
+    updates = [sql for sql in statements if sql.startswith('UPDATE')]
+    assert len(updates) == 1
+    assert 'mileage=' in updates[0] and 'updated_at=' in updates[0] and 'title=' not in updates[0]
+
+
+def test_get_vehicle_returns_none_for_unknown_id(vehicle_ids):
+    with app.app_context():
+        assert get_vehicle('missing') is None
+        assert get_vehicle(vehicle_ids[4]).id == vehicle_ids[4]
+
+
+def test_enum_columns_store_codes(vehicle_ids):
+    with app.app_context():
+        vehicle = db.session.get(Vehicle, vehicle_ids[2])
+        stored = db.session.execute(text('SELECT status FROM vehicles WHERE id = :id'),
+                                    {'id': CompactUUID().process_bind_param(vehicle.id, db.engine.dialect)}).scalar()
+        assert stored == STATUSES.index(vehicle.status) + 1
+        with pytest.raises(StatementError, match='not a known fuel_type'):
+            db.session.execute(select(Vehicle.id).where(Vehicle.fuel_type == 'Steam')).all()
+
+
+def test_values_outside_a_vocabulary_are_rejected_before_the_write(vehicle_ids, admin_client):
+    for response, field in [(admin_client.post('/admin/api/vehicles', data={'title': 'Steam car', 'status': 'scrapped'}),
+                             'status'),
+                            (admin_client.put(f'/admin/api/vehicles/{vehicle_ids[4]}', data={'fuel_type': 'Steam'}),
+                             'fuel_type')]:
+        assert response.status_code == 400
+        body = response.get_json()
+        assert body['message'] == 'Validation failed' and list(body['errors']) == [field]
+        assert 'expected one of' in body['errors'][field]
+    with app.app_context():
+        assert db.session.get(Vehicle, vehicle_ids[4]).fuel_type != 'Steam'
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite write queue: units of work commit on the writer's
+session, and a request whose unit of work wrote is pinned to the primary
+(read-your-writes with a replica).
+
+Runs the writer against a temporary SQLite file, since the queue is off for
+in-memory databases:
+    python -m pytest test_write_queue.py -q
+"""
+import pytest
+from flask import g, session
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import OperationalError
+
+from app import app, db
+from models import Vehicle
+import write_queue
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    db.metadata.create_all(engine)
+    writer = write_queue.SingleWriter(engine)
+    monkeypatch.setattr(write_queue, 'queue_enabled', lambda: True)
+    monkeypatch.setattr(write_queue, '_writer', lambda: writer)
+    yield engine
+    engine.dispose()
+
+
+def count(engine):
+    with engine.connect() as connection:
+        return connection.scalar(select(func.count()).select_from(Vehicle))
+
+
+def test_write_pins_request_to_primary(writer, make_vehicle):
+    vehicle = make_vehicle(title='Queued')
+    with app.test_request_context('/admin/api/vehicles', method='POST'):
+        g.db_read_replica = True
+        assert write_queue.run_write(lambda s: s.add(vehicle) or 'saved') == 'saved'
+        assert session['db_primary_until'] > 0 and g.db_read_replica is False
+    assert count(writer) == 1
+
+
+def test_read_only_unit_does_not_pin(writer):
+    with app.test_request_context('/admin/api/vehicles'):
+        g.db_read_replica = True
+        assert write_queue.run_write(lambda s: s.scalar(select(func.count()).select_from(Vehicle))) == 0
+        assert 'db_primary_until' not in session and g.db_read_replica is True
+
+
+def test_permanent_error_fails_only_its_own_unit(writer, make_vehicle, monkeypatch):
+    monkeypatch.setattr(write_queue, 'WINDOW_SECONDS', 0.2)  # both units in one batch
+    calls = []
+
+    def broken(session):
+        calls.append('broken')
+        session.execute(text('SELECT * FROM no_such_table'))
+
+    vehicle = make_vehicle(title='Saved')
+    failing = write_queue._writer().submit(broken)
+    saving = write_queue._writer().submit(lambda s: s.add(vehicle) or 'saved')
+    with pytest.raises(OperationalError, match='no such table'):
+        failing.result(timeout=5)
+    assert saving.result(timeout=5) == ('saved', True)
+    assert calls == ['broken']  # not retried as if it were a lock
+    assert count(writer) == 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
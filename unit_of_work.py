@@ -0,0 +1,58 @@
+"""
+Request-scoped unit of work.
+
+Each request uses one `db.session` transaction on one pooled connection:
+reads run inside that transaction (so a page sees one consistent snapshot),
+writes commit it through `write_queue.run_write`, and Flask-SQLAlchemy's
+app-context teardown (`db.session.remove()`) always rolls back whatever is
+left and returns the connection to the pool, even when the view raised.
+
+Transient database errors (a dropped connection, SQLite's "database is
+locked", Postgres deadlocks and serialization failures) are retried a few
+times with jittered exponential backoff by `@retry_transient`, instead of
+each call site closing the session and re-querying by hand.
+"""
+import functools
+import random
+import time
+
+from sqlalchemy.exc import DBAPIError
+
+from app import app, db
+
+RETRY_DELAYS = (0.05, 0.1, 0.2)  # seconds before the 2nd, 3rd and 4th attempt
+
+TRANSIENT_MESSAGES = (
+    'database is locked',
+    'database table is locked',
+    'deadlock detected',
+    'could not serialize access',
+    'server closed the connection unexpectedly',
+    'connection reset by peer',
+)
+
+
+def is_transient(error):
+    """True for database errors that are worth retrying on a fresh transaction"""
+    if not isinstance(error, DBAPIError):
+        return False
+    if error.connection_invalidated:
+        return True
+    message = str(error.orig).lower()
+    return any(text in message for text in TRANSIENT_MESSAGES)
+
+
+def retry_transient(func):
+    """Retry `func` on transient database errors, rolling back between attempts"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for delay in RETRY_DELAYS + (None,):
+            try:
+                return func(*args, **kwargs)
+            except DBAPIError as e:
+                if delay is None or not is_transient(e):
+                    raise
+                db.session.rollback()
+                app.logger.warning(f"Transient database error in {func.__name__}, retrying: {e.orig}")
+                time.sleep(delay * random.uniform(0.5, 1.5))
+    return wrapper
@@ -0,0 +1,172 @@
+"""
+Optional single-writer queue for SQLite.
+
+SQLite allows one writer at a time. When several gunicorn workers save
+vehicles at once, the losers spin in busy_timeout and eventually fail with
+"database is locked". With `SQLITE_WRITE_QUEUE=1` every mutation is instead
+handed to one writer thread per process:
+
+- requests put a unit of work on the process-local queue and wait for it;
+- the writer takes everything that arrives within `WRITE_QUEUE_WINDOW_MS`
+  (group commit), holds an exclusive `flock` on a lock file next to the
+  database so only one process writes at a time, and runs the batch in a
+  single `BEGIN IMMEDIATE` transaction with a SAVEPOINT per unit of work;
+- one commit (one WAL fsync) then covers the whole batch, and a unit of work
+  that fails only rolls back its own savepoint.
+
+A unit of work is a function taking a SQLAlchemy session; it runs on the
+writer's session, not on `db.session`, so it should look rows up with
+`session.get()`. Return plain data (e.g. `vehicle.to_dict()` after
+`session.flush()`) or ORM objects, which come back detached with their loaded
+attributes. Without the flag, or on a server database, `run_write` just runs
+it on `db.session` and commits. Either way a request whose unit of work
+wrote is pinned to the primary afterwards (db_routing), so its next pages
+don't read a replica that hasn't caught up.
+"""
+import fcntl
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app import app, db
+from db_routing import pin_to_primary
+from unit_of_work import is_transient, retry_transient
+
+WINDOW_SECONDS = float(os.environ.get('WRITE_QUEUE_WINDOW_MS', 3)) / 1000
+MAX_BATCH = int(os.environ.get('WRITE_QUEUE_MAX_BATCH', 64))
+WAIT_TIMEOUT = 30  # seconds a request waits for its write
+LOCKED_RETRIES = 3
+
+
+def queue_enabled():
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    return (os.environ.get('SQLITE_WRITE_QUEUE') == '1'
+            and uri.startswith('sqlite') and ':memory:' not in uri)
+
+
+def run_write(unit_of_work):
+    """Run `unit_of_work(session)` as a committed write and return its result"""
+    if not queue_enabled():
+        return _commit_on_request_session(unit_of_work)
+    result, wrote = _writer().submit(unit_of_work).result(timeout=WAIT_TIMEOUT)
+    if wrote:
+        # Committed on the writer's session, which db_routing's commit listener doesn't watch
+        pin_to_primary()
+    return result
+
+
+@retry_transient
+def _commit_on_request_session(unit_of_work):
+    try:
+        result = unit_of_work(db.session)
+        db.session.commit()
+        return result
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+class SingleWriter:
+    """Per-process writer thread with group commit and a cross-process file lock"""
+
+    def __init__(self, engine):
+        self.engine = engine.execution_options(sqlite_begin='IMMEDIATE')
+        self.lock_path = engine.url.database + '-writer.lock'
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, unit_of_work):
+        future = Future()
+        self.jobs.put((unit_of_work, future))
+        return future
+
+    def _next_batch(self):
+        batch = [self.jobs.get()]
+        deadline = time.monotonic() + WINDOW_SECONDS
+        while len(batch) < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.jobs.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        with app.app_context():
+            while True:
+                batch = self._next_batch()
+                for attempt in range(LOCKED_RETRIES):
+                    try:
+                        results = self._commit_batch(batch)
+                        break
+                    except Exception as e:
+                        # Only a lock (another writer bypassed the lock file, e.g. a CLI
+                        # command) is worth running the batch again for
+                        if not is_transient(e) or attempt == LOCKED_RETRIES - 1:
+                            results = [e] * len(batch)
+                            break
+                        time.sleep(0.05 * 2 ** attempt)
+                for (_, future), result in zip(batch, results):
+                    if isinstance(result, BaseException):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+    def _commit_batch(self, batch):
+        """[(result, wrote) or exception] for each unit of work in `batch`, committed together"""
+        results = []
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with Session(self.engine, expire_on_commit=False) as session:
+                    event.listen(session, 'after_flush', _mark_flush_write)
+                    event.listen(session, 'do_orm_execute', _mark_bulk_write)
+                    for unit_of_work, _ in batch:
+                        try:
+                            session.info.pop('wrote', None)
+                            with session.begin_nested():
+                                result = unit_of_work(session)
+                            results.append((result, session.info.pop('wrote', False)))
+                        except DBAPIError as e:
+                            if is_transient(e):
+                                raise  # the transaction is lost; _run retries the batch
+                            results.append(e)  # e.g. "no such table": this unit's savepoint is rolled back
+                        except Exception as e:
+                            results.append(e)
+                    session.commit()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return results
+
+
+def _mark_flush_write(session, flush_context):
+    session.info['wrote'] = True
+
+
+def _mark_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+_writer_lock = threading.Lock()
+_writer_instance = None
+_writer_pid = None
+
+
+def _writer():
+    """The writer for this process, started on first use (after gunicorn forks)"""
+    global _writer_instance, _writer_pid
+    with _writer_lock:
+        if _writer_instance is None or _writer_pid != os.getpid():
+            _writer_instance = SingleWriter(db.engine)
+            _writer_pid = os.getpid()
+        return _writer_instance